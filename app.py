@@ -1,9 +1,6 @@
 import streamlit as st
-from src.auth import init_session
-from src.views.login import render_login
-from src.views.owner_dashboard import render_owner_dashboard
-from src.views.emp_dashboard import render_emp_dashboard
-from src.views.manager_dashboard import render_manager_dashboard
+from src.auth import init_session, logout_user
+from src.views.navigation import login_pages, role_pages, sidebar_title
 import time
 from ui.components import load_css
 
@@ -32,19 +29,21 @@ except FileNotFoundError:
 init_session()
 
 # --- 4. ROUTER LOGIC ---
+# Pages are filtered by role and import their module on first visit (src/views/navigation.py)
 if not st.session_state.get("user"):
-    render_login()
+    st.navigation(login_pages(), position="hidden").run()
 else:
     try:
         # THE FIX: Changed "role" to "user_role" to match Postgres auth
         role = st.session_state.get("user_role")
+        pages = role_pages(role)
         
-        if role == 'owner':
-            render_owner_dashboard()
-        elif role == 'employee':
-            render_emp_dashboard()
-        elif role == 'manager':          
-            render_manager_dashboard()
+        if pages:
+            pg = st.navigation(pages)
+            st.sidebar.title(sidebar_title(role))
+            if st.sidebar.button("Logout"):
+                logout_user()
+            pg.run()
         else:
             st.error(f"Unknown Role: {role}")
             if st.button("Reset Session"):
@@ -0,0 +1,86 @@
+"""
+Logins per second vs. bcrypt pool size.
+
+Simulates a shift-start surge: CLIENTS script threads each log in LOGINS times
+at once. Every configuration is run against the same stored hash. A probe
+thread stands in for everyone else's reruns: it times a small pure-Python job
+every 20 ms, so starvation shows up as probe latency.
+
+    python -m bench.auth_logins                      # defaults
+    python -m bench.auth_logins --rounds 10 --clients 100 --logins 3 --pools 1,2,4,8
+
+No database needed; this exercises src.services.passwords directly.
+"""
+import argparse
+import os
+import statistics
+import threading
+import time
+
+import bcrypt
+
+from src.services.passwords import HashPool
+
+
+def _probe(stop, samples):
+    while not stop.is_set():
+        start = time.perf_counter()
+        sum(i * i for i in range(2000))
+        samples.append((time.perf_counter() - start) * 1000)
+        time.sleep(0.02)
+
+
+def _p95(values):
+    return statistics.quantiles(values, n=20)[-1] if len(values) >= 20 else max(values, default=0.0)
+
+
+def run_case(label, verify, clients, logins):
+    latencies, probe_ms = [], []
+    lock = threading.Lock()
+    stop = threading.Event()
+    probe = threading.Thread(target=_probe, args=(stop, probe_ms), daemon=True)
+    probe.start()
+
+    def client():
+        for _ in range(logins):
+            start = time.perf_counter()
+            verify()
+            with lock:
+                latencies.append((time.perf_counter() - start) * 1000)
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    start = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    stop.set()
+    probe.join()
+
+    print(f"{label:<14} {clients * logins / elapsed:>10.1f} {statistics.median(latencies):>12.0f} "
+          f"{_p95(latencies):>12.0f} {statistics.median(probe_ms):>10.1f} {_p95(probe_ms):>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=12, help="bcrypt work factor")
+    parser.add_argument("--clients", type=int, default=64, help="concurrent logins (script threads)")
+    parser.add_argument("--logins", type=int, default=2, help="logins per client")
+    parser.add_argument("--pools", default=f"1,2,4,{os.cpu_count() or 4}", help="pool sizes to try")
+    args = parser.parse_args()
+
+    password = "correct horse battery staple"
+    stored = bcrypt.hashpw(password.encode(), bcrypt.gensalt(args.rounds)).decode()
+
+    print(f"bcrypt rounds={args.rounds}  clients={args.clients}  logins/client={args.logins}  cpus={os.cpu_count()}")
+    print(f"{'config':<14} {'logins/s':>10} {'p50 ms':>12} {'p95 ms':>12} {'probe p50':>10} {'probe p95':>10}")
+
+    run_case("inline", lambda: bcrypt.checkpw(password.encode(), stored.encode()), args.clients, args.logins)
+    for size in sorted({int(p) for p in args.pools.split(",")}):
+        pool = HashPool(workers=size, max_pending=args.clients, rounds=args.rounds, wait_seconds=600)
+        run_case(f"pool={size}", lambda: pool.verify(password, stored), args.clients, args.logins)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,418 @@
+"""
+How many open tabs one server process can carry.
+
+For each session count, starts a fresh `streamlit run` server (bench/load_app.py)
+and connects that many websocket clients, speaking the same protocol a browser
+does. Each client signs in as its own seeded account and then behaves like a tab
+left open:
+
+    - it honours the auto-rerun timers the server sends, so chat and presence
+      fragments tick exactly as they would in a browser (every 0.5 s in push
+      mode, 5 s with [chat] push = false)
+    - every THINK seconds on average it opens another of its role's pages (or
+      reruns the same one), like a click in the sidebar
+
+Sign-in and the first page visits (module imports) are not measured: the window
+opens after every session is in and WARMUP seconds have passed. Each row
+reports, over DURATION seconds:
+
+    q/s        statements the server ran per second, and the database time they took
+    waits/s    connection checkouts that found the pool empty, and their p95 wait
+    page/tick  rerun latency percentiles as the client saw them, send to script_finished,
+               for full page runs and for fragment ticks
+    RSS        peak resident memory of the server process
+
+Server-side numbers come from the server's own telemetry (src/db/metrics.py),
+flushed to query_metrics, so use a scratch database seeded by bench.seed:
+
+    python -m bench.load                                   # 10, 25, 50, 100 sessions
+    python -m bench.load --sessions 200 --mix employee=1 --pages chat
+    python -m bench.load --save                            # make this run the baseline
+    python -m bench.load --fail-over 25                    # exit 1 on a 25% regression
+
+The clients share the machine with the server, so at high counts their own CPU
+use shows up in the latencies. Sessions are stopped between steps and the server
+restarted, so RSS and the pool start clean every time.
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+import warnings
+
+from src.db import fetch_all, fetch_one
+from src.db.statements import statement
+from src.views.navigation import ROLE_PAGES
+from bench.navigation import APP
+from bench.views import table_sizes
+
+ROOT = os.path.dirname(APP)
+SERVER_SCRIPT = os.path.join(ROOT, "bench", "load_app.py")
+BASELINE = os.path.join(os.path.dirname(__file__), "baselines", "load.json")
+# Longest a single rerun may take before the client gives up on it
+RERUN_TIMEOUT = 120
+
+USERS_FOR_ROLE = statement("bench.load.users_for_role", """
+    SELECT email FROM users WHERE role = :role ORDER BY created_at LIMIT :n
+""")
+SERVER_STATS = statement("bench.load.server_stats", """
+    SELECT count(*) FILTER (WHERE kind = 'query') AS queries,
+           coalesce(sum(duration_ms) FILTER (WHERE kind = 'query'), 0) AS db_ms,
+           count(*) FILTER (WHERE kind = 'pool') AS waits,
+           percentile_cont(0.95) WITHIN GROUP (ORDER BY duration_ms) FILTER (WHERE kind = 'pool') AS wait_p95
+    FROM query_metrics
+    WHERE recorded_at >= to_timestamp(:start) AND recorded_at < to_timestamp(:end)
+""")
+
+
+# --- SERVER ---
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class Server:
+    """A `streamlit run bench/load_app.py` child process on a free local port."""
+
+    def __init__(self):
+        self.port = _free_port()
+        self.log = tempfile.NamedTemporaryFile(prefix="bench-load-", suffix=".log", delete=False)
+        self.proc = subprocess.Popen(
+            [sys.executable, "-m", "streamlit", "run", SERVER_SCRIPT,
+             "--server.headless", "true", "--server.port", str(self.port),
+             "--server.fileWatcherType", "none", "--browser.gatherUsageStats", "false"],
+            cwd=ROOT, stdout=self.log, stderr=subprocess.STDOUT,
+        )
+        self.url = f"ws://127.0.0.1:{self.port}/_stcore/stream"
+        self._wait_healthy()
+
+    def _wait_healthy(self, timeout=60):
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if self.proc.poll() is not None:
+                break
+            try:
+                urllib.request.urlopen(f"http://127.0.0.1:{self.port}/_stcore/health", timeout=1)
+                return
+            except OSError:
+                time.sleep(0.2)
+        self.stop()
+        raise SystemExit(f"Server did not start, see {self.log.name}")
+
+    def rss_mb(self) -> float:
+        try:
+            import psutil
+            return psutil.Process(self.proc.pid).memory_info().rss / 2**20
+        except ImportError:
+            with open(f"/proc/{self.proc.pid}/status") as f:
+                kb = next(line for line in f if line.startswith("VmRSS:")).split()[1]
+            return int(kb) / 1024
+
+    def stop(self):
+        self.proc.terminate()
+        try:
+            self.proc.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.proc.kill()
+        self.log.close()
+
+
+# --- ONE BROWSER TAB ---
+class RerunFailed(Exception):
+    pass
+
+
+class Session(threading.Thread):
+    """One websocket client: signs in, then ticks fragments and changes page until told to stop."""
+
+    def __init__(self, url, email, password, pages, think, seed, stop, results):
+        super().__init__(daemon=True)
+        self.url, self.email, self.password = url, email, password
+        self.pages, self.think = pages, think
+        self.random = random.Random(seed)
+        self.stop_event, self.results = stop, results
+        self.signed_in = threading.Event()
+        self.error = None
+        self.page_hash = ""
+        self.fragments = {}  # fragment_id -> [interval seconds, next due (monotonic)]
+
+    def _send(self, **client_state):
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        msg = BackMsg()
+        msg.rerun_script.SetInParent()
+        for name, value in client_state.items():
+            if name == "widgets":
+                msg.rerun_script.widget_states.widgets.extend(value)
+            else:
+                setattr(msg.rerun_script, name, value)
+        self.ws.send(msg.SerializeToString())
+
+    def _until_finished(self):
+        """Reads until the rerun ends; returns {label: widget id} of the widgets it drew."""
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+        widgets, auto_reruns = {}, {}
+        deadline = time.monotonic() + RERUN_TIMEOUT
+        while True:
+            msg = ForwardMsg()
+            msg.ParseFromString(self.ws.recv(timeout=max(deadline - time.monotonic(), 0.01)))
+            kind = msg.WhichOneof("type")
+            if kind == "new_session":
+                self.page_hash = msg.new_session.page_script_hash
+            elif kind == "auto_rerun":
+                auto_reruns[msg.auto_rerun.fragment_id] = msg.auto_rerun.interval
+            elif kind == "delta" and msg.delta.WhichOneof("type") == "new_element":
+                element = msg.delta.new_element
+                field = element.WhichOneof("type")
+                if field == "exception":
+                    raise RerunFailed(element.exception.message)
+                if field in ("text_input", "button"):
+                    widget = getattr(element, field)
+                    widgets[widget.label] = widget.id
+            elif kind == "script_finished":
+                if msg.script_finished == ForwardMsg.FINISHED_WITH_COMPILE_ERROR:
+                    raise RerunFailed("compile error")
+                # FINISHED_EARLY_FOR_RERUN: st.rerun() inside the script, the next run follows
+                if msg.script_finished != ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                    now = time.monotonic()
+                    for fragment_id, interval in auto_reruns.items():
+                        self.fragments[fragment_id] = [interval, now + interval]
+                    return widgets
+
+    def _sign_in(self):
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+        self._send()
+        widgets = self._until_finished()
+        for attempt in range(5):
+            states = [
+                WidgetState(id=widgets["Email Address"], string_value=self.email),
+                WidgetState(id=widgets["Password"], string_value=self.password),
+                WidgetState(id=widgets["Access Dashboard"], trigger_value=True),
+            ]
+            self._send(widgets=states)
+            if "Access Dashboard" not in self._until_finished():
+                return
+            # Wrong password, or the hashing pool was busy: back off like a person would
+            time.sleep(1 + attempt)
+        raise RerunFailed(f"could not sign in as {self.email}")
+
+    def _timed(self, kind, **client_state):
+        start = time.time()
+        began = time.perf_counter()
+        try:
+            self._send(**client_state)
+            self._until_finished()
+            ok = True
+        except RerunFailed:
+            ok = False
+        self.results.append((kind, start, (time.perf_counter() - began) * 1000, ok))
+
+    def _next_click(self):
+        return time.monotonic() + self.random.expovariate(1 / self.think)
+
+    def run(self):
+        from streamlit.util import calc_hash
+        from websockets.sync.client import connect
+        try:
+            with connect(self.url, max_size=None, open_timeout=30) as self.ws:
+                self._sign_in()
+                self.signed_in.set()
+                click_at = self._next_click()
+                while not self.stop_event.is_set():
+                    due, fragment_id = min([(click_at, None)] + [(t[1], f) for f, t in self.fragments.items()])
+                    if self.stop_event.wait(max(due - time.monotonic(), 0)):
+                        break
+                    if fragment_id is None:
+                        # A full rerun on another page forgets the old page's fragment timers
+                        self.fragments = {}
+                        self._timed("page", page_script_hash=calc_hash(self.random.choice(self.pages)))
+                        click_at = self._next_click()
+                    else:
+                        self._timed("tick", page_script_hash=self.page_hash,
+                                    fragment_id=fragment_id, is_auto_rerun=True)
+                        if fragment_id in self.fragments:
+                            interval = self.fragments[fragment_id][0]
+                            self.fragments[fragment_id][1] = max(due + interval, time.monotonic())
+        except Exception as e:
+            self.error = f"{self.email}: {type(e).__name__}: {e}"
+            self.signed_in.set()
+
+
+# --- ONE STEP ---
+def _mix(spec: str) -> dict:
+    """'employee=8,owner=1' -> {'employee': 8/9, 'owner': 1/9}"""
+    weights = {role: float(w) for role, w in (part.split("=") for part in spec.split(","))}
+    unknown = set(weights) - set(ROLE_PAGES)
+    if unknown:
+        raise SystemExit(f"Unknown role(s) in --mix: {', '.join(sorted(unknown))}")
+    total = sum(weights.values())
+    return {role: w / total for role, w in weights.items() if w > 0}
+
+
+def _accounts(n: int, mix: dict) -> list:
+    """[(role, email)] for n sessions split by the mix, one account per session where the data has enough."""
+    counts = {role: int(round(n * share)) for role, share in mix.items()}
+    counts[max(mix, key=mix.get)] += n - sum(counts.values())
+    accounts = []
+    for role, count in counts.items():
+        emails = [r["email"] for r in fetch_all(USERS_FOR_ROLE, {"role": role, "n": count})]
+        if count and not emails:
+            raise SystemExit(f"No {role} accounts in the database (run python -m bench.seed)")
+        accounts += [(role, emails[i % len(emails)]) for i in range(count)]
+    return accounts
+
+
+def _pages(role: str, only) -> list:
+    paths = [spec.url_path for spec in ROLE_PAGES[role]]
+    return [p for p in paths if p in only] if only else paths
+
+
+def _percentile(values, q):
+    if not values:
+        return float("nan")
+    return statistics.quantiles(values, n=100, method="inclusive")[q - 1] if len(values) > 1 else values[0]
+
+
+def run_step(n: int, args, mix: dict) -> dict:
+    accounts = _accounts(n, mix)
+    server = Server()
+    stop, results = threading.Event(), []
+    sessions = []
+    try:
+        for i, (role, email) in enumerate(accounts):
+            pages = _pages(role, args.pages)
+            if not pages:
+                raise SystemExit(f"--pages leaves no page for the {role} role")
+            session = Session(server.url, email, args.password, pages, args.think, args.seed + i, stop, results)
+            session.start()
+            sessions.append(session)
+            # Spread the sign-ins (bcrypt) over the ramp instead of a thundering herd
+            time.sleep(args.ramp / n)
+        for session in sessions:
+            session.signed_in.wait(RERUN_TIMEOUT)
+        failed = [s.error for s in sessions if s.error]
+        if failed:
+            raise SystemExit("Sessions failed before the measurement:\n  " + "\n  ".join(failed[:5]))
+
+        time.sleep(args.warmup)
+        start = time.time()
+        rss = []
+        while time.time() - start < args.duration:
+            rss.append(server.rss_mb())
+            time.sleep(1)
+        end = time.time()
+    finally:
+        stop.set()
+        for session in sessions:
+            session.join(timeout=RERUN_TIMEOUT)
+        # Let the last flush land before the server goes away
+        time.sleep(2)
+        server.stop()
+
+    window = [r for r in results if start <= r[1] < end]
+    page = [ms for kind, _, ms, ok in window if kind == "page" and ok]
+    tick = [ms for kind, _, ms, ok in window if kind == "tick" and ok]
+    stats = fetch_one(SERVER_STATS, {"start": start, "end": end})
+    seconds = end - start
+    return {
+        "sessions": n,
+        "qps": stats["queries"] / seconds,
+        "db_ms_s": float(stats["db_ms"]) / seconds,
+        "waits_s": stats["waits"] / seconds,
+        "wait_p95": float(stats["wait_p95"] or 0),
+        "page_p50": _percentile(page, 50), "page_p95": _percentile(page, 95), "page_p99": _percentile(page, 99),
+        "tick_p50": _percentile(tick, 50), "tick_p95": _percentile(tick, 95), "tick_p99": _percentile(tick, 99),
+        "reruns": len(page) + len(tick),
+        "errors": sum(1 for r in window if not r[3]) + sum(1 for s in sessions if s.error),
+        "rss_mb": max(rss, default=0.0),
+    }
+
+
+HEADER = (f"{'sessions':>8} {'q/s':>8} {'db ms/s':>8} {'waits/s':>8} {'wait p95':>9} "
+          f"{'page p50':>9} {'p95':>7} {'p99':>7} {'tick p50':>9} {'p95':>7} {'p99':>7} {'errors':>7} {'RSS MB':>7}")
+
+
+def _row(r):
+    return (f"{r['sessions']:>8} {r['qps']:>8.1f} {r['db_ms_s']:>8.1f} {r['waits_s']:>8.2f} {r['wait_p95']:>9.1f} "
+            f"{r['page_p50']:>9.0f} {r['page_p95']:>7.0f} {r['page_p99']:>7.0f} "
+            f"{r['tick_p50']:>9.0f} {r['tick_p95']:>7.0f} {r['tick_p99']:>7.0f} {r['errors']:>7} {r['rss_mb']:>7.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", default="10,25,50,100", help="comma-separated session counts, one step each")
+    parser.add_argument("--mix", default="employee=8,manager=1,owner=1", help="share of sessions per role")
+    parser.add_argument("--pages", help="comma-separated url paths to restrict the sessions to (e.g. chat)")
+    parser.add_argument("--think", type=float, default=15, help="mean seconds between page changes")
+    parser.add_argument("--ramp", type=float, default=10, help="seconds to spread the sign-ins over")
+    parser.add_argument("--warmup", type=float, default=10, help="seconds after sign-in before measuring")
+    parser.add_argument("--duration", type=float, default=60, help="measured seconds per step")
+    parser.add_argument("--password", default="bench-password", help="password of the seeded accounts")
+    parser.add_argument("--seed", type=int, default=42, help="seed for the sessions' page choices")
+    parser.add_argument("--slo", type=float, default=1000, help="page p95 (ms) a step must stay under to count as capacity")
+    parser.add_argument("--baseline", default=BASELINE, help="baseline file")
+    parser.add_argument("--save", action="store_true", help="store this run as the baseline")
+    parser.add_argument("--fail-over", type=float, help="exit 1 if q/s or page p95 is this many percent over baseline")
+    args = parser.parse_args()
+    args.pages = set(args.pages.split(",")) if args.pages else None
+
+    warnings.filterwarnings("ignore")
+    logging.disable(logging.WARNING)
+    mix = _mix(args.mix)
+    sizes = table_sizes()
+    setup = {"mix": args.mix, "pages": sorted(args.pages or []), "think": args.think, "duration": args.duration}
+    print("Data: " + ", ".join(f"{k} {v:,}" for k, v in sizes.items()))
+    print(f"Mix {args.mix}, a page change every ~{args.think:g} s, {args.duration:g} s measured per step\n")
+    print(HEADER)
+
+    results = {}
+    for n in sorted({int(s) for s in args.sessions.split(",")}):
+        results[str(n)] = run_step(n, args, mix)
+        print(_row(results[str(n)]), flush=True)
+
+    within = [r["sessions"] for r in results.values() if r["page_p95"] <= args.slo and not r["errors"]]
+    print(f"\nCapacity: {max(within)} sessions with page p95 under {args.slo:g} ms" if within
+          else f"\nNo step kept page p95 under {args.slo:g} ms without errors")
+
+    baseline = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    if baseline and not args.save:
+        if baseline["sizes"] != sizes or baseline["setup"] != setup:
+            print("\n⚠️ The baseline was taken on different data or settings: "
+                  f"{baseline['setup']}, " + ", ".join(f"{k} {v:,}" for k, v in baseline["sizes"].items()))
+        print(f"\nAgainst {os.path.relpath(args.baseline)}:")
+        regressed = []
+        for n, r in results.items():
+            base = baseline["steps"].get(n)
+            if not base:
+                continue
+            print(f"{n:>8} sessions  q/s {base['qps']:>7.1f} -> {r['qps']:>7.1f}  "
+                  f"page p95 {base['page_p95']:>6.0f} -> {r['page_p95']:>6.0f} ms")
+            if args.fail_over is not None and any(
+                    r[k] > base[k] * (1 + args.fail_over / 100) for k in ("qps", "page_p95")):
+                regressed.append(n)
+        if regressed:
+            print(f"❌ Over {args.fail_over:g}% worse at: {', '.join(regressed)} sessions")
+            sys.exit(1)
+
+    if args.save:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        with open(args.baseline, "w") as f:
+            json.dump({"saved_at": time.strftime("%Y-%m-%d %H:%M"), "sizes": sizes, "setup": setup,
+                       "steps": {n: {k: round(v, 2) for k, v in r.items()} for n, r in results.items()}}, f, indent=2)
+        print(f"\nSaved baseline to {os.path.relpath(args.baseline)}")
+
+
+if __name__ == "__main__":
+    main()
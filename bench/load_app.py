@@ -0,0 +1,16 @@
+"""
+app.py as bench/load.py serves it: unchanged, except that the Diagnostics
+buffer is copied into query_metrics every second so the harness can read
+query, pool-wait and render timings from outside the server process.
+
+    streamlit run bench/load_app.py     # started by python -m bench.load, not by hand
+"""
+import os
+
+from src.db import metrics
+
+# Read once, when the first query creates the engine
+metrics.SETTINGS["flush_seconds"] = 1
+
+APP = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "app.py"))
+exec(compile(open(APP).read(), APP, "exec"))
@@ -0,0 +1,141 @@
+"""
+Cold start and per-page navigation time, per role.
+
+Cold start: a fresh interpreter signs in as someone with the role and renders
+app.py once, the way a new server process serves its first session. It reports
+how long the script took and how many src.views / src.services modules it
+imported.
+
+Navigation: one session visits every page of the role in turn, ROUNDS times.
+The first visit includes importing the page's module; the median of the
+rest is the steady-state cost. Queries are counted from the Diagnostics
+buffer (src/db/metrics.py), so they are only this session's.
+
+Times are for the script itself, measured inside it: the test harness adds a
+few hundred milliseconds per session that a real server does not.
+
+    python -m bench.navigation                         # every role
+    python -m bench.navigation --roles owner --rounds 10
+
+Needs a migrated database with at least one user per role (DATABASE_URL or
+secrets.toml). Runs the app through streamlit.testing; no server needed.
+"""
+import argparse
+import json
+import logging
+import os
+import statistics
+import subprocess
+import sys
+import warnings
+from types import SimpleNamespace
+
+from src.db import fetch_one, metrics
+from src.db.statements import statement
+from src.views.navigation import ROLE_PAGES
+
+APP = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "app.py"))
+# Runs app.py unchanged and leaves its run time in session state
+_TIMED_APP = """
+import time
+import streamlit as st
+_start = time.perf_counter()
+try:
+    exec(compile(open({app!r}).read(), {app!r}, "exec"))
+finally:
+    st.session_state["bench_script_ms"] = (time.perf_counter() - _start) * 1000
+"""
+USER_FOR_ROLE = statement("bench.user_for_role", """
+    SELECT id, full_name FROM users WHERE role = :role ORDER BY created_at LIMIT 1
+""")
+
+
+def signed_in(role, url_path=None):
+    """An AppTest session already signed in as the oldest account with `role`, optionally opening a page."""
+    from streamlit.testing.v1 import AppTest
+    from streamlit.util import calc_hash
+
+    user = fetch_one(USER_FOR_ROLE, {"role": role})
+    if user is None:
+        raise SystemExit(f"No {role} account in the database")
+    at = AppTest.from_string(_TIMED_APP.format(app=APP), default_timeout=120)
+    at.session_state["user"] = SimpleNamespace(id=str(user['id']))
+    at.session_state["user_role"] = role
+    at.session_state["user_name"] = user['full_name']
+    at.session_state["authenticated"] = True
+    if url_path:
+        # What a click in the sidebar sends: the hash of the page's url_path
+        at._page_hash = calc_hash(url_path)
+    return at
+
+
+def _app_modules():
+    return {m for m in sys.modules if m.startswith(("src.views", "src.services"))}
+
+
+def cold_start(role):
+    """Runs in a child interpreter: first render only, printed as JSON."""
+    at = signed_in(role)
+    loaded = _app_modules()
+    at.run()
+    if at.exception:
+        raise SystemExit(at.exception[0].value)
+    print(json.dumps({"ms": at.session_state["bench_script_ms"], "modules": len(_app_modules() - loaded)}))
+
+
+def _queries():
+    return sum(1 for e in list(metrics.EVENTS) if e["kind"] == "query")
+
+
+def navigate(role, rounds):
+    """{title: ([ms per visit], [queries per visit])} for one session walking every page."""
+    from streamlit.util import calc_hash
+
+    at = signed_in(role)
+    at.run()
+    visits = {spec.title: ([], []) for spec in ROLE_PAGES[role]}
+    for _ in range(rounds):
+        for spec in ROLE_PAGES[role]:
+            at._page_hash = calc_hash(spec.url_path)
+            before = _queries()
+            at.run()
+            if at.exception:
+                raise SystemExit(f"{spec.title}: {at.exception[0].value}")
+            visits[spec.title][0].append(at.session_state["bench_script_ms"])
+            visits[spec.title][1].append(_queries() - before)
+    return visits
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--roles", default=",".join(ROLE_PAGES), help="comma-separated roles")
+    parser.add_argument("--rounds", type=int, default=5, help="visits per page")
+    parser.add_argument("--cold-runs", type=int, default=3, help="fresh interpreters per role")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    warnings.filterwarnings("ignore")
+    logging.disable(logging.WARNING)
+    if args.child:
+        cold_start(args.child)
+        return
+
+    for role in args.roles.split(","):
+        runs = []
+        for _ in range(args.cold_runs):
+            out = subprocess.run([sys.executable, "-m", "bench.navigation", "--child", role], capture_output=True, text=True)
+            if out.returncode:
+                raise SystemExit(out.stderr)
+            runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+        print(f"\n{role}: cold start {statistics.median(r['ms'] for r in runs):.0f} ms, "
+              f"{runs[0]['modules']} view/service modules imported")
+
+        print(f"{'page':<18} {'first ms':>9} {'p50 ms':>9} {'max ms':>9} {'queries':>8}")
+        for title, (ms, queries) in navigate(role, args.rounds).items():
+            rest = ms[1:] or ms
+            print(f"{title:<18} {ms[0]:>9.1f} {statistics.median(rest):>9.1f} {max(rest):>9.1f} "
+                  f"{statistics.median(queries):>8.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,269 @@
+"""
+Fills an empty, migrated database with a realistic synthetic agency.
+
+At --scale 1 (the default) that is 3,000 staff, 375 clients, about two
+million attendance_logs over three years, two million direct messages,
+500,000 tasks and 300,000 client communications. Rollups are rebuilt
+(payroll hours, sentiment, chat read markers) and the tables analyzed, so
+every page has something real to chew on.
+
+Rows are generated inside Postgres with generate_series, in one
+transaction, from a fixed random seed: the same --seed and --scale give
+the same data. Nothing is written unless the whole load succeeds.
+
+    python -m src.db.migrate up
+    python -m bench.seed                          # full size, a few minutes
+    python -m bench.seed --scale 0.05 --seed 7    # small, for a quick look
+
+Every account, the owner included, gets the same password (--password).
+The owner signs in as owner@bench.example. Refuses to run unless the users
+table is empty, so point DATABASE_URL at a scratch database.
+"""
+import argparse
+import time
+
+from sqlalchemy import text
+
+from src.auth import hash_password
+from src.db import execute, fetch_one, transaction
+from src.db import queries as q
+from src.db.queries import BUSINESS_TZ
+from src.db.statements import statement
+
+DOMAIN = "bench.example"
+# Rows per unit of --scale
+SIZES = {"users": 3000, "clients": 375, "messages": 2_000_000, "tasks": 500_000, "communications": 300_000}
+OFFICES = [("HQ", 30.1881886, 74.3046929, 100.0), ("Studio", 30.2110, 74.9455, 150.0), ("Annex", 30.1865, 74.3071, 80.0)]
+
+FIRST_NAMES = ["Aarav", "Vivaan", "Aditya", "Ishaan", "Kabir", "Rohan", "Arjun", "Sai", "Kunal", "Nikhil",
+               "Ananya", "Diya", "Isha", "Kavya", "Meera", "Nisha", "Priya", "Riya", "Sana", "Tara"]
+LAST_NAMES = ["Sharma", "Verma", "Gupta", "Singh", "Kaur", "Mehta", "Patel", "Reddy", "Nair", "Iyer",
+              "Das", "Bose", "Joshi", "Kapoor", "Malhotra", "Chopra", "Bhat", "Rao", "Gill", "Sethi"]
+TASK_TITLES = ["Weekly report", "Client onboarding call", "Landing page copy", "Workflow audit", "Invoice follow-up",
+               "Automation build", "Bug triage", "Content calendar", "Lead list cleanup", "Proposal draft",
+               "CRM sync check", "Monthly review deck"]
+PHRASES = ["On it, will update by evening.", "Can you check the latest draft?", "Client asked for changes to the flow.",
+           "Done, pushed to the shared folder.", "Running late, in by 10.", "Meeting moved to 3 pm.",
+           "Need access to the dashboard.", "Invoice sent.", "Looks good to me!", "Call me when free."]
+SUMMARIES = ["Client happy with delivery", "Asked for a revised quote", "Complained about response time",
+             "Requested a new automation", "Confirmed next milestone", "Unhappy with last report",
+             "Praised the team", "Payment delayed, apologised"]
+
+
+USER_COUNT = statement("bench.seed.user_count", "SELECT count(*) AS n FROM users")
+
+
+def _sql_array(values) -> str:
+    return "ARRAY[" + ", ".join("'" + v.replace("'", "''") + "'" for v in values) + "]"
+
+
+# Staff share one array of ids so rows can pick a random person cheaply
+_PICK = """
+    staff AS (SELECT array_agg(id ORDER BY created_at) AS ids, count(*) AS n FROM users WHERE role = 'employee'),
+    hubs AS (SELECT array_agg(id ORDER BY created_at) AS ids, count(*) AS n FROM users WHERE role IN ('owner', 'manager')),
+    cl AS (SELECT array_agg(id ORDER BY created_at) AS ids, count(*) AS n FROM clients)
+"""
+
+_USERS = text(f"""
+    INSERT INTO users (full_name, email, password_hash, role, hourly_rate, created_at)
+    SELECT CASE WHEN g = 1 THEN 'Agency Owner'
+                ELSE ({_sql_array(FIRST_NAMES)})[1 + g % {len(FIRST_NAMES)}] || ' ' ||
+                     ({_sql_array(LAST_NAMES)})[1 + (g / {len(FIRST_NAMES)}) % {len(LAST_NAMES)}] END,
+           CASE WHEN g = 1 THEN 'owner' WHEN g <= 1 + :managers THEN 'manager' ELSE 'employee' END
+               || CASE WHEN g = 1 THEN '' ELSE g::text END || '@{DOMAIN}',
+           :pw,
+           CASE WHEN g = 1 THEN 'owner' WHEN g <= 1 + :managers THEN 'manager' ELSE 'employee' END,
+           round((300 + random() * 1200) / 50) * 50,
+           now() - make_interval(days => :days) + make_interval(secs => g)
+    FROM generate_series(1, :users) g
+""")
+
+_CLIENTS = text(f"""
+    INSERT INTO clients (name, email, created_at)
+    SELECT 'Client ' || lpad(g::text, 4, '0'), 'contact' || g || '@client.{DOMAIN}',
+           now() - make_interval(days => :days) + make_interval(secs => g)
+    FROM generate_series(1, :clients) g
+""")
+
+_OFFICE = text("INSERT INTO offices (name, lat, lon, radius_m) VALUES (:name, :lat, :lon, :radius)")
+
+# Weekdays only, ~90% turnout, shifts starting around 09:00 IST; today's shifts are still open
+_ATTENDANCE = text(f"""
+    WITH emp AS (
+        SELECT u.id, o.id AS office_id, o.lat, o.lon
+        FROM (SELECT id, row_number() OVER (ORDER BY created_at) AS n FROM users WHERE role = 'employee') u
+        JOIN (SELECT id, lat, lon, row_number() OVER (ORDER BY name) - 1 AS n, count(*) OVER () AS total FROM offices) o
+          ON o.n = u.n % o.total
+    )
+    INSERT INTO attendance_logs (employee_id, clock_in, clock_out, location_lat, location_long, status, is_verified, office_id)
+    SELECT id, clock_in,
+           CASE WHEN day < current_date THEN clock_in + make_interval(mins => (360 + random() * 240)::int) END,
+           lat + (random() - 0.5) * 0.0012, lon + (random() - 0.5) * 0.0012,
+           CASE WHEN day < current_date THEN 'completed' ELSE 'active' END,
+           random() < 0.95, office_id
+    FROM (
+        SELECT emp.*, d::date AS day,
+               (d::date + interval '9 hours' + (random() - 0.5) * interval '90 minutes') AT TIME ZONE '{BUSINESS_TZ}' AS clock_in
+        FROM emp CROSS JOIN generate_series(current_date - :days, current_date, interval '1 day') d
+        WHERE extract(isodow FROM d) < 6 AND random() < 0.9
+    ) s
+    WHERE clock_in < now()
+""")
+
+# Newer tasks are more common; old ones are almost all done
+_TASKS = text(f"""
+    WITH {_PICK}
+    INSERT INTO tasks (created_at, title, description, status, assigned_to, client_id, due_date, completed_at)
+    SELECT created_at, title, 'Generated task #' || g, status,
+           staff.ids[1 + floor(random() * staff.n)::int], cl.ids[1 + floor(random() * cl.n)::int],
+           (created_at AT TIME ZONE '{BUSINESS_TZ}')::date + (1 + floor(random() * 14))::int,
+           CASE WHEN status = 'done' THEN created_at + random() * interval '5 days' END
+    FROM (
+        SELECT g, created_at, ({_sql_array(TASK_TITLES)})[1 + floor(random() * {len(TASK_TITLES)})::int] AS title,
+               CASE WHEN created_at < now() - interval '30 days' AND random() < 0.95 THEN 'done'
+                    ELSE (ARRAY['todo', 'in_progress', 'done'])[1 + floor(random() * 3)::int] END AS status
+        FROM (SELECT g, now() - random() ^ 2 * make_interval(days => :days) AS created_at
+              FROM generate_series(1, :tasks) g) t
+    ) s, staff, cl
+""")
+
+# Half of all messages go to or from the owner and managers. Senders are skewed
+# towards the oldest accounts, so a few conversations run to thousands of messages.
+_MESSAGES = text(f"""
+    WITH {_PICK}
+    INSERT INTO direct_messages (sender_id, receiver_id, message, created_at)
+    SELECT CASE WHEN flip THEN b ELSE a END, CASE WHEN flip THEN a ELSE b END, message, created_at
+    FROM (
+        SELECT staff.ids[1 + floor(random() ^ 3 * staff.n)::int] AS a,
+               CASE WHEN random() < 0.5 THEN hubs.ids[1 + floor(random() ^ 2 * hubs.n)::int]
+                    ELSE staff.ids[1 + floor(random() * staff.n)::int] END AS b,
+               random() < 0.5 AS flip,
+               ({_sql_array(PHRASES)})[1 + floor(random() * {len(PHRASES)})::int] AS message,
+               now() - random() ^ 3 * make_interval(days => :days) AS created_at
+        FROM generate_series(1, :messages), staff, hubs
+    ) m
+    WHERE a <> b
+""")
+
+_COMMUNICATIONS = text(f"""
+    WITH {_PICK}
+    INSERT INTO communications (client_id, sender_id, message_body, direction, status,
+                                ai_sentiment_score, ai_summary, is_analyzed, created_at)
+    SELECT cl.ids[1 + floor(random() * cl.n)::int], staff.ids[1 + floor(random() * staff.n)::int],
+           ({_sql_array(PHRASES)})[1 + floor(random() * {len(PHRASES)})::int],
+           CASE WHEN random() < 0.6 THEN 'inbound' ELSE 'outbound' END, 'delivered',
+           CASE WHEN analyzed THEN round(1 + 9 * random() ^ 0.6) END,
+           CASE WHEN analyzed THEN ({_sql_array(SUMMARIES)})[1 + floor(random() * {len(SUMMARIES)})::int] END,
+           analyzed, now() - random() ^ 2 * make_interval(days => :days)
+    FROM (SELECT random() < 0.85 AS analyzed FROM generate_series(1, :communications)) g, staff, cl
+""")
+
+# Same backfill as migrations/0009, once, instead of the per-row trigger
+_SENTIMENT_ROLLUP = text(f"""
+    INSERT INTO communication_sentiment_daily (day, sender_id, client_id, messages, score_sum, min_score, low_count)
+    SELECT (created_at AT TIME ZONE '{BUSINESS_TZ}')::date, sender_id, client_id,
+           count(*), sum(ai_sentiment_score), min(ai_sentiment_score),
+           count(*) FILTER (WHERE ai_sentiment_score < 5)
+    FROM communications
+    WHERE is_analyzed AND ai_sentiment_score IS NOT NULL
+    GROUP BY 1, 2, 3
+""")
+
+# Everyone has read their conversations up to some point in the last few days
+_CHAT_READS = text("""
+    INSERT INTO chat_reads (user_id, contact_id, last_read_at)
+    SELECT receiver_id, sender_id, max(created_at) - random() * interval '3 days'
+    FROM direct_messages
+    GROUP BY receiver_id, sender_id
+""")
+
+_TEMPLATES = text("""
+    INSERT INTO task_templates (name, title, description, due_in_days)
+    SELECT t, t, 'Recurring: ' || t, 2 FROM unnest(CAST(:titles AS text[])) t
+""")
+
+# Bulk loads skip the per-row triggers; the rollups above replace them
+_TRIGGERS = [("direct_messages", "trg_direct_messages_notify"), ("communications", "trg_communications_sentiment_rollup")]
+_ANALYZE = ["users", "clients", "offices", "attendance_logs", "attendance_daily_hours", "tasks", "direct_messages",
+            "chat_reads", "communications", "communication_sentiment_daily", "task_templates"]
+
+
+def sizes(scale: float) -> dict:
+    out = {k: max(1, round(v * scale)) for k, v in SIZES.items()}
+    out["users"] = max(out["users"], 10)
+    out["managers"] = max(1, out["users"] // 50)
+    return out
+
+
+def _step(label, run, log):
+    start = time.perf_counter()
+    rows = run()
+    log(f"  {label:<28} {rows if rows is not None else '':>12} {time.perf_counter() - start:>8.1f} s")
+
+
+def seed(scale: float = 1.0, days: int = 1095, seed_value: float = 0.42, password: str = "bench-password", log=print) -> dict:
+    """Generates everything in one transaction. Returns the row counts it aimed for."""
+    if fetch_one(USER_COUNT)["n"]:
+        raise SystemExit("users is not empty; bench.seed only fills a freshly migrated database")
+
+    n = sizes(scale)
+    params = {**n, "days": days, "pw": hash_password(password)}
+    since = time.time() - days * 86400
+    log(f"Seeding {n['users']:,} staff, {n['clients']:,} clients, {days} days of attendance, "
+        f"{n['messages']:,} messages, {n['tasks']:,} tasks, {n['communications']:,} communications")
+
+    with transaction() as tx:
+        tx.execute(text("SET LOCAL statement_timeout = 0"))
+        tx.execute(text("SELECT setseed(:s)"), {"s": seed_value})
+        for table, trigger in _TRIGGERS:
+            tx.execute(text(f"ALTER TABLE {table} DISABLE TRIGGER {trigger}"))
+
+        def run(sql):
+            return lambda: tx.execute(sql, params).rowcount
+
+        _step("users", run(_USERS), log)
+        _step("clients", run(_CLIENTS), log)
+        _step("offices", lambda: sum(tx.execute(_OFFICE, dict(zip(("name", "lat", "lon", "radius"), o))).rowcount for o in OFFICES), log)
+        for parent in ("attendance_logs", "direct_messages"):
+            execute(q.ENSURE_PARTITIONS, {
+                "parent": parent,
+                "from_month": time.strftime("%Y-%m-01", time.gmtime(since)),
+                "to_month": time.strftime("%Y-%m-01", time.gmtime(time.time() + 90 * 86400)),
+            }, tx=tx)
+        _step("attendance_logs", run(_ATTENDANCE), log)
+        _step("attendance_daily_hours", lambda: execute(q.ROLLUP_REBUILD_RANGE, {"start": "0001-01-01", "end": "9999-01-01"}, tx=tx), log)
+        _step("tasks", run(_TASKS), log)
+        _step("direct_messages", run(_MESSAGES), log)
+        _step("chat_reads", run(_CHAT_READS), log)
+        _step("communications", run(_COMMUNICATIONS), log)
+        _step("communication_sentiment_daily", run(_SENTIMENT_ROLLUP), log)
+        _step("task_templates", lambda: tx.execute(_TEMPLATES, {"titles": TASK_TITLES}).rowcount, log)
+
+        for table, trigger in _TRIGGERS:
+            tx.execute(text(f"ALTER TABLE {table} ENABLE TRIGGER {trigger}"))
+
+    def analyze():
+        with transaction() as tx:
+            tx.execute(text("SET LOCAL statement_timeout = 0"))
+            for table in _ANALYZE:
+                tx.execute(text(f"ANALYZE {table}"))
+
+    _step("analyze", analyze, log)
+    return n
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scale", type=float, default=1.0, help="multiplies every row count")
+    parser.add_argument("--days", type=int, default=1095, help="history length")
+    parser.add_argument("--seed", type=float, default=0.42, help="random seed, between -1 and 1")
+    parser.add_argument("--password", default="bench-password", help="password for every account")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    seed(args.scale, args.days, args.seed, args.password)
+    print(f"✅ Done in {time.perf_counter() - start:.0f} s. Sign in as owner@{DOMAIN} / {args.password}")
+
+
+if __name__ == "__main__":
+    main()
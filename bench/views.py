@@ -0,0 +1,285 @@
+"""
+Per-view timings: query, pandas and render time for the heavy pages.
+
+Each view is opened in a fresh signed-in session through streamlit.testing,
+with any clicks it needs (Run Payroll, Kanban, ...) before the measured run.
+While the script runs, a sampler thread looks at its stack every
+millisecond and files each sample under:
+
+    query   inside src/db, SQLAlchemy or the driver (includes building the DataFrame)
+    pandas  pandas / NumPy / pyarrow called from app code
+    render  Streamlit calls, Arrow serialisation of tables included
+    python  everything else in app code
+
+The split is the share of samples times the script's own run time. SQL
+shows the statements the run issued and their summed database time (from
+src/db/metrics.py). The first round also imports the page's module, so it is
+run but not counted. The shared query cache is warm after it, as on a
+running server.
+
+    python -m bench.seed --scale 0.1               # once, on a scratch database
+    python -m bench.views                          # compare with the stored baseline
+    python -m bench.views --save                   # make this run the baseline
+    python -m bench.views payroll chat_owner --rounds 10 --fail-over 25
+
+Baselines are stored with the table sizes they were taken at. Comparing
+against a baseline taken on different data prints a warning.
+"""
+import argparse
+import json
+import logging
+import os
+import statistics
+import sys
+import threading
+import time
+import warnings
+from collections import Counter
+from typing import Callable, NamedTuple
+
+import pandas as pd
+
+from src.db import fetch_all, metrics
+from src.db.statements import statement
+from src.services.jobs import get_job
+from bench.navigation import APP, signed_in
+
+ROOT = os.path.dirname(APP)
+BASELINE = os.path.join(os.path.dirname(__file__), "baselines", "views.json")
+CATEGORIES = ("query", "pandas", "render", "python")
+SAMPLE_SECONDS = 0.001
+
+TABLE_SIZES = statement("bench.table_sizes", """
+    SELECT 'users' AS name, count(*) AS n FROM users
+    UNION ALL SELECT 'attendance_logs', count(*) FROM attendance_logs
+    UNION ALL SELECT 'tasks', count(*) FROM tasks
+    UNION ALL SELECT 'direct_messages', count(*) FROM direct_messages
+    UNION ALL SELECT 'communications', count(*) FROM communications
+""")
+
+
+def _widget(at, kind, label):
+    return next(w for w in getattr(at, kind) if w.label == label)
+
+
+def _last_30_days(at):
+    today = pd.Timestamp.now(tz='Asia/Kolkata').date()
+    at.date_input(key="hist_range").set_value((today - pd.Timedelta(days=30), today))
+
+
+def _last_year(at):
+    today = pd.Timestamp.now(tz='Asia/Kolkata').date()
+    at.date_input(key="shift_range").set_value((today - pd.Timedelta(days=365), today))
+
+
+def _wait_for_job(at, slot, timeout=300):
+    """Payroll runs in a worker process (src/services/jobs.py); the measured run shows its result."""
+    deadline = time.monotonic() + timeout
+    while get_job(at.session_state[slot])["status"] in ("queued", "running"):
+        if time.monotonic() > deadline:
+            raise SystemExit(f"{slot} did not finish in {timeout} s")
+        time.sleep(0.1)
+
+
+def _payroll_year(at):
+    _widget(at, "selectbox", "Period").set_value("Year")
+    at.run()
+    _widget(at, "button", "🧮 Run Payroll").click()
+    at.run()
+    _wait_for_job(at, "payroll_job")
+
+
+def _kanban(at):
+    _widget(at, "radio", "View").set_value("Kanban")
+
+
+def _all_time(at):
+    _widget(at, "selectbox", "Window").set_value("All time")
+
+
+def _show_done(at):
+    _widget(at, "toggle", "Show completed tasks").set_value(True)
+
+
+def _search_chat(at):
+    # A word from one of the seeded phrases: a tenth of the owner's messages match
+    at.text_input(key="chat_search_box").set_value("invoice")
+
+
+class View(NamedTuple):
+    role: str
+    url_path: str
+    # Clicks before the measured run; None measures the page as it first opens
+    steps: Callable = None
+
+
+VIEWS = {
+    "overwatch": View("owner", "overwatch", _last_30_days),
+    "payroll": View("owner", "payroll", _payroll_year),
+    "shift_report": View("owner", "shifts", _last_year),
+    "task_tracker": View("owner", "tracker"),
+    "task_kanban": View("owner", "tracker", _kanban),
+    "ai_insights": View("owner", "insights"),
+    "ai_insights_all_time": View("owner", "insights", _all_time),
+    "my_tasks": View("employee", "tasks", _show_done),
+    "chat_employee": View("employee", "chat"),
+    "chat_owner": View("owner", "chat"),
+    "chat_search": View("owner", "chat", _search_chat),
+}
+
+
+# --- STACK SAMPLING ---
+def _category(frame):
+    """Which bucket the script thread is in, or None if this stack is not running app.py."""
+    callee = None
+    while frame is not None and not frame.f_code.co_filename.startswith(ROOT + os.sep + "src" + os.sep):
+        if frame.f_code.co_filename == APP:
+            break
+        callee = frame.f_code.co_filename
+        frame = frame.f_back
+    if frame is None:
+        return None
+    inner = frame.f_code.co_filename
+    # Only the script thread has app.py at the bottom (not the chat listener, not the flusher)
+    outer = frame
+    while outer is not None and outer.f_code.co_filename != APP:
+        outer = outer.f_back
+    if outer is None:
+        return None
+
+    if inner.startswith(os.path.join(ROOT, "src", "db") + os.sep):
+        return "query"
+    if callee is None:
+        return "python"
+    if any(p in callee for p in ("/sqlalchemy/", "/psycopg2/")):
+        return "query"
+    if "/streamlit/" in callee:
+        return "render"
+    if any(p in callee for p in ("/pandas/", "/numpy/", "/pyarrow/")):
+        return "pandas"
+    return "python"
+
+
+class StackSampler(threading.Thread):
+    """Counts which bucket the running script is in, every SAMPLE_SECONDS."""
+
+    def __init__(self):
+        super().__init__(daemon=True)
+        self.counts = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            for ident, frame in sys._current_frames().items():
+                if ident != self.ident:
+                    category = _category(frame)
+                    if category:
+                        self.counts[category] += 1
+            time.sleep(SAMPLE_SECONDS)
+
+    def stop(self) -> Counter:
+        self._stop_event.set()
+        self.join()
+        return self.counts
+
+
+def measure(view: View) -> dict:
+    """One fresh session: open the page, do its steps, then time one run."""
+    at = signed_in(view.role, view.url_path)
+    if view.steps:
+        at.run()
+        view.steps(at)
+
+    mark = metrics.EVENTS[-1]["seq"] if metrics.EVENTS else 0
+    sampler = StackSampler()
+    sampler.start()
+    at.run()
+    counts = sampler.stop()
+    if at.exception:
+        raise SystemExit(f"{view.url_path}: {at.exception[0].value}")
+
+    total = at.session_state["bench_script_ms"]
+    samples = sum(counts.values()) or 1
+    queries = [e for e in list(metrics.EVENTS) if e["seq"] > mark and e["kind"] == "query"]
+    return {
+        "total": total,
+        **{c: total * counts[c] / samples for c in CATEGORIES},
+        "sql": len(queries),
+        "db": sum(e["duration_ms"] for e in queries),
+    }
+
+
+def run_views(names, rounds: int, log=print) -> dict:
+    """{view: median of each measure over `rounds` runs}, after one uncounted warm-up run."""
+    results = {}
+    for name in names:
+        view = VIEWS[name]
+        measure(view)
+        runs = [measure(view) for _ in range(rounds)]
+        results[name] = {k: statistics.median(r[k] for r in runs) for k in runs[0]}
+        log(_row(name, results[name]))
+    return results
+
+
+def _row(name, r):
+    return (f"{name:<22} {r['total']:>8.1f} {r['query']:>8.1f} {r['pandas']:>8.1f} {r['render']:>8.1f} "
+            f"{r['python']:>8.1f} {r['sql']:>5.0f} {r['db']:>8.1f}")
+
+
+def table_sizes() -> dict:
+    return {r["name"]: int(r["n"]) for r in fetch_all(TABLE_SIZES)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("views", nargs="*", default=list(VIEWS), help=f"any of: {', '.join(VIEWS)}")
+    parser.add_argument("--rounds", type=int, default=5, help="measured runs per view")
+    parser.add_argument("--baseline", default=BASELINE, help="baseline file")
+    parser.add_argument("--save", action="store_true", help="store this run as the baseline")
+    parser.add_argument("--fail-over", type=float, help="exit 1 if any view's total is this many percent over baseline")
+    args = parser.parse_args()
+
+    warnings.filterwarnings("ignore")
+    logging.disable(logging.WARNING)
+    unknown = set(args.views) - set(VIEWS)
+    if unknown:
+        parser.error(f"unknown view(s): {', '.join(sorted(unknown))}")
+    # Let the sampler in between the script's bytecodes
+    sys.setswitchinterval(SAMPLE_SECONDS / 2)
+
+    sizes = table_sizes()
+    print("Data: " + ", ".join(f"{k} {v:,}" for k, v in sizes.items()))
+    print(f"{'view':<22} {'total ms':>8} {'query':>8} {'pandas':>8} {'render':>8} {'python':>8} {'sql':>5} {'db ms':>8}")
+    results = run_views(args.views, args.rounds)
+
+    baseline = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    if baseline and not args.save:
+        if baseline["sizes"] != sizes:
+            print("\n⚠️ The baseline was taken on different data: " + ", ".join(f"{k} {v:,}" for k, v in baseline["sizes"].items()))
+        print(f"\nAgainst {os.path.relpath(args.baseline)}:")
+        regressed = []
+        for name, r in results.items():
+            base = baseline["views"].get(name)
+            if base:
+                print(f"{name:<22} {base['total']:>8.1f} -> {r['total']:>8.1f} ms  "
+                      f"{(r['total'] / base['total'] - 1) * 100:>+5.0f}%")
+                if args.fail_over is not None and r["total"] > base["total"] * (1 + args.fail_over / 100):
+                    regressed.append(name)
+        if regressed:
+            print(f"❌ Over {args.fail_over:g}% slower: {', '.join(regressed)}")
+            sys.exit(1)
+
+    if args.save:
+        os.makedirs(os.path.dirname(args.baseline), exist_ok=True)
+        views = {**(baseline or {}).get("views", {}), **results} if baseline and baseline["sizes"] == sizes else results
+        with open(args.baseline, "w") as f:
+            json.dump({"saved_at": time.strftime("%Y-%m-%d %H:%M"), "sizes": sizes,
+                       "views": {k: {m: round(v, 2) for m, v in r.items()} for k, r in views.items()}}, f, indent=2)
+        print(f"\nSaved baseline to {os.path.relpath(args.baseline)}")
+
+
+if __name__ == "__main__":
+    main()
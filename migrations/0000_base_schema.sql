@@ -0,0 +1,70 @@
+-- Base tables the application expects, as the code uses them today.
+-- Everything later in this directory builds on these.
+--
+-- Safe on an existing database: tables are only created when missing, and
+-- columns added since the first deployments are added if absent.
+-- Needs Postgres 13 or newer (built-in gen_random_uuid()).
+
+CREATE TABLE IF NOT EXISTS public.users (
+    id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+    full_name text,
+    email text,
+    password_hash text,
+    role text CHECK (role IN ('owner', 'manager', 'employee')),
+    hourly_rate numeric DEFAULT 0,
+    created_at timestamptz DEFAULT now()
+);
+
+CREATE TABLE IF NOT EXISTS public.clients (
+    id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+    name text,
+    email text,
+    created_at timestamptz DEFAULT now()
+);
+
+CREATE TABLE IF NOT EXISTS public.attendance_logs (
+    id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+    employee_id uuid REFERENCES public.users(id),
+    clock_in timestamptz DEFAULT now(),
+    clock_out timestamptz,
+    location_lat float,
+    location_long float,
+    status text DEFAULT 'active',  -- active, completed
+    is_verified boolean DEFAULT false,
+    comments text
+);
+
+CREATE TABLE IF NOT EXISTS public.tasks (
+    id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+    created_at timestamptz DEFAULT now(),
+    title text,
+    description text,
+    status text DEFAULT 'todo',  -- todo, in_progress, done
+    assigned_to uuid REFERENCES public.users(id),
+    client_id uuid REFERENCES public.clients(id),
+    due_date date,
+    completed_at timestamptz
+);
+ALTER TABLE public.tasks ADD COLUMN IF NOT EXISTS completed_at timestamptz;
+
+CREATE TABLE IF NOT EXISTS public.direct_messages (
+    id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+    sender_id uuid REFERENCES public.users(id),
+    receiver_id uuid REFERENCES public.users(id),
+    message text,
+    created_at timestamptz DEFAULT now()
+);
+
+-- Client communications; the ai_* columns are filled in by the analysis job
+CREATE TABLE IF NOT EXISTS public.communications (
+    id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+    client_id uuid REFERENCES public.clients(id),
+    sender_id uuid REFERENCES public.users(id),
+    message_body text,
+    direction text,
+    status text,
+    ai_sentiment_score numeric,
+    ai_summary text,
+    is_analyzed boolean DEFAULT false,
+    created_at timestamptz DEFAULT now()
+);
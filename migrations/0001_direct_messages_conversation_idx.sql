@@ -0,0 +1,6 @@
+-- Backs the chat delta sync in src/views/chat_component.py.
+-- Each direction of a conversation is read as (sender_id, receiver_id) ordered
+-- by (created_at, id), for the newest page, the "since cursor" poll and the
+-- "load older" keyset page.
+CREATE INDEX IF NOT EXISTS idx_direct_messages_conversation
+    ON public.direct_messages (sender_id, receiver_id, created_at, id);
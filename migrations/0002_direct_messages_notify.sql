@@ -0,0 +1,17 @@
+-- Push delivery for chat (src/services/chat_notify.py).
+-- Every new direct message is announced on the direct_messages_new channel;
+-- the per-process listener wakes only the two participants' sessions.
+CREATE OR REPLACE FUNCTION public.notify_direct_message() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify(
+        'direct_messages_new',
+        json_build_object('sender_id', NEW.sender_id, 'receiver_id', NEW.receiver_id)::text
+    );
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_direct_messages_notify ON public.direct_messages;
+CREATE TRIGGER trg_direct_messages_notify
+    AFTER INSERT ON public.direct_messages
+    FOR EACH ROW EXECUTE FUNCTION public.notify_direct_message();
@@ -0,0 +1,9 @@
+-- Conversation inbox (src/views/chat_component.py).
+-- One row per (reader, contact): everything the contact sent after
+-- last_read_at counts as unread for the reader.
+CREATE TABLE IF NOT EXISTS public.chat_reads (
+    user_id uuid NOT NULL REFERENCES public.users(id) ON DELETE CASCADE,
+    contact_id uuid NOT NULL REFERENCES public.users(id) ON DELETE CASCADE,
+    last_read_at timestamptz NOT NULL DEFAULT '-infinity',
+    PRIMARY KEY (user_id, contact_id)
+);
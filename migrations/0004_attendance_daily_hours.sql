@@ -0,0 +1,24 @@
+-- Payroll rollup (src/services/payroll.py).
+-- Hours per employee per IST day, maintained by the clock-out statement.
+CREATE TABLE IF NOT EXISTS public.attendance_daily_hours (
+    employee_id uuid NOT NULL REFERENCES public.users(id) ON DELETE CASCADE,
+    work_date date NOT NULL,
+    hours numeric NOT NULL DEFAULT 0,
+    shifts integer NOT NULL DEFAULT 0,
+    PRIMARY KEY (employee_id, work_date)
+);
+
+-- Range payroll reads by date first
+CREATE INDEX IF NOT EXISTS idx_attendance_daily_hours_date
+    ON public.attendance_daily_hours (work_date, employee_id) INCLUDE (hours, shifts);
+
+-- Initial backfill from existing closed shifts
+DELETE FROM public.attendance_daily_hours;
+INSERT INTO public.attendance_daily_hours (employee_id, work_date, hours, shifts)
+SELECT employee_id,
+       (clock_in AT TIME ZONE 'Asia/Kolkata')::date AS work_date,
+       SUM(EXTRACT(EPOCH FROM clock_out - clock_in)) / 3600.0,
+       COUNT(*)
+FROM public.attendance_logs
+WHERE clock_out IS NOT NULL AND employee_id IS NOT NULL
+GROUP BY employee_id, work_date;
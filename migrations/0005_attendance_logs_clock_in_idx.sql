@@ -0,0 +1,6 @@
+-- Attendance history (Overwatch) keyset pages on (clock_in, id), optionally per employee.
+CREATE INDEX IF NOT EXISTS idx_attendance_logs_clock_in
+    ON public.attendance_logs (clock_in, id);
+
+CREATE INDEX IF NOT EXISTS idx_attendance_logs_employee_clock_in
+    ON public.attendance_logs (employee_id, clock_in, id);
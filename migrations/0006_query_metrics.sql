@@ -0,0 +1,15 @@
+-- Optional sink for the Diagnostics ring buffer (src/db/metrics.py).
+-- Only written when [diagnostics] flush_seconds > 0.
+CREATE TABLE IF NOT EXISTS public.query_metrics (
+    id bigserial PRIMARY KEY,
+    recorded_at timestamptz NOT NULL,
+    kind text NOT NULL,          -- query | tx | view
+    name text NOT NULL,          -- statement name / SQL fingerprint / view name
+    view text,
+    session_id text,
+    row_count integer,
+    duration_ms double precision NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_query_metrics_name_time
+    ON public.query_metrics (name, recorded_at);
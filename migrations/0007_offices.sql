@@ -0,0 +1,15 @@
+-- Office sites for the geofence (src/services/geolocation.py).
+-- When no active rows exist the app falls back to [[geofence.offices]] in secrets.toml.
+CREATE TABLE IF NOT EXISTS public.offices (
+    id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+    name text NOT NULL UNIQUE,
+    lat double precision NOT NULL,
+    lon double precision NOT NULL,
+    radius_m double precision NOT NULL DEFAULT 100 CHECK (radius_m > 0),
+    active boolean NOT NULL DEFAULT true,
+    created_at timestamptz NOT NULL DEFAULT now()
+);
+
+-- Which site a shift was clocked in at (NULL for config-defined sites and older rows)
+ALTER TABLE public.attendance_logs
+    ADD COLUMN IF NOT EXISTS office_id uuid REFERENCES public.offices(id) ON DELETE SET NULL;
@@ -0,0 +1,10 @@
+-- Open shifts only: a few hundred rows at most, however long the log grows.
+-- Serves the Time Clock lookup (employee_id) and the Overwatch presence list (clock_in).
+CREATE INDEX IF NOT EXISTS idx_attendance_logs_open_shift
+    ON public.attendance_logs (employee_id, clock_in)
+    WHERE clock_out IS NULL;
+
+CREATE INDEX IF NOT EXISTS idx_attendance_logs_open_by_clock_in
+    ON public.attendance_logs (clock_in)
+    INCLUDE (employee_id, office_id, is_verified)
+    WHERE clock_out IS NULL;
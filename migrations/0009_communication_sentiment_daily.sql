@@ -0,0 +1,79 @@
+-- AI Insights rollup (owner dashboard).
+-- Analyzed message counts and scores per IST day, employee and client, kept
+-- current by a trigger so the headline metrics and leaderboards never read
+-- message bodies. n8n writes scores by UPDATE, so every write path is covered.
+CREATE TABLE IF NOT EXISTS public.communication_sentiment_daily (
+    day date NOT NULL,
+    sender_id uuid,
+    client_id uuid,
+    messages integer NOT NULL,
+    score_sum numeric NOT NULL,
+    min_score numeric NOT NULL,
+    low_count integer NOT NULL   -- scores below 5
+);
+
+CREATE INDEX IF NOT EXISTS idx_communication_sentiment_daily_day
+    ON public.communication_sentiment_daily (day) INCLUDE (sender_id, client_id, messages, score_sum, min_score, low_count);
+
+CREATE INDEX IF NOT EXISTS idx_communication_sentiment_daily_bucket
+    ON public.communication_sentiment_daily (sender_id, client_id, day);
+
+-- The paginated feed walks analyzed rows newest first
+CREATE INDEX IF NOT EXISTS idx_communications_analyzed_feed
+    ON public.communications (created_at DESC, id DESC)
+    WHERE is_analyzed;
+
+-- Bucket recompute reads one employee/client/day
+CREATE INDEX IF NOT EXISTS idx_communications_analyzed_bucket
+    ON public.communications (sender_id, client_id, created_at)
+    WHERE is_analyzed;
+
+-- Recomputes one bucket from the base table. Buckets are tiny, and a recompute
+-- (rather than +/- deltas) keeps min_score exact when scores are changed or removed.
+CREATE OR REPLACE FUNCTION public.refresh_sentiment_bucket(p_day date, p_sender uuid, p_client uuid) RETURNS void AS $$
+BEGIN
+    -- Serialize writers of the same bucket so delete + insert cannot interleave
+    PERFORM pg_advisory_xact_lock(hashtext('sentiment:' || p_day || ':' || coalesce(p_sender::text, '-') || ':' || coalesce(p_client::text, '-')));
+
+    DELETE FROM public.communication_sentiment_daily
+    WHERE day = p_day AND sender_id IS NOT DISTINCT FROM p_sender AND client_id IS NOT DISTINCT FROM p_client;
+
+    INSERT INTO public.communication_sentiment_daily (day, sender_id, client_id, messages, score_sum, min_score, low_count)
+    SELECT p_day, p_sender, p_client, count(*), sum(ai_sentiment_score), min(ai_sentiment_score),
+           count(*) FILTER (WHERE ai_sentiment_score < 5)
+    FROM public.communications
+    WHERE is_analyzed AND ai_sentiment_score IS NOT NULL
+      AND sender_id IS NOT DISTINCT FROM p_sender AND client_id IS NOT DISTINCT FROM p_client
+      AND created_at >= p_day::timestamp AT TIME ZONE 'Asia/Kolkata'
+      AND created_at < (p_day + 1)::timestamp AT TIME ZONE 'Asia/Kolkata'
+    HAVING count(*) > 0;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION public.communications_sentiment_rollup() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.is_analyzed AND OLD.ai_sentiment_score IS NOT NULL THEN
+        PERFORM public.refresh_sentiment_bucket((OLD.created_at AT TIME ZONE 'Asia/Kolkata')::date, OLD.sender_id, OLD.client_id);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.is_analyzed AND NEW.ai_sentiment_score IS NOT NULL THEN
+        PERFORM public.refresh_sentiment_bucket((NEW.created_at AT TIME ZONE 'Asia/Kolkata')::date, NEW.sender_id, NEW.client_id);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trg_communications_sentiment_rollup ON public.communications;
+CREATE TRIGGER trg_communications_sentiment_rollup
+    AFTER INSERT OR DELETE OR UPDATE OF is_analyzed, ai_sentiment_score, sender_id, client_id, created_at
+    ON public.communications
+    FOR EACH ROW EXECUTE FUNCTION public.communications_sentiment_rollup();
+
+-- Initial backfill
+DELETE FROM public.communication_sentiment_daily;
+INSERT INTO public.communication_sentiment_daily (day, sender_id, client_id, messages, score_sum, min_score, low_count)
+SELECT (created_at AT TIME ZONE 'Asia/Kolkata')::date, sender_id, client_id,
+       count(*), sum(ai_sentiment_score), min(ai_sentiment_score),
+       count(*) FILTER (WHERE ai_sentiment_score < 5)
+FROM public.communications
+WHERE is_analyzed AND ai_sentiment_score IS NOT NULL
+GROUP BY 1, 2, 3;
@@ -0,0 +1,18 @@
+-- Task Tracker pages newest first on (created_at, id), optionally filtered by
+-- status, assignee or client; each index matches one filter shape.
+CREATE INDEX IF NOT EXISTS idx_tasks_created
+    ON public.tasks (created_at DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_tasks_status_created
+    ON public.tasks (status, created_at DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_tasks_assignee_status_created
+    ON public.tasks (assigned_to, status, created_at DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_tasks_client_status_created
+    ON public.tasks (client_id, status, created_at DESC, id DESC);
+
+-- Due-date range filters on open work
+CREATE INDEX IF NOT EXISTS idx_tasks_open_due
+    ON public.tasks (due_date)
+    WHERE status <> 'done';
@@ -0,0 +1,4 @@
+-- My Tasks: an employee's open work, soonest due first
+CREATE INDEX IF NOT EXISTS idx_tasks_assignee_open_due
+    ON public.tasks (assigned_to, due_date, created_at)
+    WHERE status <> 'done';
@@ -0,0 +1,4 @@
+-- Bulk onboarding upserts on email (src/services/onboarding.py).
+-- Same name Postgres gives a UNIQUE column constraint, so this is a no-op where one exists.
+CREATE UNIQUE INDEX IF NOT EXISTS users_email_key
+    ON public.users (email);
@@ -0,0 +1,34 @@
+-- Task templates, recurring schedules and idempotent bulk dispatch
+-- (src/services/scheduler.py, owner Task Dispatcher).
+CREATE TABLE IF NOT EXISTS public.task_templates (
+    id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+    name text NOT NULL UNIQUE,
+    title text NOT NULL,
+    description text,
+    due_in_days integer NOT NULL DEFAULT 0 CHECK (due_in_days >= 0),
+    created_at timestamptz NOT NULL DEFAULT now()
+);
+
+CREATE TABLE IF NOT EXISTS public.task_schedules (
+    id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+    template_id uuid NOT NULL REFERENCES public.task_templates(id) ON DELETE CASCADE,
+    frequency text NOT NULL CHECK (frequency IN ('daily', 'weekly', 'monthly')),
+    assignee_ids uuid[] NOT NULL,
+    client_ids uuid[] NOT NULL,
+    next_run date NOT NULL,
+    active boolean NOT NULL DEFAULT true,
+    created_at timestamptz NOT NULL DEFAULT now()
+);
+
+CREATE INDEX IF NOT EXISTS idx_task_schedules_due
+    ON public.task_schedules (next_run)
+    WHERE active;
+
+-- Every bulk or scheduled dispatch carries a key ('batch:<uuid>' or
+-- 'schedule:<id>:<date>'); one task per key, assignee and client, so a
+-- double-submitted form or a re-run schedule inserts nothing new.
+ALTER TABLE public.tasks ADD COLUMN IF NOT EXISTS dispatch_key text;
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_tasks_dispatch_key
+    ON public.tasks (dispatch_key, assigned_to, client_id)
+    WHERE dispatch_key IS NOT NULL;
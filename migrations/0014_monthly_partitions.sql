@@ -0,0 +1,112 @@
+-- Monthly range partitions for attendance_logs (by clock_in) and
+-- direct_messages (by created_at), plus the archive catalogue
+-- (src/services/partitions.py).
+--
+-- Months are IST calendar months. Partitions are named <table>_YYYY_MM, and a
+-- <table>_default partition catches anything outside the created range.
+-- Primary keys become (id, <partition column>), as Postgres requires.
+--
+-- The conversion copies rows, foreign keys, indexes and triggers to the new
+-- parent. It runs once: it is a no-op when the table is already partitioned.
+-- Grants and RLS policies are not copied; re-apply them afterwards if your
+-- database relies on them.
+
+CREATE OR REPLACE FUNCTION public.create_monthly_partitions(parent text, from_month date, to_month date)
+RETURNS integer AS $$
+DECLARE
+    m date := date_trunc('month', from_month)::date;
+    part text;
+    made integer := 0;
+BEGIN
+    WHILE m <= to_month LOOP
+        part := format('%s_%s', parent, to_char(m, 'YYYY_MM'));
+        -- Never recreate a month that has been archived
+        IF to_regclass('public.' || part) IS NULL
+           AND NOT EXISTS (SELECT 1 FROM public.archived_partitions a WHERE a.table_name = parent AND a.month = m) THEN
+            EXECUTE format(
+                'CREATE TABLE public.%I PARTITION OF public.%I FOR VALUES FROM (%L) TO (%L)',
+                part, parent,
+                m::timestamp AT TIME ZONE 'Asia/Kolkata',
+                (m + interval '1 month')::timestamp AT TIME ZONE 'Asia/Kolkata'
+            );
+            made := made + 1;
+        END IF;
+        m := (m + interval '1 month')::date;
+    END LOOP;
+    RETURN made;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION public.partition_by_month(tbl text, col text) RETURNS void AS $$
+DECLARE
+    old_name text := tbl || '_unpartitioned';
+    lo date;
+    def record;
+    saved_fks text[] := '{}';
+    saved_idx text[] := '{}';
+    saved_trg text[] := '{}';
+    stmt text;
+BEGIN
+    IF (SELECT relkind FROM pg_class WHERE oid = ('public.' || tbl)::regclass) = 'p' THEN
+        RETURN;
+    END IF;
+
+    -- Remember everything LIKE does not carry over
+    FOR def IN SELECT pg_get_constraintdef(oid) AS d FROM pg_constraint
+               WHERE conrelid = ('public.' || tbl)::regclass AND contype = 'f' LOOP
+        saved_fks := saved_fks || def.d;
+    END LOOP;
+    FOR def IN SELECT indexdef AS d FROM pg_indexes i
+               JOIN pg_index x ON x.indexrelid = (quote_ident(i.schemaname) || '.' || quote_ident(i.indexname))::regclass
+               WHERE i.schemaname = 'public' AND i.tablename = tbl AND NOT x.indisprimary AND NOT x.indisunique LOOP
+        saved_idx := saved_idx || def.d;
+    END LOOP;
+    FOR def IN SELECT pg_get_triggerdef(oid) AS d FROM pg_trigger
+               WHERE tgrelid = ('public.' || tbl)::regclass AND NOT tgisinternal LOOP
+        saved_trg := saved_trg || def.d;
+    END LOOP;
+
+    EXECUTE format('SELECT (min(%I) AT TIME ZONE ''Asia/Kolkata'')::date FROM public.%I', col, tbl) INTO lo;
+
+    EXECUTE format('ALTER TABLE public.%I RENAME TO %I', tbl, old_name);
+    EXECUTE format('ALTER TABLE public.%I ALTER COLUMN %I SET DEFAULT now()', old_name, col);
+    -- The partition key must be NOT NULL; stray NULLs are parked in the default partition
+    EXECUTE format('UPDATE public.%I SET %I = ''1970-01-01'' WHERE %I IS NULL', old_name, col, col);
+
+    EXECUTE format('CREATE TABLE public.%I (LIKE public.%I INCLUDING DEFAULTS INCLUDING CONSTRAINTS) PARTITION BY RANGE (%I)',
+                   tbl, old_name, col);
+    EXECUTE format('ALTER TABLE public.%I ALTER COLUMN %I SET NOT NULL', tbl, col);
+
+    PERFORM public.create_monthly_partitions(tbl, coalesce(lo, current_date), (current_date + interval '3 months')::date);
+    EXECUTE format('CREATE TABLE public.%I PARTITION OF public.%I DEFAULT', tbl || '_default', tbl);
+
+    EXECUTE format('INSERT INTO public.%I SELECT * FROM public.%I', tbl, old_name);
+    EXECUTE format('DROP TABLE public.%I', old_name);
+
+    -- Keys and indexes are added after the copy (faster) and after the drop (original names).
+    -- Definitions were captured before the rename, so they already name the new parent.
+    EXECUTE format('ALTER TABLE public.%I ADD PRIMARY KEY (id, %I)', tbl, col);
+    FOREACH stmt IN ARRAY saved_fks LOOP
+        EXECUTE format('ALTER TABLE public.%I ADD %s', tbl, stmt);
+    END LOOP;
+    FOREACH stmt IN ARRAY saved_idx LOOP
+        EXECUTE stmt;
+    END LOOP;
+    FOREACH stmt IN ARRAY saved_trg LOOP
+        EXECUTE stmt;
+    END LOOP;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Months moved to Parquet by `python -m src.services.partitions archive`
+CREATE TABLE IF NOT EXISTS public.archived_partitions (
+    table_name text NOT NULL,
+    month date NOT NULL,
+    path text NOT NULL,
+    row_count bigint NOT NULL,
+    archived_at timestamptz NOT NULL DEFAULT now(),
+    PRIMARY KEY (table_name, month)
+);
+
+SELECT public.partition_by_month('attendance_logs', 'clock_in');
+SELECT public.partition_by_month('direct_messages', 'created_at');
@@ -0,0 +1,22 @@
+-- Indexes on foreign-key columns that no existing index leads with.
+--
+-- Deleting a user (Manage Staff) or a client (The Vault) makes Postgres
+-- look up every row that references it. Without these indexes each lookup
+-- scans the whole table (and every monthly partition).
+-- `python -m src.db.explain_check` fails if one of these goes missing.
+
+-- Also serves "messages sent to me" in the chat inbox
+CREATE INDEX IF NOT EXISTS idx_direct_messages_receiver
+    ON public.direct_messages (receiver_id, sender_id, created_at);
+
+CREATE INDEX IF NOT EXISTS idx_communications_client
+    ON public.communications (client_id);
+
+CREATE INDEX IF NOT EXISTS idx_communications_sender
+    ON public.communications (sender_id);
+
+CREATE INDEX IF NOT EXISTS idx_chat_reads_contact
+    ON public.chat_reads (contact_id);
+
+CREATE INDEX IF NOT EXISTS idx_attendance_logs_office
+    ON public.attendance_logs (office_id);
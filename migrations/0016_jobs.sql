@@ -0,0 +1,62 @@
+-- Background jobs for heavy owner operations (src/services/jobs.py).
+-- A finished job is reused for the same kind and parameters while the tables
+-- it read are unchanged, which table_versions tracks below.
+CREATE TABLE IF NOT EXISTS public.jobs (
+    id uuid PRIMARY KEY DEFAULT gen_random_uuid(),
+    kind text NOT NULL,
+    params jsonb NOT NULL,
+    params_hash text NOT NULL,
+    -- table -> table_versions.version when the job was queued; NULL is never reused
+    data_versions jsonb,
+    status text NOT NULL DEFAULT 'queued' CHECK (status IN ('queued', 'running', 'done', 'failed')),
+    progress text,
+    result jsonb,
+    result_path text,
+    error text,
+    -- host:pid of the server process whose worker pool runs it
+    runner text NOT NULL,
+    created_by uuid REFERENCES public.users(id) ON DELETE SET NULL,
+    created_at timestamptz NOT NULL DEFAULT now(),
+    started_at timestamptz,
+    finished_at timestamptz
+);
+
+CREATE INDEX IF NOT EXISTS idx_jobs_reuse
+    ON public.jobs (kind, params_hash, created_at DESC);
+
+CREATE INDEX IF NOT EXISTS idx_jobs_created_by
+    ON public.jobs (created_by);
+
+CREATE INDEX IF NOT EXISTS idx_jobs_unfinished
+    ON public.jobs (runner)
+    WHERE status IN ('queued', 'running');
+
+-- One counter per table, bumped by every statement that writes it (any
+-- process, cron job or psql session). A statement-level trigger costs one
+-- row update per statement, not per row.
+CREATE TABLE IF NOT EXISTS public.table_versions (
+    table_name text PRIMARY KEY,
+    version bigint NOT NULL DEFAULT 0
+);
+
+CREATE OR REPLACE FUNCTION public.bump_table_version() RETURNS trigger AS $$
+BEGIN
+    UPDATE public.table_versions SET version = version + 1 WHERE table_name = TG_TABLE_NAME;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DO $$
+DECLARE
+    t text;
+BEGIN
+    -- The tables background jobs read
+    FOREACH t IN ARRAY ARRAY['attendance_logs', 'attendance_daily_hours', 'users', 'offices'] LOOP
+        INSERT INTO public.table_versions (table_name) VALUES (t) ON CONFLICT DO NOTHING;
+        EXECUTE format('DROP TRIGGER IF EXISTS trg_%s_version ON public.%I', t, t);
+        EXECUTE format('CREATE TRIGGER trg_%s_version
+                            AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON public.%I
+                            FOR EACH STATEMENT EXECUTE FUNCTION public.bump_table_version()', t, t);
+    END LOOP;
+END;
+$$;
@@ -0,0 +1,23 @@
+-- Payroll rollup: hours now belong to the IST day they were worked on. A
+-- shift past midnight is split across both days, with the shift counted on
+-- the day it started (CLOSE_SHIFT / ROLLUP_REBUILD_RANGE in src/db/queries.py).
+--
+-- Re-splits every day that still has raw shifts. Archived months keep the
+-- rollup they were archived with: their raw shifts are gone.
+DELETE FROM public.attendance_daily_hours
+WHERE work_date >= (SELECT (min(clock_in) AT TIME ZONE 'Asia/Kolkata')::date FROM public.attendance_logs);
+
+INSERT INTO public.attendance_daily_hours (employee_id, work_date, hours, shifts)
+SELECT employee_id, d.work_date, SUM(d.hours), SUM(d.shifts)
+FROM public.attendance_logs
+CROSS JOIN LATERAL (
+    SELECT day::date AS work_date,
+           EXTRACT(EPOCH FROM LEAST(clock_out, (day + interval '1 day') AT TIME ZONE 'Asia/Kolkata')
+                            - GREATEST(clock_in, day AT TIME ZONE 'Asia/Kolkata')) / 3600.0 AS hours,
+           (day = date_trunc('day', clock_in AT TIME ZONE 'Asia/Kolkata'))::int AS shifts
+    FROM generate_series(date_trunc('day', clock_in AT TIME ZONE 'Asia/Kolkata'),
+                         GREATEST(clock_in, clock_out - interval '1 microsecond') AT TIME ZONE 'Asia/Kolkata',
+                         interval '1 day') AS day
+) d
+WHERE clock_out IS NOT NULL AND employee_id IS NOT NULL
+GROUP BY employee_id, d.work_date;
@@ -0,0 +1,16 @@
+-- Chat search (src/views/chat_component.py, CHAT_SEARCH_* in src/db/queries.py).
+--
+-- search_vector is the message's English tsvector, kept by Postgres itself:
+-- a stored generated column is filled on every insert and update, and it
+-- reaches every monthly partition, including ones created later. The GIN
+-- index answers "messages containing these words" without reading the
+-- messages themselves, so a search stays fast however long the history is.
+--
+-- Adding the column rewrites direct_messages once (about a minute per few
+-- million rows). Archived months are not searchable: their rows are gone.
+ALTER TABLE public.direct_messages
+    ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (to_tsvector('english', coalesce(message, ''))) STORED;
+
+CREATE INDEX IF NOT EXISTS idx_direct_messages_search
+    ON public.direct_messages USING gin (search_vector);
@@ -0,0 +1,9 @@
+-- Emails are matched without regard to case: sign-in (users.by_email) and the
+-- roster upsert (users.upsert_staff_bulk) both go through lower(email), so
+-- "Bob@x" in a roster updates the existing "bob@x" instead of adding a second
+-- account.
+--
+-- Fails if two accounts already differ only by case; merge or delete one of
+-- them (Manage Staff) and run the migration again.
+CREATE UNIQUE INDEX IF NOT EXISTS users_email_lower_key
+    ON public.users (lower(email));
@@ -0,0 +1,13 @@
+-- Recurring schedules count every occurrence from the first run
+-- (src/services/scheduler.py): occurrence k is anchor_date + k steps, so a
+-- monthly schedule anchored on the 31st runs on the last day of short months
+-- and goes back to the 31st afterwards instead of drifting to the 28th.
+--
+-- Existing schedules are anchored on their current next_run. A monthly one
+-- that already drifted keeps its drifted day; recreate it to restore the
+-- original one.
+ALTER TABLE public.task_schedules ADD COLUMN IF NOT EXISTS anchor_date date;
+
+UPDATE public.task_schedules SET anchor_date = next_run WHERE anchor_date IS NULL;
+
+ALTER TABLE public.task_schedules ALTER COLUMN anchor_date SET NOT NULL;
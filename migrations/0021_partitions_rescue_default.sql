@@ -0,0 +1,64 @@
+-- create_monthly_partitions() for months whose rows already sit in
+-- <table>_default, e.g. after `partitions ensure` missed a few monthly runs.
+--
+-- Postgres refuses to create a partition while the default partition holds
+-- rows that belong to it, so every later ensure failed. Now, for such a month,
+-- the default partition is detached, the month is created, the rows are moved
+-- into it and the default partition is attached again, all in the caller's
+-- transaction. Detaching locks the parent table, so writes wait until the
+-- move commits; months with nothing in the default partition work as before.
+CREATE OR REPLACE FUNCTION public.create_monthly_partitions(parent text, from_month date, to_month date)
+RETURNS integer AS $$
+DECLARE
+    m date := date_trunc('month', from_month)::date;
+    part text;
+    def text := parent || '_default';
+    key text;
+    cols text;
+    lo timestamptz;
+    hi timestamptz;
+    stray boolean;
+    made integer := 0;
+BEGIN
+    SELECT a.attname INTO key
+    FROM pg_partitioned_table p
+    JOIN pg_attribute a ON a.attrelid = p.partrelid AND a.attnum = p.partattrs[0]
+    WHERE p.partrelid = ('public.' || parent)::regclass;
+
+    -- Generated columns (direct_messages.search_vector) are recomputed, not copied
+    SELECT string_agg(quote_ident(attname), ', ' ORDER BY attnum) INTO cols
+    FROM pg_attribute
+    WHERE attrelid = ('public.' || parent)::regclass AND attnum > 0 AND NOT attisdropped AND attgenerated = '';
+
+    WHILE m <= to_month LOOP
+        part := format('%s_%s', parent, to_char(m, 'YYYY_MM'));
+        lo := m::timestamp AT TIME ZONE 'Asia/Kolkata';
+        hi := (m + interval '1 month')::timestamp AT TIME ZONE 'Asia/Kolkata';
+        -- Never recreate a month that has been archived
+        IF to_regclass('public.' || part) IS NULL
+           AND NOT EXISTS (SELECT 1 FROM public.archived_partitions a WHERE a.table_name = parent AND a.month = m) THEN
+            stray := false;
+            IF to_regclass('public.' || def) IS NOT NULL THEN
+                EXECUTE format('SELECT EXISTS (SELECT 1 FROM public.%I WHERE %I >= %L AND %I < %L)', def, key, lo, key, hi)
+                    INTO stray;
+            END IF;
+
+            IF stray THEN
+                EXECUTE format('ALTER TABLE public.%I DETACH PARTITION public.%I', parent, def);
+            END IF;
+            EXECUTE format('CREATE TABLE public.%I PARTITION OF public.%I FOR VALUES FROM (%L) TO (%L)', part, parent, lo, hi);
+            IF stray THEN
+                EXECUTE format(
+                    'WITH moved AS (DELETE FROM public.%I WHERE %I >= %L AND %I < %L RETURNING %s) '
+                    'INSERT INTO public.%I (%s) SELECT %s FROM moved',
+                    def, key, lo, key, hi, cols, part, cols, cols
+                );
+                EXECUTE format('ALTER TABLE public.%I ATTACH PARTITION public.%I DEFAULT', parent, def);
+            END IF;
+            made := made + 1;
+        END IF;
+        m := (m + interval '1 month')::date;
+    END LOOP;
+    RETURN made;
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,15 @@
+-- Which conversations each archived direct_messages month holds
+-- (src/services/partitions.py), so a chat thread only offers "Load older"
+-- past its live rows when that pair actually has archived messages.
+-- Pairs are stored as (least, greatest) of the two user ids.
+CREATE TABLE IF NOT EXISTS public.archived_conversations (
+    user_a uuid NOT NULL,
+    user_b uuid NOT NULL,
+    month date NOT NULL,
+    PRIMARY KEY (user_a, user_b, month)
+);
+
+-- Months archived before this table existed have no pairs recorded; they count
+-- as holding every conversation. Months archived from now on record theirs.
+ALTER TABLE public.archived_partitions ADD COLUMN IF NOT EXISTS conversations_indexed boolean NOT NULL DEFAULT false;
+ALTER TABLE public.archived_partitions ALTER COLUMN conversations_indexed SET DEFAULT true;
@@ -0,0 +1,4 @@
+-- query_metrics.kind also takes 'pool' (a checkout that waited for a free
+-- connection, src/db/metrics.py). 0006 is applied and checksummed, so its
+-- inline comment stays as it was and the column comment records the full list.
+COMMENT ON COLUMN public.query_metrics.kind IS 'query | tx | view | pool';
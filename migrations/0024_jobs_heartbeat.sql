@@ -0,0 +1,5 @@
+-- A running job's worker stamps heartbeat_at every few seconds
+-- (src/services/jobs.py). A running job whose heartbeat has stopped lost its
+-- worker (killed, out of memory, host gone): it is no longer reused and is
+-- marked failed the next time a page looks at it.
+ALTER TABLE public.jobs ADD COLUMN IF NOT EXISTS heartbeat_at timestamptz;
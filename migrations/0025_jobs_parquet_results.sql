@@ -0,0 +1,8 @@
+-- Job results are written as Parquet now (src/services/jobs.py); the pickle
+-- files older jobs left behind are never read again. Those jobs are marked
+-- failed so they are not reused, and the usual prune deletes them and their files.
+UPDATE public.jobs
+SET status = 'failed',
+    error = 'Result format changed; run it again',
+    finished_at = coalesce(finished_at, now())
+WHERE status = 'done' AND result_path LIKE '%.pkl';
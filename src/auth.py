@@ -1,6 +1,8 @@
 import streamlit as st
 import bcrypt
-from sqlalchemy import text
+from src.db import execute, fetch_one
+from src.db import queries as q
+from src.services.passwords import get_hash_pool
 
 def init_session():
     """Initializes default session state variables on first load."""
@@ -14,21 +16,33 @@ def init_session():
         st.session_state.user_name = None
 
 def hash_password(password: str) -> str:
-    salt = bcrypt.gensalt()
-    return bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
+    """Hashes on the shared bcrypt pool at the configured work factor."""
+    return get_hash_pool().hash(password)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
+    ok, _ = get_hash_pool().verify(plain_password, hashed_password)
+    return ok
+
+def _upgrade_hash(user_id, password, old_hash, rounds):
+    """Runs on a pool worker: re-hashes at the current cost and swaps it in if unchanged."""
+    new_hash = bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds)).decode('utf-8')
+    execute(q.UPGRADE_PASSWORD_HASH, {"id": user_id, "new_hash": new_hash, "old_hash": old_hash})
 
 def authenticate_user(email, password):
     """Verifies credentials against Postgres and sets up the session."""
-    conn = st.connection("postgresql", type="sql")
-    
-    with conn.session as s:
-        sql = "SELECT id, full_name, email, password_hash, role FROM users WHERE email = :email"
-        user = s.execute(text(sql), {"email": email}).mappings().fetchone()
-        
-    if user and verify_password(password, user["password_hash"]):
+    pool = get_hash_pool()
+    user = fetch_one(q.USER_BY_EMAIL, {"email": email})
+
+    # Unknown email: answer in about the time a real check takes, without burning a bcrypt worker
+    if not user or not user["password_hash"]:
+        return pool.reject_unknown(password)
+
+    ok, needs_rehash = pool.verify(password, user["password_hash"])
+    if ok and needs_rehash:
+        # Work factor changed since this hash was made; upgrade it without delaying the login
+        pool.submit(_upgrade_hash, user["id"], password, user["password_hash"], pool.rounds)
+
+    if ok:
         class SessionUser: 
             pass
         
@@ -0,0 +1,3 @@
+from src.db.engine import get_engine
+from src.db.statements import STATEMENTS, Statement, statement
+from src.db.access import copy_binary, execute, fetch_all, fetch_one, read_df, transaction
@@ -0,0 +1,137 @@
+"""Typed read/write helpers. Views call these instead of touching connections directly."""
+import io
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator, Mapping, Optional
+
+import pandas as pd
+import streamlit as st
+from sqlalchemy.engine import Connection
+
+from src.db.cache import CACHE, cache_key
+from src.db.engine import get_engine
+from src.db.metrics import record, timed_tx
+from src.db.statements import Statement
+
+Params = Optional[Mapping[str, Any]]
+
+
+@contextmanager
+def transaction() -> Iterator[Connection]:
+    """
+    One pooled connection inside BEGIN ... COMMIT (ROLLBACK if the block raises).
+    Tables written inside are invalidated in the query cache once the commit has happened.
+    """
+    with get_engine().begin() as tx, timed_tx(tx):
+        tx.info["cache_writes"] = set()
+        try:
+            yield tx
+        finally:
+            written = tx.info.pop("cache_writes")
+    CACHE.bump(written)
+
+
+def _note_writes(stmt: Statement, conn: Connection):
+    """Remembers the tables a write touched; transaction() bumps them after COMMIT."""
+    if stmt.writes and "cache_writes" in conn.info:
+        conn.info["cache_writes"].update(stmt.writes)
+
+
+def _read_df(stmt: Statement, params: Params) -> pd.DataFrame:
+    with get_engine().connect() as c:
+        return pd.read_sql(stmt.clause, c, params=dict(params or {}))
+
+
+# st.cache_data fixes ttl at decoration time, so keep one cached reader per ttl
+_cached_readers = {}
+
+
+def _cached_reader(ttl: int):
+    if ttl not in _cached_readers:
+        def _read(name: str, params: tuple) -> pd.DataFrame:
+            from src.db.statements import STATEMENTS
+            return _read_df(STATEMENTS[name], dict(params))
+        # cache_data keys a function by module, qualname and source, which every _read
+        # shares; without a distinct name the readers for different ttls share one cache
+        _read.__qualname__ = f"{_read.__qualname__}_ttl_{ttl}"
+        _cached_readers[ttl] = st.cache_data(ttl=ttl, show_spinner=False)(_read)
+    return _cached_readers[ttl]
+
+
+def read_df(stmt: Statement, params: Params = None, ttl: int = 0, cached: bool = False) -> pd.DataFrame:
+    """
+    Runs a read and returns a DataFrame.
+    cached=True shares the result across sessions until one of its tables is written (src/db/cache.py);
+    ttl > 0 shares it for that many seconds regardless of writes.
+    """
+    if cached:
+        key = cache_key(stmt.name, params)
+        tables = sorted(stmt.reads)
+        df = CACHE.get(key, tables)
+        if df is None:
+            versions = CACHE.versions(tables)
+            df = _read_df(stmt, params)
+            CACHE.put(key, versions, df)
+        return df
+    if ttl:
+        key = tuple(sorted((k, tuple(v) if isinstance(v, list) else v) for k, v in (params or {}).items()))
+        return _cached_reader(ttl)(stmt.name, key)
+    return _read_df(stmt, params)
+
+
+def copy_binary(stmt: Statement, params: Params = None) -> bytes:
+    """
+    Runs a read as COPY (...) TO STDOUT in PostgreSQL's binary format and returns the raw stream.
+    For whole-column reads too large for read_df: values are never formatted as text on
+    the server or parsed into Python objects here. Decode with np.frombuffer.
+    """
+    engine = get_engine()
+    compiled = stmt.clause.compile(dialect=engine.dialect)
+    start = time.perf_counter()
+    with engine.connect() as c:
+        cursor = c.connection.cursor()
+        select = cursor.mogrify(compiled.string, compiled.construct_params(dict(params or {})))
+        out = io.BytesIO()
+        cursor.copy_expert(b"COPY (" + select + b") TO STDOUT WITH (FORMAT binary)", out)
+        rows = cursor.rowcount
+    # COPY bypasses the engine's cursor hooks, so it is recorded here
+    record("query", stmt.name, (time.perf_counter() - start) * 1000, rows)
+    return out.getvalue()
+
+
+@contextmanager
+def _using(tx: Optional[Connection]) -> Iterator[Connection]:
+    """The caller's transaction if given, else a short-lived pooled connection."""
+    if tx is not None:
+        yield tx
+    else:
+        with get_engine().connect() as c:
+            yield c
+
+
+def fetch_one(stmt: Statement, params: Params = None, tx: Optional[Connection] = None) -> Optional[dict]:
+    """First row as a dict, or None."""
+    with _using(tx) as c:
+        _note_writes(stmt, c)
+        row = c.execute(stmt.clause, dict(params or {})).mappings().first()
+        return dict(row) if row else None
+
+
+def fetch_all(stmt: Statement, params: Params = None, tx: Optional[Connection] = None) -> list:
+    """All rows as a list of dicts."""
+    with _using(tx) as c:
+        _note_writes(stmt, c)
+        return [dict(r) for r in c.execute(stmt.clause, dict(params or {})).mappings()]
+
+
+def execute(stmt: Statement, params: Params = None, tx: Optional[Connection] = None) -> int:
+    """
+    Runs a write and returns the affected row count.
+    Without tx it commits on its own; pass tx to join a larger transaction().
+    """
+    if tx is not None:
+        _note_writes(stmt, tx)
+        return tx.execute(stmt.clause, dict(params or {})).rowcount
+    with transaction() as own_tx:
+        _note_writes(stmt, own_tx)
+        return own_tx.execute(stmt.clause, dict(params or {})).rowcount
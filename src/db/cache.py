@@ -0,0 +1,117 @@
+"""
+Shared read cache, invalidated by per-table version counters.
+
+Every Statement knows which tables it reads and writes (parsed from its SQL,
+see src/db/statements.py). read_df(stmt, params, cached=True) keys results on
+statement name + parameters and remembers the version of each table it read.
+Every write that goes through execute()/fetch_*() bumps its tables' versions
+once its transaction commits, so the next cached read of those tables misses
+and goes to the database. Nothing is served stale after a write made by this
+server process, however long it sits in the cache.
+
+Writes from elsewhere (cron jobs, other app servers, psql) do not bump the
+counters, so entries also expire after max_age_seconds. Entries are evicted
+least-recently-used beyond max_entries, and frames longer than max_rows are
+never cached.
+
+Tuning in secrets.toml:
+    [cache]
+    max_entries = 512       # cached results kept per server process
+    max_rows = 20000        # larger results are not cached
+    max_age_seconds = 300   # upper bound on staleness for writes made outside this process
+"""
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+import streamlit as st
+
+DEFAULT_SETTINGS = {"max_entries": 512, "max_rows": 20000, "max_age_seconds": 300}
+
+
+def load_settings() -> dict:
+    try:
+        return {**DEFAULT_SETTINGS, **dict(st.secrets.get("cache", {}))}
+    except FileNotFoundError:
+        return dict(DEFAULT_SETTINGS)
+
+
+class QueryCache:
+    """LRU of DataFrames, each tagged with the table versions it was read at."""
+
+    def __init__(self, max_entries: int, max_rows: int, max_age: float):
+        self.max_entries = max_entries
+        self.max_rows = max_rows
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (versions, stored_at, frame)
+        self._versions = {}
+        self.hits = self.misses = self.stale = self.evictions = 0
+
+    def versions(self, tables) -> tuple:
+        """Current version of each table; take this *before* running the query."""
+        with self._lock:
+            return tuple(self._versions.get(t, 0) for t in tables)
+
+    def get(self, key, tables):
+        """The cached frame (a cheap copy-on-write copy), or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            versions, stored_at, frame = entry
+            current = tuple(self._versions.get(t, 0) for t in tables)
+            if versions != current or time.monotonic() - stored_at > self.max_age:
+                del self._entries[key]
+                self.stale += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        return frame.copy(deep=False)
+
+    def put(self, key, versions: tuple, frame: pd.DataFrame):
+        """Stores a result under the versions read before the query ran, so a write racing the read wins."""
+        if len(frame) > self.max_rows:
+            return
+        with self._lock:
+            self._entries[key] = (versions, time.monotonic(), frame.copy(deep=False))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def bump(self, tables):
+        """Invalidates every cached result that read any of these tables."""
+        if not tables:
+            return
+        with self._lock:
+            for t in tables:
+                self._versions[t] = self._versions.get(t, 0) + 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses + self.stale
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "stale": self.stale,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "versions": dict(self._versions),
+            }
+
+
+SETTINGS = load_settings()
+CACHE = QueryCache(int(SETTINGS["max_entries"]), int(SETTINGS["max_rows"]), float(SETTINGS["max_age_seconds"]))
+
+
+def cache_key(name: str, params) -> tuple:
+    """Hashable key for a statement + parameters (lists become tuples)."""
+    return (name, tuple(sorted((k, tuple(v) if isinstance(v, list) else v) for k, v in (params or {}).items())))
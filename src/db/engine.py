@@ -0,0 +1,80 @@
+"""
+The one SQLAlchemy engine (and connection pool) per Streamlit server process.
+
+Connection URL comes from the same place st.connection read it before:
+    [connections.postgresql]
+    url = "postgresql://..."
+
+DATABASE_URL in the environment wins, so command-line tools can point
+elsewhere without a secrets file. Pool tuning lives in its own section:
+    [db]
+    pool_size = 10               # persistent connections kept open
+    max_overflow = 20            # extra connections allowed under bursts
+    pool_timeout = 10            # seconds to wait for a free connection before failing
+    pool_recycle = 1800          # seconds before a connection is replaced
+    statement_timeout_ms = 15000 # server-side cap per statement (0 = off)
+    lock_timeout_ms = 5000       # server-side cap on waiting for row locks (0 = off)
+"""
+import os
+
+import streamlit as st
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
+
+from src.db import metrics
+
+DEFAULT_SETTINGS = {
+    "pool_size": 10,
+    "max_overflow": 20,
+    "pool_timeout": 10,
+    "pool_recycle": 1800,
+    "statement_timeout_ms": 15000,
+    "lock_timeout_ms": 5000,
+}
+
+
+def _secrets_section(name: str) -> dict:
+    try:
+        return dict(st.secrets.get(name, {}))
+    except FileNotFoundError:
+        return {}
+
+
+def database_url() -> str:
+    """DATABASE_URL if set, else [connections.postgresql] url from secrets.toml."""
+    url = os.environ.get("DATABASE_URL")
+    if url:
+        return url
+    return _secrets_section("connections")["postgresql"]["url"]
+
+
+def load_settings() -> dict:
+    """Pool/timeout settings: defaults overlaid with the [db] secrets section."""
+    return {**DEFAULT_SETTINGS, **_secrets_section("db")}
+
+
+@st.cache_resource(show_spinner=False)
+def get_engine() -> Engine:
+    """Creates the shared engine on first use; every later call returns the same one."""
+    settings = load_settings()
+
+    # Timeouts are applied per connection by libpq, so they hold for every statement
+    options = []
+    if settings["statement_timeout_ms"]:
+        options.append(f"-c statement_timeout={int(settings['statement_timeout_ms'])}")
+    if settings["lock_timeout_ms"]:
+        options.append(f"-c lock_timeout={int(settings['lock_timeout_ms'])}")
+
+    engine = create_engine(
+        database_url(),
+        pool_size=int(settings["pool_size"]),
+        max_overflow=int(settings["max_overflow"]),
+        pool_timeout=float(settings["pool_timeout"]),
+        pool_recycle=int(settings["pool_recycle"]),
+        pool_pre_ping=True,
+        poolclass=metrics.TimedQueuePool,
+        connect_args={"options": " ".join(options)} if options else {},
+    )
+    metrics.install_query_hooks(engine)
+    metrics.start_flusher(engine)
+    return engine
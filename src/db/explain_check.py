@@ -0,0 +1,151 @@
+"""
+EXPLAIN regression check for the hot queries.
+
+Plans every statement in HOT_QUERIES with sample parameters and fails when
+any of them reads one of the BIG_TABLES (or their monthly partitions) with a
+sequential scan. Sequential scans are priced out of the plan while checking
+(enable_seqscan = off), so the check does not depend on how much data the
+database holds: a seq scan that survives means no index can serve the query.
+
+It also fails on a foreign key from a big table with no index leading on its
+column. Deleting a user or client checks every such key, and EXPLAIN never
+shows those checks.
+
+Run it against a migrated local database after changing a query or a
+migration:
+    DATABASE_URL=postgresql://localhost/agency_os python -m src.db.explain_check
+    python -m src.db.explain_check chat.inbox_staff     # print one plan
+
+Exit status is 1 on any regression, so CI can run it as a test.
+"""
+import json
+import re
+import sys
+from datetime import date, datetime, timedelta, timezone
+
+from sqlalchemy import text
+
+from src.db import queries as q
+from src.db.engine import get_engine
+
+# Tables that grow without bound; small lookup tables (users, clients, offices, ...) may be scanned
+BIG_TABLES = {
+    "attendance_logs", "attendance_daily_hours", "direct_messages", "chat_reads",
+    "tasks", "communications", "communication_sentiment_daily", "query_metrics",
+}
+
+_SAMPLE_ID = "00000000-0000-0000-0000-000000000001"
+_OTHER_ID = "00000000-0000-0000-0000-000000000002"
+_NOW = datetime.now(timezone.utc)
+_TODAY = date.today()
+_WEEK_AGO = _NOW - timedelta(days=7)
+# Start of last month, as hot_floor() in src/services/partitions.py computes it by default
+_HOT_FLOOR = datetime.combine(_TODAY.replace(day=1) - timedelta(days=1), datetime.min.time(), timezone.utc).replace(day=1)
+
+# Statement -> parameters typical of the page that runs it
+HOT_QUERIES = [
+    (q.OPEN_SHIFT, {"uid": _SAMPLE_ID, "since": _HOT_FLOOR, "until": None}),
+    (q.CLOSE_SHIFT, {"id": _SAMPLE_ID, "comment": ""}),
+    (q.LIVE_PRESENCE, {"since": _HOT_FLOOR, "until": None}),
+    (q.RECENT_ACTIVITY, {}),
+    (q.HISTORY_PAGE, {"start_ts": _WEEK_AGO, "end_ts": _NOW, "emp_ids": None, "status": None,
+                      "cur_ts": None, "cur_id": None, "limit": 51}),
+    (q.HISTORY_PAGE, {"start_ts": _WEEK_AGO, "end_ts": _NOW, "emp_ids": [_SAMPLE_ID], "status": "completed",
+                      "cur_ts": _NOW, "cur_id": _SAMPLE_ID, "limit": 51}),
+    (q.HISTORY_TOTALS, {"start_ts": _WEEK_AGO, "end_ts": _NOW, "emp_ids": None, "status": None}),
+    (q.SHIFT_INTERVALS, {"start_ts": _WEEK_AGO, "end_ts": _NOW}),
+    (q.MY_SHIFTS, {"uid": _SAMPLE_ID, "start_ts": _WEEK_AGO}),
+    (q.PAYROLL_BY_RANGE, {"start": _TODAY - timedelta(days=30), "end": _TODAY}),
+    (q.EXPORT_SHIFTS, {"start_ts": _WEEK_AGO, "end_ts": _NOW, "emp_ids": None}),
+    (q.TASK_TRACKER_PAGE, {"status": None, "client_id": None, "assignee_id": None, "due_from": None,
+                           "due_to": None, "cur_ts": None, "cur_id": None, "limit": 51}),
+    (q.TASK_TRACKER_PAGE, {"status": "todo", "client_id": None, "assignee_id": _SAMPLE_ID, "due_from": None,
+                           "due_to": None, "cur_ts": _NOW, "cur_id": _SAMPLE_ID, "limit": 51}),
+    (q.TASK_TRACKER_PAGE, {"status": "done", "client_id": _SAMPLE_ID, "assignee_id": None, "due_from": None,
+                           "due_to": None, "cur_ts": None, "cur_id": None, "limit": 11}),
+    (q.MY_OPEN_TASKS, {"uid": _SAMPLE_ID}),
+    (q.MY_DONE_TASKS_PAGE, {"uid": _SAMPLE_ID, "cur_ts": None, "cur_id": None, "limit": 21}),
+    (q.COMPLETE_TASKS, {"ids": [_SAMPLE_ID], "uid": _SAMPLE_ID}),
+    (q.INSIGHTS_FEED, {"start_ts": _WEEK_AGO, "low_only": False, "cur_ts": None, "cur_id": None, "limit": 21}),
+    (q.INSIGHTS_FEED, {"start_ts": _WEEK_AGO, "low_only": True, "cur_ts": None, "cur_id": None, "limit": 21}),
+    (q.INSIGHTS_TOTALS, {"start_day": _TODAY - timedelta(days=30)}),
+    (q.INSIGHTS_BY_EMPLOYEE, {"start_day": _TODAY - timedelta(days=30)}),
+    (q.INSIGHTS_BY_CLIENT, {"start_day": _TODAY - timedelta(days=30)}),
+    (q.CHAT_LATEST, {"my_id": _SAMPLE_ID, "receiver_id": _OTHER_ID, "limit": 50, "since": _HOT_FLOOR}),
+    (q.CHAT_OLDER, {"my_id": _SAMPLE_ID, "receiver_id": _OTHER_ID, "before_ts": _NOW, "before_id": _SAMPLE_ID, "limit": 50}),
+    (q.CHAT_SINCE, {"my_id": _SAMPLE_ID, "receiver_id": _OTHER_ID, "since_ts": _NOW}),
+    (q.CHAT_FROM, {"my_id": _SAMPLE_ID, "receiver_id": _OTHER_ID, "from_ts": _WEEK_AGO, "from_id": _SAMPLE_ID, "limit": 50}),
+    (q.CHAT_SEARCH_STAFF, {"my_id": _SAMPLE_ID, "query": "invoice", "limit": 20, "offset": 0}),
+    (q.CHAT_SEARCH_EMPLOYEE, {"my_id": _SAMPLE_ID, "query": "latest draft", "limit": 20, "offset": 20}),
+    (q.CHAT_INBOX_STAFF, {"my_id": _SAMPLE_ID, "unread_cap": 100, "since": _HOT_FLOOR}),
+    (q.CHAT_INBOX_EMPLOYEE, {"my_id": _SAMPLE_ID, "unread_cap": 100, "since": _HOT_FLOOR}),
+    (q.CHAT_MARK_READ, {"my_id": _SAMPLE_ID, "contact_id": _OTHER_ID, "read_at": _NOW}),
+]
+
+# Single-column foreign keys on parent tables with no full index leading on that column
+_UNINDEXED_FKS = text("""
+    SELECT c.conrelid::regclass::text AS table_name, a.attname AS column_name
+    FROM pg_constraint c
+    JOIN pg_class t ON t.oid = c.conrelid
+    JOIN pg_attribute a ON a.attrelid = c.conrelid AND a.attnum = c.conkey[1]
+    WHERE c.contype = 'f' AND cardinality(c.conkey) = 1
+      AND NOT t.relispartition
+      AND t.relname = ANY(:tables)
+      AND NOT EXISTS (
+          SELECT 1 FROM pg_index i
+          WHERE i.indrelid = c.conrelid AND i.indkey[0] = c.conkey[1] AND i.indpred IS NULL
+      )
+    ORDER BY 1, 2
+""")
+
+_PARTITION_SUFFIX = re.compile(r"_(\d{4}_\d{2}|default)$")
+
+
+def _seq_scans(node: dict):
+    """Big tables read by a Seq Scan anywhere in the plan tree."""
+    found = []
+    if node.get("Node Type") == "Seq Scan":
+        table = _PARTITION_SUFFIX.sub("", node.get("Relation Name", ""))
+        if table in BIG_TABLES:
+            found.append(table)
+    for child in node.get("Plans", []):
+        found += _seq_scans(child)
+    return found
+
+
+def explain(stmt, params: dict, conn) -> dict:
+    """The JSON plan of one statement with these parameters (not executed)."""
+    plan = conn.execute(text("EXPLAIN (FORMAT JSON) " + stmt.sql), params).scalar()
+    return (json.loads(plan) if isinstance(plan, str) else plan)[0]["Plan"]
+
+
+def run_checks(only: str = None) -> list:
+    """Returns (check name, [tables seq-scanned]) for every regression."""
+    failures = []
+    # connect() without commit: everything (SET LOCAL included) is rolled back on close
+    with get_engine().connect() as conn:
+        conn.execute(text("SET LOCAL enable_seqscan = off"))
+        for stmt, params in HOT_QUERIES:
+            if only and stmt.name != only:
+                continue
+            plan = explain(stmt, params, conn)
+            if only:
+                print(json.dumps(plan, indent=2, default=str))
+            scans = _seq_scans(plan)
+            if scans:
+                failures.append((stmt.name, sorted(set(scans))))
+        if not only:
+            for r in conn.execute(_UNINDEXED_FKS, {"tables": sorted(BIG_TABLES)}):
+                failures.append((f"foreign key {r.table_name}.{r.column_name}", [r.table_name]))
+    return failures
+
+
+if __name__ == "__main__":
+    only = sys.argv[1] if len(sys.argv) > 1 else None
+    failures = run_checks(only)
+    for name, tables in failures:
+        print(f"❌ {name}: sequential scan on {', '.join(tables)}")
+    if failures:
+        sys.exit(1)
+    checked = sum(1 for stmt, _ in HOT_QUERIES if not only or stmt.name == only)
+    print(f"✅ {checked} plan(s) checked, no sequential scans on large tables")
@@ -0,0 +1,209 @@
+"""
+In-process latency telemetry for the Diagnostics page.
+
+Four kinds of events go into one ring buffer:
+    query  every statement the engine runs (name or SQL fingerprint, rows, duration)
+    tx     every src.db.transaction() block, begin to commit
+    view   every timed_view() render (pages, chat reruns on new messages)
+    pool   every connection checkout that had to wait for a connection (pool at size + max overflow), and how long it waited
+
+Each event carries the view that was rendering and the Streamlit session id.
+Tuning in secrets.toml:
+    [diagnostics]
+    buffer_size = 20000   # events kept in memory (oldest dropped first)
+    slow_ms = 250         # threshold for the slow-query log
+    flush_seconds = 0     # > 0 copies new events into query_metrics that often
+"""
+import contextvars
+import itertools
+import re
+import threading
+import time
+from collections import deque
+from contextlib import ContextDecorator
+from typing import Optional
+
+import streamlit as st
+from sqlalchemy import event, text
+from sqlalchemy.pool import QueuePool
+
+DEFAULT_SETTINGS = {"buffer_size": 20000, "slow_ms": 250, "flush_seconds": 0}
+
+# Statements issued by the flusher itself are never recorded
+_FLUSH_STATEMENT = "diagnostics.flush"
+
+# The view currently rendering in this script thread. A one-item list so
+# label_view() can rename it once the view knows more about itself.
+_current_view = contextvars.ContextVar("current_view", default=None)
+
+_seq = itertools.count(1)
+
+
+def load_settings() -> dict:
+    try:
+        return {**DEFAULT_SETTINGS, **dict(st.secrets.get("diagnostics", {}))}
+    except FileNotFoundError:
+        return dict(DEFAULT_SETTINGS)
+
+
+SETTINGS = load_settings()
+EVENTS = deque(maxlen=int(SETTINGS["buffer_size"]))
+
+
+def _session_id() -> Optional[str]:
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+    ctx = get_script_run_ctx(suppress_warning=True)
+    return ctx.session_id if ctx else None
+
+
+def _view_name() -> Optional[str]:
+    holder = _current_view.get()
+    return holder[0] if holder else None
+
+
+def record(kind: str, name: str, duration_ms: float, rows: int = -1):
+    """Appends one event. deque.append is atomic, so no lock is needed on the hot path."""
+    EVENTS.append({
+        "seq": next(_seq),
+        "at": time.time(),
+        "kind": kind,
+        "name": name,
+        "view": _view_name(),
+        "session": _session_id(),
+        "rows": rows,
+        "duration_ms": duration_ms,
+    })
+
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_SPACES = re.compile(r"\s+")
+
+
+def fingerprint(sql: str) -> str:
+    """Stable label for ad-hoc SQL: literals replaced by ?, whitespace collapsed, truncated."""
+    return _SPACES.sub(" ", _LITERALS.sub("?", sql)).strip()[:120]
+
+
+# --- ENGINE HOOKS ---
+def install_query_hooks(engine):
+    """Times every cursor execution on the engine. Called once from get_engine()."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        context._diag_start = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        start = getattr(context, "_diag_start", None)
+        if start is None:
+            return
+        name = context.execution_options.get("statement_name") or fingerprint(statement)
+        if name == _FLUSH_STATEMENT:
+            return
+        tx_names = conn.info.get("diag_tx_names")
+        if tx_names is not None and name not in tx_names:
+            tx_names.append(name)
+        record("query", name, (time.perf_counter() - start) * 1000, cursor.rowcount)
+
+
+_pool_wait = threading.local()
+
+
+class TimedQueuePool(QueuePool):
+    """The engine's pool: a checkout that finds every connection busy records how long it waited."""
+
+    def _do_get(self):
+        # Only the slow path is recorded: every connection the pool may open is checked out.
+        # An empty queue alone is not enough, it is also empty while the first connections
+        # are being opened. QueuePool retries by calling _do_get() again, hence the per-thread guard.
+        saturated = self._max_overflow >= 0 and self.checkedout() >= self.size() + self._max_overflow
+        if not saturated or getattr(_pool_wait, "active", False):
+            return super()._do_get()
+        _pool_wait.active = True
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            _pool_wait.active = False
+            record("pool", "checkout", (time.perf_counter() - start) * 1000)
+
+
+class timed_tx:
+    """Wraps a transaction() block: records its wall time, named after the statements it ran."""
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        self.conn.info["diag_tx_names"] = []
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        names = self.conn.info.pop("diag_tx_names", [])
+        if names:
+            record("tx", " + ".join(names)[:120], (time.perf_counter() - self.start) * 1000)
+        return False
+
+
+# --- VIEW TIMING ---
+class timed_view(ContextDecorator):
+    """
+    Times a render and labels every query inside it with the view name.
+    Works as a decorator or a with-block; nests (the inner view wins while it runs).
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def _recreate_cm(self):
+        # Decorated functions run concurrently in many sessions: fresh state per call
+        return type(self)(self.name)
+
+    def __enter__(self):
+        self._token = _current_view.set([self.name])
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        # st.rerun()/st.stop() unwind through here too; the time spent still counts
+        record("view", _view_name(), (time.perf_counter() - self._start) * 1000)
+        _current_view.reset(self._token)
+        return False
+
+
+def label_view(name: str):
+    """Renames the innermost running view, e.g. once a page knows which tab or record it shows."""
+    holder = _current_view.get()
+    if holder:
+        holder[0] = name
+
+
+# --- OPTIONAL FLUSH TO query_metrics ---
+_FLUSH_SQL = text("""
+    INSERT INTO query_metrics (recorded_at, kind, name, view, session_id, row_count, duration_ms)
+    VALUES (to_timestamp(:at), :kind, :name, :view, :session, :rows, :duration_ms)
+""").execution_options(statement_name=_FLUSH_STATEMENT)
+
+
+def _flush_loop(engine, every):
+    last_seq = 0
+    while True:
+        time.sleep(every)
+        batch = [e for e in list(EVENTS) if e["seq"] > last_seq]
+        if not batch:
+            continue
+        try:
+            with engine.begin() as c:
+                c.execute(_FLUSH_SQL, batch)
+            last_seq = batch[-1]["seq"]
+        except Exception:
+            # Telemetry must never take the app down; retry the same window next time
+            continue
+
+
+def start_flusher(engine):
+    """Starts the background flush thread if [diagnostics] flush_seconds > 0."""
+    every = float(SETTINGS["flush_seconds"] or 0)
+    if every > 0:
+        threading.Thread(target=_flush_loop, args=(engine, every), name="metrics-flush", daemon=True).start()
@@ -0,0 +1,166 @@
+"""
+Applies migrations/*.sql in filename order and records each one.
+
+schema_migrations keeps the version (the NNNN prefix), file name, SHA-256
+of the file and when it ran. A file that was already applied is never run
+again. If its contents have changed since, the runner stops instead of
+guessing: write a new migration rather than editing an applied one.
+
+Each file runs in its own transaction, so a failing migration leaves
+nothing half-applied, and a transaction-level advisory lock keeps two
+deploys from migrating at once. Statement timeouts are lifted for
+migrations, because converting or indexing a big table can take minutes.
+
+Databases set up by hand before this runner existed can run `up` as-is:
+every file in migrations/ is idempotent. To only record them instead, use
+`baseline`.
+
+    python -m src.db.migrate status
+    python -m src.db.migrate up
+    python -m src.db.migrate baseline 0014     # mark 0000..0014 applied without running them
+"""
+import hashlib
+import os
+import sys
+import time
+
+from sqlalchemy import text
+
+from src.db.engine import get_engine
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(__file__), "..", "..", "migrations")
+# Arbitrary constant shared by every runner (pg_advisory_xact_lock key)
+LOCK_KEY = 7_302_014
+
+_CREATE_HISTORY = text("""
+    CREATE TABLE IF NOT EXISTS public.schema_migrations (
+        version text PRIMARY KEY,
+        name text NOT NULL,
+        checksum text NOT NULL,
+        applied_at timestamptz NOT NULL DEFAULT now(),
+        duration_ms integer
+    )
+""")
+_APPLIED = text("SELECT version, name, checksum, applied_at FROM public.schema_migrations ORDER BY version")
+_RECORD = text("""
+    INSERT INTO public.schema_migrations (version, name, checksum, duration_ms)
+    VALUES (:version, :name, :checksum, :duration_ms)
+""")
+
+
+class MigrationError(RuntimeError):
+    """History and files disagree, or a migration failed."""
+
+
+class Migration:
+    """One migrations/NNNN_name.sql file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.name = os.path.basename(path)
+        self.version = self.name.split("_", 1)[0]
+        with open(path, "rb") as f:
+            raw = f.read()
+        self.sql = raw.decode("utf-8")
+        self.checksum = hashlib.sha256(raw).hexdigest()
+
+
+def discover(directory: str = MIGRATIONS_DIR) -> list:
+    """Migration files in version order. Two files with one version is an error."""
+    found = [Migration(os.path.join(directory, f)) for f in sorted(os.listdir(directory)) if f.endswith(".sql")]
+    versions = [m.version for m in found]
+    dupes = sorted({v for v in versions if versions.count(v) > 1})
+    if dupes:
+        raise MigrationError(f"Duplicate migration version(s): {', '.join(dupes)}")
+    return found
+
+
+def _applied(conn) -> dict:
+    conn.execute(_CREATE_HISTORY)
+    return {r.version: r for r in conn.execute(_APPLIED)}
+
+
+def _check(files: list, applied: dict):
+    """Stops on an applied file that has since been edited or removed."""
+    by_version = {m.version: m for m in files}
+    for version, row in applied.items():
+        m = by_version.get(version)
+        if m is None:
+            raise MigrationError(f"{row.name} was applied but is no longer in migrations/")
+        if m.checksum != row.checksum:
+            raise MigrationError(f"{m.name} has changed since it was applied on {row.applied_at:%Y-%m-%d}; add a new migration instead")
+
+
+def status() -> list:
+    """(name, applied_at or None) for every file, oldest first."""
+    files = discover()
+    with get_engine().begin() as conn:
+        applied = _applied(conn)
+    _check(files, applied)
+    return [(m.name, applied[m.version].applied_at if m.version in applied else None) for m in files]
+
+
+def _begin(conn):
+    conn.execute(text("SET LOCAL statement_timeout = 0"))
+    conn.execute(text("SET LOCAL lock_timeout = 0"))
+    conn.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": LOCK_KEY})
+    return _applied(conn)
+
+
+def up(log=print) -> int:
+    """Applies every pending migration, each in its own transaction. Returns how many ran."""
+    files = discover()
+    ran = 0
+    for m in files:
+        with get_engine().begin() as conn:
+            # Re-read under the lock: another runner may have got here first
+            applied = _begin(conn)
+            _check(files, applied)
+            if m.version in applied:
+                continue
+            start = time.perf_counter()
+            try:
+                # Raw cursor, no parameters: the driver sends the file as-is (format('%s') and all)
+                with conn.connection.cursor() as cur:
+                    cur.execute(m.sql)
+            except Exception as e:
+                raise MigrationError(f"{m.name} failed: {getattr(e, 'orig', e)}") from e
+            duration_ms = int((time.perf_counter() - start) * 1000)
+            conn.execute(_RECORD, {"version": m.version, "name": m.name, "checksum": m.checksum, "duration_ms": duration_ms})
+        log(f"Applied {m.name} ({duration_ms} ms)")
+        ran += 1
+    return ran
+
+
+def baseline(through: str, log=print) -> int:
+    """Records migrations up to and including version `through` as applied, without running them."""
+    files = discover()
+    marked = 0
+    with get_engine().begin() as conn:
+        applied = _begin(conn)
+        _check(files, applied)
+        for m in files:
+            if m.version > through or m.version in applied:
+                continue
+            conn.execute(_RECORD, {"version": m.version, "name": m.name, "checksum": m.checksum, "duration_ms": None})
+            log(f"Marked {m.name} as applied")
+            marked += 1
+    return marked
+
+
+if __name__ == "__main__":
+    command = sys.argv[1] if len(sys.argv) > 1 else ""
+    try:
+        if command == "status":
+            for name, applied_at in status():
+                print(f"{'applied ' + applied_at.strftime('%Y-%m-%d %H:%M') if applied_at else 'pending':<25} {name}")
+        elif command == "up":
+            print(f"{up()} migration(s) applied")
+        elif command == "baseline" and len(sys.argv) == 3:
+            print(f"{baseline(sys.argv[2])} migration(s) marked as applied")
+        else:
+            print(__doc__)
+            sys.exit(1)
+    except MigrationError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
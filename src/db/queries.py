@@ -0,0 +1,771 @@
+"""
+Every SQL statement the app runs, defined once and named "<area>.<what>".
+
+Reads go through src.db.read_df / fetch_one / fetch_all, writes through
+src.db.execute (optionally inside src.db.transaction()).
+"""
+from src.db.statements import statement
+
+# Hours belong to the IST calendar day they were worked on; a shift past midnight is split
+BUSINESS_TZ = "Asia/Kolkata"
+# Range reads look this far back for shifts that started earlier and ran into the range
+SHIFT_LOOKBACK_DAYS = 7
+
+# One row per IST day a shift touches (needs clock_in and clock_out in scope): the hours
+# worked on that day, and shifts = 1 on the day it started. Kept in step with
+# split_at_midnight() in src/services/attendance.py.
+_SHIFT_DAYS = f"""
+    CROSS JOIN LATERAL (
+        SELECT day::date AS work_date,
+               EXTRACT(EPOCH FROM LEAST(clock_out, (day + interval '1 day') AT TIME ZONE '{BUSINESS_TZ}')
+                                - GREATEST(clock_in, day AT TIME ZONE '{BUSINESS_TZ}')) / 3600.0 AS hours,
+               (day = date_trunc('day', clock_in AT TIME ZONE '{BUSINESS_TZ}'))::int AS shifts
+        FROM generate_series(date_trunc('day', clock_in AT TIME ZONE '{BUSINESS_TZ}'),
+                             GREATEST(clock_in, clock_out - interval '1 microsecond') AT TIME ZONE '{BUSINESS_TZ}',
+                             interval '1 day') AS day
+    ) d
+"""
+
+
+# --- USERS / AUTH ---
+# Case-insensitive, on users_email_lower_key (migrations/0019)
+USER_BY_EMAIL = statement("users.by_email", """
+    SELECT id, full_name, email, password_hash, role FROM users WHERE lower(email) = lower(:email)
+""")
+
+# Compare-and-set so a concurrent password change is never overwritten by a rehash
+UPGRADE_PASSWORD_HASH = statement("users.upgrade_password_hash", """
+    UPDATE users SET password_hash = :new_hash WHERE id = :id AND password_hash = :old_hash
+""")
+
+EMPLOYEES = statement("users.employees", """
+    SELECT id, full_name FROM users WHERE role = 'employee' ORDER BY full_name
+""")
+
+ASSIGNABLE_STAFF = statement("users.assignable", """
+    SELECT id, full_name, role FROM users WHERE role IN ('employee', 'manager') ORDER BY full_name
+""")
+
+STAFF_REGISTRY = statement("users.staff_registry", """
+    SELECT * FROM users WHERE role = 'employee' ORDER BY created_at
+""")
+
+INSERT_EMPLOYEE = statement("users.insert_employee", """
+    INSERT INTO users (full_name, email, password_hash, role, hourly_rate)
+    VALUES (:name, :email, :pw, 'employee', :rate)
+""")
+
+# Roster import: the whole batch as parallel arrays in one statement, matched on
+# lower(email). Existing staff keep their password unless :reset_passwords is set, and
+# their role unless the row names one. Owners are never overwritten (no row comes back
+# for them); xmax = 0 tells fresh inserts from updates.
+UPSERT_STAFF_BULK = statement("users.upsert_staff_bulk", """
+    WITH roster AS (
+        SELECT * FROM unnest(
+            CAST(:names AS text[]), CAST(:emails AS text[]), CAST(:pws AS text[]),
+            CAST(:roles AS text[]), CAST(:rates AS numeric[]), CAST(:roles_given AS boolean[])
+        ) AS r(full_name, email, password_hash, role, hourly_rate, role_given)
+    )
+    INSERT INTO users (full_name, email, password_hash, role, hourly_rate)
+    SELECT full_name, lower(email), password_hash, role, hourly_rate FROM roster
+    ON CONFLICT ((lower(email))) DO UPDATE
+    SET full_name = EXCLUDED.full_name,
+        password_hash = CASE WHEN :reset_passwords THEN EXCLUDED.password_hash ELSE users.password_hash END,
+        role = CASE WHEN (SELECT r.role_given FROM roster r WHERE lower(r.email) = lower(EXCLUDED.email))
+                    THEN EXCLUDED.role ELSE users.role END,
+        hourly_rate = EXCLUDED.hourly_rate
+    WHERE users.role <> 'owner'
+    RETURNING lower(email) AS email, (xmax = 0) AS inserted
+""")
+
+# Emails are case-insensitive (migrations/0019); an edited one is stored lowercased,
+# as the roster import stores them
+UPDATE_EMPLOYEE = statement("users.update_employee", """
+    UPDATE users SET full_name = :name, email = lower(:email), hourly_rate = :rate
+    WHERE id = :id
+""")
+
+# ON DELETE CASCADE also clears the user's rollup rows and read markers
+DELETE_USER_BY_EMAIL = statement("users.delete_by_email", """
+    DELETE FROM users WHERE lower(email) = lower(:email)
+""", writes=("attendance_daily_hours", "chat_reads"))
+
+RENAME_USER = statement("users.rename", """
+    UPDATE users SET full_name = :name WHERE id = :id
+""")
+
+
+# --- CLIENTS (THE VAULT) ---
+CLIENT_NAMES = statement("clients.names", """
+    SELECT id, name FROM clients
+""")
+
+CLIENTS_ALL = statement("clients.all", """
+    SELECT * FROM clients
+""")
+
+INSERT_CLIENT = statement("clients.insert", """
+    INSERT INTO clients (name, email) VALUES (:name, :email)
+""")
+
+DELETE_CLIENT = statement("clients.delete", """
+    DELETE FROM clients WHERE id = :id
+""")
+
+
+# --- ATTENDANCE ---
+# Open-shift reads take an optional [since, until) window on clock_in, so the hot read
+# only touches the newest monthly partitions (src/services/partitions.py open_shift()).
+_OPEN_SHIFT_WINDOW = """
+    (CAST(:since AS timestamptz) IS NULL OR a.clock_in >= CAST(:since AS timestamptz))
+    AND (CAST(:until AS timestamptz) IS NULL OR a.clock_in < CAST(:until AS timestamptz))
+"""
+
+# Served by the partial index idx_attendance_logs_open_shift
+OPEN_SHIFT = statement("attendance.open_shift", f"""
+    SELECT * FROM attendance_logs a
+    WHERE a.employee_id = :uid AND a.clock_out IS NULL
+      AND {_OPEN_SHIFT_WINDOW}
+    ORDER BY a.clock_in DESC
+    LIMIT 1
+""")
+
+CLOCK_IN = statement("attendance.clock_in", """
+    INSERT INTO attendance_logs
+    (employee_id, clock_in, location_lat, location_long, is_verified, status, office_id)
+    VALUES (:uid, NOW(), :lat, :lon, true, 'active', CAST(:office_id AS uuid))
+""")
+
+# Closes an open shift and folds its hours into the payroll rollup atomically, one row
+# per IST day it ran on. The clock_out IS NULL guard makes a double-submitted form a no-op.
+CLOSE_SHIFT = statement("attendance.close_shift", f"""
+    WITH closed AS (
+        UPDATE attendance_logs
+        SET clock_out = NOW(), comments = :comment, status = 'completed'
+        WHERE id = :id AND clock_out IS NULL
+        RETURNING employee_id, clock_in, clock_out
+    )
+    INSERT INTO attendance_daily_hours (employee_id, work_date, hours, shifts)
+    SELECT employee_id, d.work_date, d.hours, d.shifts
+    FROM closed
+    {_SHIFT_DAYS}
+    WHERE employee_id IS NOT NULL
+    ON CONFLICT (employee_id, work_date) DO UPDATE
+    SET hours = attendance_daily_hours.hours + EXCLUDED.hours,
+        shifts = attendance_daily_hours.shifts + EXCLUDED.shifts
+""")
+
+# Everyone clocked in right now; only touches the partial open-shift index
+LIVE_PRESENCE = statement("attendance.live_presence", f"""
+    SELECT a.id, a.clock_in, a.is_verified, u.full_name AS employee_name, o.name AS office_name
+    FROM attendance_logs a
+    LEFT JOIN users u ON a.employee_id = u.id
+    LEFT JOIN offices o ON a.office_id = o.id
+    WHERE a.clock_out IS NULL
+      AND {_OPEN_SHIFT_WINDOW}
+    ORDER BY a.clock_in
+""")
+
+RECENT_ACTIVITY = statement("attendance.recent", """
+    SELECT a.*, u.full_name as employee_name
+    FROM attendance_logs a
+    LEFT JOIN users u ON a.employee_id = u.id
+    ORDER BY a.clock_in DESC LIMIT 20
+""")
+
+# Attendance history filters. Bounds are timestamptz values so idx_attendance_logs_clock_in
+# (or idx_attendance_logs_employee_clock_in when employees are picked) serves the range.
+_HISTORY_FILTERS = """
+    a.clock_in >= :start_ts AND a.clock_in < :end_ts
+    AND (CAST(:emp_ids AS uuid[]) IS NULL OR a.employee_id = ANY(CAST(:emp_ids AS uuid[])))
+    AND (CAST(:status AS text) IS NULL OR a.status = :status)
+"""
+
+HISTORY_PAGE = statement("attendance.history_page", f"""
+    SELECT a.id, a.clock_in, a.clock_out, a.status, u.full_name as employee_name
+    FROM attendance_logs a
+    LEFT JOIN users u ON a.employee_id = u.id
+    WHERE {_HISTORY_FILTERS}
+      AND (CAST(:cur_ts AS timestamptz) IS NULL OR (a.clock_in, a.id) < (:cur_ts, CAST(:cur_id AS uuid)))
+    ORDER BY a.clock_in DESC, a.id DESC
+    LIMIT :limit
+""")
+
+HISTORY_TOTALS = statement("attendance.history_totals", f"""
+    SELECT count(*) AS shifts,
+           count(DISTINCT a.employee_id) AS employees,
+           array_agg(DISTINCT a.employee_id::text) FILTER (WHERE a.employee_id IS NOT NULL) AS employee_ids,
+           SUM(EXTRACT(EPOCH FROM a.clock_out - a.clock_in)) / 3600.0 AS hours
+    FROM attendance_logs a
+    WHERE {_HISTORY_FILTERS}
+""")
+
+
+# Raw intervals for the shift analytics (src/services/attendance.py), read with
+# copy_binary(): fixed-width rows, so an open shift's clock_out is 'infinity', not NULL
+SHIFT_INTERVALS = statement("attendance.shift_intervals", f"""
+    SELECT employee_id, clock_in, COALESCE(clock_out, 'infinity') AS clock_out
+    FROM attendance_logs
+    WHERE employee_id IS NOT NULL
+      AND clock_in >= CAST(:start_ts AS timestamptz) - interval '{SHIFT_LOOKBACK_DAYS} days'
+      AND clock_in < :end_ts
+""")
+
+# One employee's recent shifts, for their own week on the Time Clock
+MY_SHIFTS = statement("attendance.mine_since", f"""
+    SELECT employee_id, clock_in, clock_out
+    FROM attendance_logs
+    WHERE employee_id = :uid
+      AND clock_in >= CAST(:start_ts AS timestamptz) - interval '{SHIFT_LOOKBACK_DAYS} days'
+    ORDER BY clock_in
+""")
+
+
+# --- GEOFENCE ---
+ACTIVE_OFFICES = statement("geofence.active_offices", """
+    SELECT id, name, lat, lon, radius_m FROM offices WHERE active ORDER BY name
+""")
+
+# Streamed by the bulk audit; NULL bounds mean the whole table
+AUDIT_LOCATIONS = statement("geofence.audit_locations", """
+    SELECT id, employee_id, clock_in, location_lat, location_long, is_verified
+    FROM attendance_logs
+    WHERE (CAST(:start_ts AS timestamptz) IS NULL OR clock_in >= :start_ts)
+      AND (CAST(:end_ts AS timestamptz) IS NULL OR clock_in < :end_ts)
+    ORDER BY clock_in, id
+""")
+
+
+# --- PAYROLL ROLLUP ---
+PAYROLL_BY_RANGE = statement("payroll.by_range", """
+    SELECT u.id, u.full_name, u.hourly_rate, SUM(h.hours) AS shift_hours, SUM(h.shifts) AS shifts
+    FROM attendance_daily_hours h
+    JOIN users u ON u.id = h.employee_id
+    WHERE h.work_date >= :start AND h.work_date < :end
+      AND u.role = 'employee'
+    GROUP BY u.id, u.full_name, u.hourly_rate
+    ORDER BY u.full_name
+""")
+
+ROLLUP_DELETE_RANGE = statement("payroll.rollup_delete_range", """
+    DELETE FROM attendance_daily_hours
+    WHERE work_date >= :start AND work_date < :end
+""")
+
+ROLLUP_REBUILD_RANGE = statement("payroll.rollup_rebuild_range", f"""
+    INSERT INTO attendance_daily_hours (employee_id, work_date, hours, shifts)
+    SELECT employee_id, d.work_date, SUM(d.hours), SUM(d.shifts)
+    FROM attendance_logs
+    {_SHIFT_DAYS}
+    WHERE clock_out IS NOT NULL AND employee_id IS NOT NULL
+      AND clock_in >= (CAST(:start AS date)::timestamp AT TIME ZONE '{BUSINESS_TZ}') - interval '{SHIFT_LOOKBACK_DAYS} days'
+      AND clock_in <  (CAST(:end AS date)::timestamp AT TIME ZONE '{BUSINESS_TZ}')
+      AND d.work_date >= CAST(:start AS date) AND d.work_date < CAST(:end AS date)
+    GROUP BY employee_id, d.work_date
+""")
+
+
+# --- EXPORTS (streamed by src/services/exports.py) ---
+# Times are IST wall-clock and numbers are float8 so every chunk has the same column types.
+EXPORT_SHIFTS = statement("export.shifts", f"""
+    SELECT a.id::text AS shift_id,
+           u.full_name AS employee, u.email,
+           (a.clock_in AT TIME ZONE '{BUSINESS_TZ}') AS clock_in,
+           (a.clock_out AT TIME ZONE '{BUSINESS_TZ}') AS clock_out,
+           (EXTRACT(EPOCH FROM a.clock_out - a.clock_in) / 3600.0)::float8 AS hours,
+           a.status, a.is_verified, o.name AS office, a.comments
+    FROM attendance_logs a
+    LEFT JOIN users u ON a.employee_id = u.id
+    LEFT JOIN offices o ON a.office_id = o.id
+    WHERE a.clock_in >= :start_ts AND a.clock_in < :end_ts
+      AND (CAST(:emp_ids AS uuid[]) IS NULL OR a.employee_id = ANY(CAST(:emp_ids AS uuid[])))
+    ORDER BY a.clock_in, a.id
+""")
+
+EXPORT_DAILY_PAY = statement("export.daily_pay", """
+    SELECT h.work_date, u.full_name AS employee, u.email,
+           h.shifts, h.hours::float8 AS hours, u.hourly_rate::float8 AS hourly_rate,
+           (h.hours * u.hourly_rate)::float8 AS pay
+    FROM attendance_daily_hours h
+    JOIN users u ON u.id = h.employee_id
+    WHERE h.work_date >= :start AND h.work_date < :end
+      AND u.role = 'employee'
+      AND (CAST(:emp_ids AS uuid[]) IS NULL OR h.employee_id = ANY(CAST(:emp_ids AS uuid[])))
+    ORDER BY h.work_date, u.full_name
+""")
+
+
+# --- PARTITIONS & ARCHIVE (src/services/partitions.py) ---
+ENSURE_PARTITIONS = statement("partitions.ensure", """
+    SELECT public.create_monthly_partitions(:parent, CAST(:from_month AS date), CAST(:to_month AS date)) AS created
+""")
+
+# Monthly children of a parent, oldest first (the default partition has no month)
+LIST_PARTITIONS = statement("partitions.list", """
+    SELECT c.relname AS partition,
+           to_date(right(c.relname, 7), 'YYYY_MM') AS month
+    FROM pg_inherits i
+    JOIN pg_class c ON c.oid = i.inhrelid
+    WHERE i.inhparent = CAST(:parent AS regclass)
+      AND c.relname ~ '_[0-9]{4}_[0-9]{2}$'
+    ORDER BY month
+""")
+
+# Generated columns (direct_messages.search_vector) are derived, not archived
+PARTITION_COLUMNS = statement("partitions.columns", """
+    SELECT column_name, data_type
+    FROM information_schema.columns
+    WHERE table_schema = 'public' AND table_name = :table AND is_generated = 'NEVER'
+    ORDER BY ordinal_position
+""")
+
+ARCHIVE_CATALOGUE = statement("partitions.archive_catalogue", """
+    SELECT table_name, month, path, row_count FROM archived_partitions ORDER BY table_name, month
+""")
+
+RECORD_ARCHIVED_PARTITION = statement("partitions.record_archived", """
+    INSERT INTO archived_partitions (table_name, month, path, row_count)
+    VALUES (:table, :month, :path, :rows)
+    ON CONFLICT (table_name, month) DO UPDATE SET path = EXCLUDED.path, row_count = EXCLUDED.row_count, archived_at = now()
+""")
+
+# Every conversation in one month of direct_messages, read before the month is dropped
+RECORD_ARCHIVED_CONVERSATIONS = statement("partitions.record_archived_conversations", """
+    INSERT INTO archived_conversations (user_a, user_b, month)
+    SELECT DISTINCT least(sender_id, receiver_id), greatest(sender_id, receiver_id), CAST(:month AS date)
+    FROM direct_messages
+    WHERE created_at >= :start_ts AND created_at < :end_ts
+    ON CONFLICT DO NOTHING
+""")
+
+# True when the pair has an archived month, or a month archived before pairs were recorded
+CONVERSATION_ARCHIVED = statement("partitions.conversation_archived", """
+    SELECT EXISTS (
+               SELECT 1 FROM archived_conversations
+               WHERE user_a = least(CAST(:a AS uuid), CAST(:b AS uuid))
+                 AND user_b = greatest(CAST(:a AS uuid), CAST(:b AS uuid))
+           )
+        OR EXISTS (
+               SELECT 1 FROM archived_partitions
+               WHERE table_name = 'direct_messages' AND NOT conversations_indexed
+           ) AS archived
+""")
+
+USER_NAMES = statement("users.names", """
+    SELECT id, full_name FROM users
+""")
+
+
+# --- TASKS ---
+INSERT_TASK = statement("tasks.insert", """
+    INSERT INTO tasks (title, description, client_id, assigned_to, due_date, status)
+    VALUES (:title, :desc, :cid, :aid, :due, 'todo')
+""")
+
+# Bulk dispatch: every assignee x client pair in one statement. The dispatch key makes
+# retries a no-op (idx_tasks_dispatch_key); RETURNING counts only new rows.
+DISPATCH_TASKS_BULK = statement("tasks.dispatch_bulk", """
+    INSERT INTO tasks (title, description, client_id, assigned_to, due_date, status, dispatch_key)
+    SELECT title, description, client_id, assigned_to, due_date, 'todo', dispatch_key
+    FROM unnest(
+        CAST(:titles AS text[]), CAST(:descs AS text[]), CAST(:cids AS uuid[]),
+        CAST(:aids AS uuid[]), CAST(:dues AS date[]), CAST(:keys AS text[])
+    ) AS t(title, description, client_id, assigned_to, due_date, dispatch_key)
+    ON CONFLICT (dispatch_key, assigned_to, client_id) WHERE dispatch_key IS NOT NULL DO NOTHING
+    RETURNING id
+""")
+
+# Task Tracker: every filter runs in the database and pages are keyset on (created_at, id),
+# so opening the tracker costs one index range read however many tasks are done.
+TASK_TRACKER_PAGE = statement("tasks.tracker_page", """
+    SELECT t.id, t.title, t.description, t.status, t.due_date, t.created_at,
+           u.full_name as assignee_name, c.name as client_name
+    FROM tasks t
+    LEFT JOIN users u ON t.assigned_to = u.id
+    LEFT JOIN clients c ON t.client_id = c.id
+    WHERE (CAST(:status AS text) IS NULL OR t.status = :status)
+      AND (CAST(:client_id AS uuid) IS NULL OR t.client_id = CAST(:client_id AS uuid))
+      AND (CAST(:assignee_id AS uuid) IS NULL OR t.assigned_to = CAST(:assignee_id AS uuid))
+      AND (CAST(:due_from AS date) IS NULL OR t.due_date >= :due_from)
+      AND (CAST(:due_to AS date) IS NULL OR t.due_date <= :due_to)
+      AND (CAST(:cur_ts AS timestamptz) IS NULL OR (t.created_at, t.id) < (:cur_ts, CAST(:cur_id AS uuid)))
+    ORDER BY t.created_at DESC, t.id DESC
+    LIMIT :limit
+""")
+
+MY_OPEN_TASKS = statement("tasks.mine_open", """
+    SELECT id, title, description, status, due_date, created_at
+    FROM tasks
+    WHERE assigned_to = :uid AND status <> 'done'
+    ORDER BY due_date NULLS LAST, created_at
+""")
+
+MY_DONE_TASKS_PAGE = statement("tasks.mine_done_page", """
+    SELECT id, title, due_date, completed_at, created_at
+    FROM tasks
+    WHERE assigned_to = :uid AND status = 'done'
+      AND (CAST(:cur_ts AS timestamptz) IS NULL OR (created_at, id) < (:cur_ts, CAST(:cur_id AS uuid)))
+    ORDER BY created_at DESC, id DESC
+    LIMIT :limit
+""")
+
+# To Do -> In Progress for the caller's own tasks, in one statement
+START_TASKS = statement("tasks.start_many", """
+    UPDATE tasks SET status = 'in_progress'
+    WHERE id = ANY(CAST(:ids AS uuid[])) AND assigned_to = :uid AND status = 'todo'
+    RETURNING id
+""")
+
+# One set-based UPDATE for any number of tasks; only the caller's own open tasks change
+COMPLETE_TASKS = statement("tasks.complete_many", """
+    UPDATE tasks SET status = 'done', completed_at = NOW()
+    WHERE id = ANY(CAST(:ids AS uuid[])) AND assigned_to = :uid AND status <> 'done'
+    RETURNING id
+""")
+
+
+# --- TASK TEMPLATES & SCHEDULES ---
+TASK_TEMPLATES = statement("templates.all", """
+    SELECT id, name, title, description, due_in_days FROM task_templates ORDER BY name
+""")
+
+INSERT_TASK_TEMPLATE = statement("templates.insert", """
+    INSERT INTO task_templates (name, title, description, due_in_days)
+    VALUES (:name, :title, :desc, :due_days)
+""")
+
+# Its schedules go with it (ON DELETE CASCADE)
+DELETE_TASK_TEMPLATE = statement("templates.delete", """
+    DELETE FROM task_templates WHERE id = :id
+""", writes=("task_schedules",))
+
+TASK_SCHEDULES = statement("schedules.all", """
+    SELECT s.id, t.name AS template_name, s.frequency, s.next_run, s.active,
+           cardinality(s.assignee_ids) AS assignees, cardinality(s.client_ids) AS clients
+    FROM task_schedules s
+    JOIN task_templates t ON t.id = s.template_id
+    ORDER BY s.active DESC, s.next_run
+""")
+
+INSERT_TASK_SCHEDULE = statement("schedules.insert", """
+    INSERT INTO task_schedules (template_id, frequency, assignee_ids, client_ids, next_run, anchor_date)
+    VALUES (:tid, :freq, CAST(:aids AS uuid[]), CAST(:cids AS uuid[]), :next_run, :next_run)
+""")
+
+SET_SCHEDULE_ACTIVE = statement("schedules.set_active", """
+    UPDATE task_schedules SET active = :active WHERE id = :id
+""")
+
+# Claimed with SKIP LOCKED so two runners never work the same schedule at once
+DUE_SCHEDULES = statement("schedules.due", """
+    SELECT s.id, s.frequency, s.assignee_ids, s.client_ids, s.next_run, s.anchor_date,
+           t.title, t.description, t.due_in_days
+    FROM task_schedules s
+    JOIN task_templates t ON t.id = s.template_id
+    WHERE s.active AND s.next_run <= :until
+    FOR UPDATE OF s SKIP LOCKED
+""")
+
+ADVANCE_SCHEDULES = statement("schedules.advance", """
+    UPDATE task_schedules s SET next_run = v.next_run
+    FROM unnest(CAST(:ids AS uuid[]), CAST(:next_runs AS date[])) AS v(id, next_run)
+    WHERE s.id = v.id
+""")
+
+
+# --- AI INSIGHTS ---
+# Newest analyzed messages in the window, keyset-paged on (created_at, id)
+INSIGHTS_FEED = statement("insights.feed", """
+    SELECT c.id, c.message_body, c.ai_sentiment_score, c.ai_summary, c.created_at,
+           cl.name as client_name, u.full_name as employee_name
+    FROM communications c
+    LEFT JOIN clients cl ON c.client_id = cl.id
+    LEFT JOIN users u ON c.sender_id = u.id
+    WHERE c.is_analyzed = TRUE
+      AND c.created_at >= :start_ts
+      AND (NOT :low_only OR c.ai_sentiment_score < 5)
+      AND (CAST(:cur_ts AS timestamptz) IS NULL OR (c.created_at, c.id) < (:cur_ts, CAST(:cur_id AS uuid)))
+    ORDER BY c.created_at DESC, c.id DESC
+    LIMIT :limit
+""")
+
+# Headline numbers and leaderboards come from the trigger-maintained daily rollup
+INSIGHTS_TOTALS = statement("insights.totals", """
+    SELECT COALESCE(SUM(messages), 0) AS messages,
+           SUM(score_sum) / NULLIF(SUM(messages), 0) AS avg_score,
+           MIN(min_score) AS min_score,
+           COALESCE(SUM(low_count), 0) AS low_count
+    FROM communication_sentiment_daily
+    WHERE day >= :start_day
+""")
+
+INSIGHTS_BY_EMPLOYEE = statement("insights.by_employee", """
+    SELECT COALESCE(u.full_name, 'System/Client') AS employee_name,
+           SUM(s.messages) AS messages,
+           SUM(s.score_sum) / SUM(s.messages) AS avg_score,
+           SUM(s.low_count) AS low_count
+    FROM communication_sentiment_daily s
+    LEFT JOIN users u ON s.sender_id = u.id
+    WHERE s.day >= :start_day
+    GROUP BY 1
+    ORDER BY avg_score DESC
+""")
+
+INSIGHTS_BY_CLIENT = statement("insights.by_client", """
+    SELECT COALESCE(cl.name, 'Unknown Client') AS client_name,
+           SUM(s.messages) AS messages,
+           SUM(s.score_sum) / SUM(s.messages) AS avg_score,
+           MIN(s.min_score) AS min_score
+    FROM communication_sentiment_daily s
+    LEFT JOIN clients cl ON s.client_id = cl.id
+    WHERE s.day >= :start_day
+    GROUP BY 1
+    ORDER BY avg_score ASC
+""")
+
+
+# --- CHAT ---
+# Each direction of the conversation is its own branch so both can walk
+# idx_direct_messages_conversation in order and stop after :limit rows.
+# Every read bounds created_at, so Postgres only opens the monthly partitions
+# it can need: the newest page looks at the hot months (:since), and paging
+# back (src/services/partitions.py chat_latest / chat_older) takes over past them.
+_MSG_COLS = "id, sender_id, receiver_id, message, created_at"
+
+CHAT_LATEST = statement("chat.latest", f"""
+    SELECT * FROM (
+        (SELECT {_MSG_COLS} FROM direct_messages
+         WHERE sender_id = :my_id AND receiver_id = :receiver_id
+           AND created_at >= CAST(:since AS timestamptz)
+         ORDER BY created_at DESC, id DESC LIMIT :limit)
+        UNION ALL
+        (SELECT {_MSG_COLS} FROM direct_messages
+         WHERE sender_id = :receiver_id AND receiver_id = :my_id
+           AND created_at >= CAST(:since AS timestamptz)
+         ORDER BY created_at DESC, id DESC LIMIT :limit)
+    ) m
+    ORDER BY created_at DESC, id DESC
+    LIMIT :limit
+""")
+
+CHAT_OLDER = statement("chat.older", f"""
+    SELECT * FROM (
+        (SELECT {_MSG_COLS} FROM direct_messages
+         WHERE sender_id = :my_id AND receiver_id = :receiver_id
+           AND created_at <= CAST(:before_ts AS timestamptz) AND (created_at, id) < (:before_ts, :before_id)
+         ORDER BY created_at DESC, id DESC LIMIT :limit)
+        UNION ALL
+        (SELECT {_MSG_COLS} FROM direct_messages
+         WHERE sender_id = :receiver_id AND receiver_id = :my_id
+           AND created_at <= CAST(:before_ts AS timestamptz) AND (created_at, id) < (:before_ts, :before_id)
+         ORDER BY created_at DESC, id DESC LIMIT :limit)
+    ) m
+    ORDER BY created_at DESC, id DESC
+    LIMIT :limit
+""")
+
+# A search hit and the page after it, oldest first: the thread opened at that point
+CHAT_FROM = statement("chat.from", f"""
+    SELECT * FROM (
+        (SELECT {_MSG_COLS} FROM direct_messages
+         WHERE sender_id = :my_id AND receiver_id = :receiver_id
+           AND created_at >= CAST(:from_ts AS timestamptz) AND (created_at, id) >= (:from_ts, :from_id)
+         ORDER BY created_at ASC, id ASC LIMIT :limit)
+        UNION ALL
+        (SELECT {_MSG_COLS} FROM direct_messages
+         WHERE sender_id = :receiver_id AND receiver_id = :my_id
+           AND created_at >= CAST(:from_ts AS timestamptz) AND (created_at, id) >= (:from_ts, :from_id)
+         ORDER BY created_at ASC, id ASC LIMIT :limit)
+    ) m
+    ORDER BY created_at ASC, id ASC
+    LIMIT :limit
+""")
+
+# created_at is stamped at transaction start, so a slow insert can land slightly
+# behind the cursor. We re-read a short overlap window and drop ids we already hold.
+CHAT_SINCE = statement("chat.since", f"""
+    SELECT {_MSG_COLS} FROM direct_messages
+    WHERE ((sender_id = :my_id AND receiver_id = :receiver_id)
+        OR (sender_id = :receiver_id AND receiver_id = :my_id))
+      AND created_at > CAST(:since_ts AS timestamptz) - INTERVAL '5 seconds'
+    ORDER BY created_at ASC, id ASC
+""")
+
+CHAT_SEND = statement("chat.send", """
+    INSERT INTO direct_messages (sender_id, receiver_id, message)
+    VALUES (:sender, :receiver, :msg)
+""")
+
+# One statement for the whole contact list. Per contact it walks
+# idx_direct_messages_conversation twice: once for the newest message in either
+# direction (preview) and once over only the rows newer than our chat_reads
+# marker (unread count, capped so a never-opened thread stays cheap).
+# Both stay in the hot months (:since). The preview only looks further back for
+# a contact with nothing recent: Append stops at the first branch that returns a
+# row. Unread messages older than :since no longer count toward the badge.
+_INBOX_SQL = """
+    SELECT u.id, u.full_name, u.role,
+           last.message AS last_message, last.created_at AS last_at, last.sender_id AS last_sender_id,
+           unread.n AS unread
+    FROM users u
+    LEFT JOIN chat_reads r ON r.user_id = :my_id AND r.contact_id = u.id
+    LEFT JOIN LATERAL (
+        SELECT y.message, y.created_at, y.sender_id FROM (
+            (SELECT x.message, x.created_at, x.sender_id FROM (
+                (SELECT message, created_at, sender_id FROM direct_messages
+                 WHERE sender_id = :my_id AND receiver_id = u.id AND created_at >= CAST(:since AS timestamptz)
+                 ORDER BY created_at DESC LIMIT 1)
+                UNION ALL
+                (SELECT message, created_at, sender_id FROM direct_messages
+                 WHERE sender_id = u.id AND receiver_id = :my_id AND created_at >= CAST(:since AS timestamptz)
+                 ORDER BY created_at DESC LIMIT 1)
+            ) x
+            ORDER BY x.created_at DESC LIMIT 1)
+            UNION ALL
+            (SELECT x.message, x.created_at, x.sender_id FROM (
+                (SELECT message, created_at, sender_id FROM direct_messages
+                 WHERE sender_id = :my_id AND receiver_id = u.id AND created_at < CAST(:since AS timestamptz)
+                 ORDER BY created_at DESC LIMIT 1)
+                UNION ALL
+                (SELECT message, created_at, sender_id FROM direct_messages
+                 WHERE sender_id = u.id AND receiver_id = :my_id AND created_at < CAST(:since AS timestamptz)
+                 ORDER BY created_at DESC LIMIT 1)
+            ) x
+            ORDER BY x.created_at DESC LIMIT 1)
+        ) y
+        LIMIT 1
+    ) last ON TRUE
+    LEFT JOIN LATERAL (
+        SELECT count(*) AS n FROM (
+            SELECT 1 FROM direct_messages d
+            WHERE d.sender_id = u.id AND d.receiver_id = :my_id
+              AND d.created_at >= CAST(:since AS timestamptz)
+              AND d.created_at > COALESCE(r.last_read_at, '-infinity'::timestamptz)
+            LIMIT :unread_cap
+        ) capped
+    ) unread ON TRUE
+    WHERE {contact_filter}
+    ORDER BY last.created_at DESC NULLS LAST, u.full_name
+"""
+
+# Employees -> Can see Managers & Owner; Managers/Owners -> Can see Everyone
+CHAT_INBOX_EMPLOYEE = statement("chat.inbox_employee", _INBOX_SQL.format(contact_filter="u.role IN ('manager', 'owner')"))
+CHAT_INBOX_STAFF = statement("chat.inbox_staff", _INBOX_SQL.format(contact_filter="u.id != :my_id"))
+
+CHAT_MARK_READ = statement("chat.mark_read", """
+    INSERT INTO chat_reads (user_id, contact_id, last_read_at)
+    VALUES (:my_id, :contact_id, :read_at)
+    ON CONFLICT (user_id, contact_id)
+    DO UPDATE SET last_read_at = GREATEST(chat_reads.last_read_at, EXCLUDED.last_read_at)
+""")
+
+# Search across every conversation the reader is in (migrations/0018). The GIN index on
+# search_vector finds the matching messages, BitmapAnd-ed with the sender/receiver
+# indexes so only the reader's own are fetched. Every match is ranked (the total comes
+# with each row), but ts_headline only runs for the page. Matches are wrapped in
+# SEARCH_MARKS, which the view turns into bold after escaping the message text.
+SEARCH_CONFIG = "english"
+SEARCH_MARKS = ("\x02", "\x03")
+_SEARCH_SQL = f"""
+    SELECT page.id, page.contact_id, page.full_name, page.sender_id, page.created_at, page.total,
+           ts_headline('{SEARCH_CONFIG}', page.message, websearch_to_tsquery('{SEARCH_CONFIG}', :query),
+                       'StartSel={SEARCH_MARKS[0]}, StopSel={SEARCH_MARKS[1]}, MaxFragments=2, MinWords=6, MaxWords=16') AS snippet
+    FROM (
+        SELECT m.id, m.message, m.created_at, m.sender_id, m.rank, u.id AS contact_id, u.full_name,
+               count(*) OVER () AS total
+        FROM (
+            SELECT id, sender_id, receiver_id, message, created_at, ts_rank_cd(search_vector, query) AS rank
+            FROM direct_messages, websearch_to_tsquery('{SEARCH_CONFIG}', :query) query
+            WHERE search_vector @@ query AND (sender_id = :my_id OR receiver_id = :my_id)
+        ) m
+        JOIN users u ON u.id = CASE WHEN m.sender_id = :my_id THEN m.receiver_id ELSE m.sender_id END
+        WHERE {{contact_filter}}
+        ORDER BY m.rank DESC, m.created_at DESC, m.id DESC
+        LIMIT :limit OFFSET :offset
+    ) page
+    ORDER BY page.rank DESC, page.created_at DESC, page.id DESC
+"""
+
+# Same contacts as the inbox, so every hit can be opened
+CHAT_SEARCH_EMPLOYEE = statement("chat.search_employee", _SEARCH_SQL.format(contact_filter="u.role IN ('manager', 'owner')"))
+CHAT_SEARCH_STAFF = statement("chat.search_staff", _SEARCH_SQL.format(contact_filter="u.id != :my_id"))
+
+
+# --- BACKGROUND JOBS (src/services/jobs.py) ---
+TABLE_VERSIONS = statement("jobs.table_versions", """
+    SELECT table_name, version FROM table_versions WHERE table_name = ANY(:tables)
+""")
+
+# For writes the triggers cannot see (a partition dropped by the archive)
+BUMP_TABLE_VERSION = statement("jobs.bump_table_version", """
+    UPDATE table_versions SET version = version + 1 WHERE table_name = :table
+""")
+
+# Serialises identical requests, so two clicks at once queue one job
+LOCK_JOB_PARAMS = statement("jobs.lock_params", """
+    SELECT pg_advisory_xact_lock(hashtext(:params_hash))
+""")
+
+# Newest job for the same request that read the same data; NULL versions never match.
+# An unfinished one only counts if this host runs it and, once running, its worker is still beating.
+REUSABLE_JOB = statement("jobs.reusable", """
+    SELECT * FROM jobs
+    WHERE kind = :kind AND params_hash = :params_hash
+      AND data_versions = CAST(:versions AS jsonb)
+      AND (status = 'done'
+           OR (status = 'queued' AND runner LIKE :host_pattern)
+           OR (status = 'running' AND runner LIKE :host_pattern
+               AND heartbeat_at > now() - make_interval(secs => :stale_seconds)))
+    ORDER BY created_at DESC
+    LIMIT 1
+""")
+
+INSERT_JOB = statement("jobs.insert", """
+    INSERT INTO jobs (kind, params, params_hash, data_versions, runner, created_by)
+    VALUES (:kind, CAST(:params AS jsonb), :params_hash, CAST(:versions AS jsonb), :runner, :created_by)
+    RETURNING *
+""")
+
+JOB_BY_ID = statement("jobs.by_id", """
+    SELECT * FROM jobs WHERE id = :id
+""")
+
+# Only a queued job starts, and only a running one finishes: a cancel in between wins
+START_JOB = statement("jobs.start", """
+    UPDATE jobs SET status = 'running', started_at = now(), heartbeat_at = now() WHERE id = :id AND status = 'queued'
+""")
+
+JOB_HEARTBEAT = statement("jobs.heartbeat", """
+    UPDATE jobs SET heartbeat_at = now() WHERE id = :id AND status = 'running'
+""")
+
+JOB_PROGRESS = statement("jobs.progress", """
+    UPDATE jobs SET progress = :progress WHERE id = :id AND status = 'running'
+""")
+
+FINISH_JOB = statement("jobs.finish", """
+    UPDATE jobs
+    SET status = 'done', result = CAST(:result AS jsonb), result_path = :path, progress = NULL, finished_at = now()
+    WHERE id = :id AND status = 'running'
+""")
+
+FAIL_JOBS = statement("jobs.fail", """
+    UPDATE jobs SET status = 'failed', error = :error, progress = NULL, finished_at = now()
+    WHERE id = ANY(CAST(:ids AS uuid[])) AND status IN ('queued', 'running')
+""")
+
+# A running job whose worker stopped beating
+FAIL_STALE_JOB = statement("jobs.fail_stale", """
+    UPDATE jobs SET status = 'failed', error = :error, progress = NULL, finished_at = now()
+    WHERE id = :id AND status = 'running' AND heartbeat_at < now() - make_interval(secs => :stale_seconds)
+""")
+
+UNFINISHED_JOBS_ON_HOST = statement("jobs.unfinished_on_host", """
+    SELECT id, runner FROM jobs WHERE status IN ('queued', 'running') AND runner LIKE :host_pattern
+""")
+
+DELETE_OLD_JOBS = statement("jobs.delete_old", """
+    DELETE FROM jobs
+    WHERE status IN ('done', 'failed') AND created_at < now() - make_interval(days => :days)
+    RETURNING result_path
+""")
@@ -0,0 +1,42 @@
+import re
+
+from sqlalchemy import text
+
+# Every named statement, by name. Diagnostics and schema checks iterate this.
+STATEMENTS = {}
+
+
+# Keywords are upper case and identifiers lower case throughout queries.py, which
+# keeps "DO UPDATE SET", "FOR UPDATE OF s" and function calls out of the matches.
+# "FROM a.clock_out" inside EXTRACT() is a column, not a table: no "(" or "." after the name
+_READS = re.compile(r"\b(?i:FROM|JOIN)\s+(?:public\.)?([a-z_][a-z0-9_]*)\b(?!\s*\(|\.)")
+_WRITES = re.compile(r"\b(?i:INSERT\s+INTO|UPDATE|DELETE\s+FROM)\s+(?:public\.)?([a-z_][a-z0-9_]*)\b")
+
+
+class Statement:
+    """
+    A named SQL statement. The name is what shows up in timings and checks.
+    reads/writes are the tables it touches, used by the query cache (src/db/cache.py).
+    """
+
+    def __init__(self, name: str, sql: str, writes=()):
+        self.name = name
+        self.sql = sql
+        self.clause = text(sql).execution_options(statement_name=name)
+        self.writes = frozenset(_WRITES.findall(sql)) | frozenset(writes)
+        self.reads = frozenset(_READS.findall(sql)) | self.writes
+
+    def __repr__(self):
+        return f"Statement({self.name!r})"
+
+
+def statement(name: str, sql: str, writes=()) -> Statement:
+    """
+    Defines and registers a statement. Names must be unique.
+    writes adds tables changed indirectly (ON DELETE CASCADE, triggers) to the ones parsed from the SQL.
+    """
+    if name in STATEMENTS:
+        raise ValueError(f"Duplicate statement name: {name}")
+    stmt = Statement(name, sql, writes)
+    STATEMENTS[name] = stmt
+    return stmt
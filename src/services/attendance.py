@@ -0,0 +1,368 @@
+"""
+Shift analytics over whole columns: hours per IST day and week, overtime, and
+shifts that overlap, were entered twice or were never closed.
+
+A shift is an interval [clock_in, clock_out) in microseconds since the Unix
+epoch, held in parallel NumPy arrays (Shifts). split_at_midnight() cuts every
+interval at IST midnight in a few array operations, so a shift from 20:00 to
+04:00 puts four hours on each day. The payroll rollup splits the same way in
+SQL (_SHIFT_DAYS in src/db/queries.py). Day and week totals are bincounts over
+an employee x day grid, and overlaps come from one running maximum of
+clock_out over the shifts sorted by employee and clock_in. Nothing loops over
+shifts in Python.
+
+Overtime:
+    daily   hours worked on one IST day beyond daily_hours
+    weekly  hours in a Monday-Sunday week beyond weekly_hours, not counting that
+            week's daily overtime again. A week cut by the start or end of the
+            range only counts its days inside it.
+
+shift_report() is the owner's Shift Report; it reads the range with
+copy_binary(), which for a year of every employee's shifts is ~700k rows.
+week_summary() is one employee's week on the Time Clock, and describe_shifts()
+the hours and notes beside each shift on Overwatch.
+
+Settings, all optional:
+    [attendance]
+    daily_hours = 9          # overtime after this many hours in a day
+    weekly_hours = 48        # ... or in a week
+    stale_shift_hours = 12   # open shifts older than this are flagged as forgotten clock-outs
+
+Command line:
+    python -m src.services.attendance 2025-04-01 2026-04-01   # [start, end) by IST day
+"""
+import sys
+import uuid
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from src.db import copy_binary, read_df
+from src.db import queries as q
+from src.db.queries import BUSINESS_TZ
+
+DEFAULT_SETTINGS = {"daily_hours": 9, "weekly_hours": 48, "stale_shift_hours": 12}
+
+US_PER_HOUR = 3_600_000_000
+US_PER_DAY = 24 * US_PER_HOUR
+# Asia/Kolkata has kept +05:30 with no DST since 1945, so an IST day is plain arithmetic
+IST_OFFSET_US = 330 * 60_000_000
+# clock_out of a shift that is still open
+OPEN = np.iinfo(np.int64).max
+# Two clock-ins by one employee this close together are one shift entered twice
+DUPLICATE_US = 60_000_000
+# Day 0 (1970-01-01) was a Thursday; weeks start on Monday
+_WEEK_SHIFT = 3
+
+# PostgreSQL binary COPY of SHIFT_INTERVALS: a 19-byte header, then per row a field
+# count and a length before every value. There are no NULLs, so every row is 46 bytes.
+_COPY_SIGNATURE = b"PGCOPY\n\xff\r\n\x00"
+_COPY_HEADER = 19
+_COPY_ROW = np.dtype([
+    ("fields", ">i2"),
+    ("employee_len", ">i4"), ("employee_hi", ">u8"), ("employee_lo", ">u8"),
+    ("in_len", ">i4"), ("clock_in", ">i8"),
+    ("out_len", ">i4"), ("clock_out", ">i8"),
+])
+# Binary timestamps count microseconds from 2000-01-01 UTC
+_PG_EPOCH_US = 946_684_800 * 1_000_000
+
+
+def load_settings() -> dict:
+    try:
+        return {**DEFAULT_SETTINGS, **dict(st.secrets.get("attendance", {}))}
+    except FileNotFoundError:
+        return dict(DEFAULT_SETTINGS)
+
+
+class Shifts(NamedTuple):
+    """One entry per shift. employee indexes employee_ids; times are Unix microseconds."""
+    employee: np.ndarray
+    employee_ids: np.ndarray
+    clock_in: np.ndarray
+    clock_out: np.ndarray
+
+
+class ShiftReport(NamedTuple):
+    employees: pd.DataFrame  # one row per employee: hours, overtime and issue counts
+    daily: pd.DataFrame      # employee_id, work_date, hours, shifts, overtime
+    weekly: pd.DataFrame     # employee_id, week_start, hours, daily_overtime, weekly_overtime
+    flagged: pd.DataFrame    # shifts that overlap another, were entered twice or were never closed
+
+
+# --- INTERVAL ARITHMETIC ---
+def ist_day(t):
+    """IST calendar day of each timestamp, as days since 1970-01-01."""
+    return (t + IST_OFFSET_US) // US_PER_DAY
+
+
+def split_at_midnight(clock_in, clock_out):
+    """
+    Cuts closed shifts at IST midnight. Returns (shift, day, hours), one entry per
+    piece: which shift it came from, its IST day and the hours worked on that day.
+    A shift ending exactly at midnight has no piece on the next day.
+    """
+    first = ist_day(clock_in)
+    pieces = ist_day(np.maximum(clock_in, clock_out - 1)) - first + 1
+    shift = np.repeat(np.arange(len(clock_in)), pieces)
+    nth = np.arange(len(shift)) - np.repeat(np.cumsum(pieces) - pieces, pieces)
+    day = first[shift] + nth
+    day_start = day * US_PER_DAY - IST_OFFSET_US
+    worked = np.minimum(clock_out[shift], day_start + US_PER_DAY) - np.maximum(clock_in[shift], day_start)
+    return shift, day, worked / US_PER_HOUR
+
+
+def find_overlaps(employee, clock_in, clock_out):
+    """
+    Returns (overlaps, duplicate, covered_hours) per shift: overlaps when it starts before an
+    earlier shift of the same employee has ended, duplicate when it also starts within
+    DUPLICATE_US of the one before, and its hours that earlier shifts already cover.
+    """
+    overlaps, duplicate, covered = np.zeros(len(clock_in), bool), np.zeros(len(clock_in), bool), np.zeros(len(clock_in))
+    if len(clock_in) == 0:
+        return overlaps, duplicate, covered
+    # Each employee gets a stretch of one time axis longer than all the shifts, so one
+    # sort orders by (employee, clock_in) and one running maximum of clock_out never
+    # carries an employee's shift into the next employee's
+    base = clock_in.min()
+    span = clock_out.max() - base + 1
+    lo = clock_in - base + employee * span
+    order = np.argsort(lo)
+    lo = lo[order]
+    hi = (clock_out - base + employee * span)[order]
+    reach = np.concatenate(([np.iinfo(np.int64).min], np.maximum.accumulate(hi)[:-1]))
+
+    overlaps[order] = lo < reach
+    near = np.concatenate(([False], np.diff(lo) < DUPLICATE_US))
+    duplicate[order] = overlaps[order] & near
+    covered[order] = np.where(lo < reach, np.minimum(reach, hi) - lo, 0) / US_PER_HOUR
+    return overlaps, duplicate, covered
+
+
+def _week_starts(days):
+    """Column indexes where a new Monday-Sunday week begins, for consecutive IST days."""
+    weeks = (days + _WEEK_SHIFT) // 7
+    return np.flatnonzero(np.concatenate(([True], weeks[1:] != weeks[:-1])))
+
+
+# --- LOADING ---
+def _unix_us(column: pd.Series) -> np.ndarray:
+    return pd.to_datetime(column, utc=True).dt.tz_convert(None).dt.as_unit('us').to_numpy().view(np.int64)
+
+
+def shifts_from_frame(df: pd.DataFrame) -> Shifts:
+    """Shifts from a DataFrame with employee_id, clock_in and clock_out (NULL while open)."""
+    employee_ids, employee = np.unique(df['employee_id'].astype(str).to_numpy(), return_inverse=True)
+    clock_out = _unix_us(df['clock_out'])
+    return Shifts(employee, employee_ids, _unix_us(df['clock_in']),
+                  np.where(df['clock_out'].isna().to_numpy(), OPEN, clock_out))
+
+
+def _factorize_uuids(hi, lo):
+    """(codes, uuid strings) for uuids split into two 64-bit halves; hashes instead of sorting."""
+    hi, lo = hi.astype(np.uint64), lo.astype(np.uint64)
+    codes, uniques = pd.factorize(hi)
+    first = np.full(len(uniques), len(codes))
+    np.minimum.at(first, codes, np.arange(len(codes)))
+    if (lo[first[codes]] != lo).any():
+        # Two ids share their first 8 bytes: fall back to the exact sort
+        _, first, codes = np.unique(np.stack([hi, lo], axis=1), axis=0, return_index=True, return_inverse=True)
+    ids = [str(uuid.UUID(int=(int(h) << 64) | int(l))) for h, l in zip(hi[first], lo[first])]
+    return codes.ravel(), np.array(ids, dtype=object)
+
+
+def decode_shifts(raw: bytes) -> Shifts:
+    """Shifts from copy_binary(q.SHIFT_INTERVALS, ...)."""
+    if raw[:len(_COPY_SIGNATURE)] != _COPY_SIGNATURE or (len(raw) - _COPY_HEADER - 2) % _COPY_ROW.itemsize:
+        raise ValueError("Unexpected COPY stream; SHIFT_INTERVALS must return employee_id, clock_in, clock_out")
+    rows = np.frombuffer(raw, dtype=_COPY_ROW, offset=_COPY_HEADER, count=(len(raw) - _COPY_HEADER - 2) // _COPY_ROW.itemsize)
+    if not (rows["fields"] == 3).all():
+        raise ValueError("Unexpected COPY row; SHIFT_INTERVALS must return three non-NULL columns")
+
+    employee, employee_ids = _factorize_uuids(rows["employee_hi"], rows["employee_lo"])
+    clock_out = rows["clock_out"].astype(np.int64)
+    return Shifts(
+        employee,
+        employee_ids,
+        rows["clock_in"].astype(np.int64) + _PG_EPOCH_US,
+        np.where(clock_out == OPEN, OPEN, clock_out + _PG_EPOCH_US),
+    )
+
+
+def _day_number(day) -> int:
+    """An IST calendar date as ist_day() numbers it."""
+    return (pd.Timestamp(day).normalize() - pd.Timestamp("1970-01-01")).days
+
+
+def _timestamps(us) -> pd.Series:
+    """Unix microseconds (OPEN for none) to tz-aware UTC timestamps."""
+    us = np.where(us == OPEN, np.iinfo(np.int64).min, us)
+    return pd.Series(us.view('datetime64[us]')).dt.tz_localize('UTC')
+
+
+# --- ANALYSIS ---
+def analyze(shifts: Shifts, start, end, now=None, settings=None) -> ShiftReport:
+    """
+    The report for IST days in [start, end). Hours come from closed shifts only, split at
+    midnight and clipped to the range; open shifts are flagged once older than stale_shift_hours.
+    """
+    settings = settings or load_settings()
+    first_day = _day_number(start)
+    n_days = max(_day_number(end) - first_day, 0)
+    now_us = pd.Timestamp(now or pd.Timestamp.now(tz='UTC')).value // 1000
+    n_emp = len(shifts.employee_ids)
+    daily_limit, weekly_limit = float(settings["daily_hours"]), float(settings["weekly_hours"])
+
+    closed = shifts.clock_out != OPEN
+    started = ist_day(shifts.clock_in) - first_day
+    in_range = (started >= 0) & (started < n_days)
+
+    # Hours and shifts on an employee x day grid
+    c = np.flatnonzero(closed)
+    piece, day, hours = split_at_midnight(shifts.clock_in[c], shifts.clock_out[c])
+    day -= first_day
+    keep = (day >= 0) & (day < n_days)
+    cell = shifts.employee[c][piece[keep]] * n_days + day[keep]
+    grid = np.bincount(cell, weights=hours[keep], minlength=n_emp * n_days).reshape(n_emp, n_days)
+    counted = closed & in_range
+    starts = np.bincount(shifts.employee[counted] * n_days + started[counted],
+                         minlength=n_emp * n_days).reshape(n_emp, n_days)
+    daily_ot = np.clip(grid - daily_limit, 0, None)
+
+    # Weeks are runs of grid columns
+    if n_days:
+        bounds = _week_starts(np.arange(first_day, first_day + n_days))
+        week_hours = np.add.reduceat(grid, bounds, axis=1)
+        week_daily_ot = np.add.reduceat(daily_ot, bounds, axis=1)
+    else:
+        bounds = np.zeros(0, int)
+        week_hours = week_daily_ot = np.zeros((n_emp, 0))
+    weekly_ot = np.clip(week_hours - week_daily_ot - weekly_limit, 0, None)
+
+    # Overlaps, against every loaded shift (open ones run until now)
+    ends = np.where(closed, shifts.clock_out, np.maximum(now_us, shifts.clock_in))
+    overlaps, duplicate, covered = find_overlaps(shifts.employee, shifts.clock_in, ends)
+    open_hours = (now_us - shifts.clock_in) / US_PER_HOUR
+    stale = ~closed & (open_hours > float(settings["stale_shift_hours"]))
+    past_midnight = counted & (ist_day(np.maximum(shifts.clock_in, shifts.clock_out - 1)) > ist_day(shifts.clock_in))
+
+    def per_employee(mask, weights=None):
+        return np.bincount(shifts.employee[mask], weights=None if weights is None else weights[mask], minlength=n_emp)
+
+    flag = in_range & (overlaps | stale)
+    employees = pd.DataFrame({
+        "employee_id": shifts.employee_ids,
+        "days": (grid > 0).sum(axis=1),
+        "shifts": starts.sum(axis=1),
+        "hours": grid.sum(axis=1),
+        "longest_day": grid.max(axis=1, initial=0.0),
+        "daily_overtime": daily_ot.sum(axis=1),
+        "weekly_overtime": weekly_ot.sum(axis=1),
+        "past_midnight": per_employee(past_midnight),
+        "overlaps": per_employee(in_range & overlaps & ~duplicate),
+        "duplicates": per_employee(in_range & duplicate),
+        "double_counted_hours": per_employee(in_range & closed, covered),
+        "open_stale": per_employee(in_range & stale),
+    })
+    employees["overtime"] = employees["daily_overtime"] + employees["weekly_overtime"]
+    employees = employees[(employees["hours"] > 0) | (per_employee(flag) > 0)].reset_index(drop=True)
+
+    # Hundreds of thousands of rows: employee ids as a categorical rather than one string per
+    # row, and dates in seconds, which pandas stores as is (it converts day units row by row)
+    emp, col = np.nonzero(grid)
+    daily = pd.DataFrame({
+        "employee_id": pd.Categorical.from_codes(emp, shifts.employee_ids),
+        "work_date": (first_day + col).astype('datetime64[D]').astype('datetime64[s]'),
+        "hours": grid[emp, col],
+        "shifts": starts[emp, col],
+        "overtime": daily_ot[emp, col],
+    })
+
+    emp, week = np.nonzero(week_hours)
+    weekly = pd.DataFrame({
+        "employee_id": pd.Categorical.from_codes(emp, shifts.employee_ids),
+        "week_start": (first_day + bounds[week]).astype('datetime64[D]').astype('datetime64[s]'),
+        "hours": week_hours[emp, week],
+        "daily_overtime": week_daily_ot[emp, week],
+        "weekly_overtime": weekly_ot[emp, week],
+    })
+
+    f = np.flatnonzero(flag)
+    issue = np.where(duplicate[f], "Duplicate clock-in",
+                     np.where(overlaps[f], "Overlaps an earlier shift", ""))
+    stale_note = np.char.mod("Open for %.0f h", open_hours[f])
+    issue = np.where(stale[f], np.where(issue == "", stale_note, np.char.add(np.char.add(issue, " · "), stale_note)), issue)
+    flagged = pd.DataFrame({
+        "employee_id": shifts.employee_ids[shifts.employee[f]],
+        "clock_in": _timestamps(shifts.clock_in[f]),
+        "clock_out": _timestamps(shifts.clock_out[f]),
+        "issue": issue,
+    }).sort_values("clock_in", ignore_index=True)
+
+    return ShiftReport(employees, daily, weekly, flagged)
+
+
+def describe_shifts(clock_in: pd.Series, clock_out: pd.Series = None, now=None) -> pd.DataFrame:
+    """
+    Per shift, for tables that list them: hours (so far, while open), whether it ran past
+    IST midnight, and whether it is an open shift older than stale_shift_hours.
+    Without clock_out every shift is still open.
+    """
+    now_us = pd.Timestamp(now or pd.Timestamp.now(tz='UTC')).value // 1000
+    if clock_out is None:
+        clock_out = pd.Series(pd.NaT, index=clock_in.index)
+    start = _unix_us(clock_in)
+    is_open = clock_out.isna().to_numpy()
+    end = np.where(is_open, np.maximum(now_us, start), _unix_us(clock_out))
+    hours = (end - start) / US_PER_HOUR
+    return pd.DataFrame({
+        "hours": hours,
+        "past_midnight": ist_day(np.maximum(start, end - 1)) > ist_day(start),
+        "stale": is_open & (hours > float(load_settings()["stale_shift_hours"])),
+    }, index=clock_in.index)
+
+
+def shift_report(start, end, now=None) -> ShiftReport:
+    """The owner's report for IST days in [start, end), every employee."""
+    start_ts = pd.Timestamp(start).tz_localize(BUSINESS_TZ).to_pydatetime()
+    end_ts = pd.Timestamp(end).tz_localize(BUSINESS_TZ).to_pydatetime()
+    shifts = decode_shifts(copy_binary(q.SHIFT_INTERVALS, {"start_ts": start_ts, "end_ts": end_ts}))
+    return analyze(shifts, start, end, now)
+
+
+def week_summary(uid, now=None) -> dict:
+    """One employee's hours today and this week so far, the open shift counted up to now."""
+    settings = load_settings()
+    now = pd.Timestamp(now or pd.Timestamp.now(tz='UTC'))
+    today = now.tz_convert(BUSINESS_TZ).normalize().tz_localize(None)
+    monday = today - pd.Timedelta(days=today.weekday())
+    df = read_df(q.MY_SHIFTS, {"uid": str(uid), "start_ts": monday.tz_localize(BUSINESS_TZ).to_pydatetime()}, cached=True)
+    if df.empty:
+        return {"today": 0.0, "week": 0.0, "overtime": 0.0, **settings}
+
+    shifts = shifts_from_frame(df)
+    now_us = now.value // 1000
+    shifts = shifts._replace(clock_out=np.where(shifts.clock_out == OPEN, np.maximum(now_us, shifts.clock_in), shifts.clock_out))
+    report = analyze(shifts, monday, today + pd.Timedelta(days=1), now, settings)
+    days = report.daily
+    return {
+        "today": float(days.loc[days['work_date'] == today, 'hours'].sum()),
+        "week": float(days['hours'].sum()),
+        "overtime": float(report.employees['overtime'].sum()),
+        **settings,
+    }
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print(__doc__)
+        sys.exit(1)
+
+    report = shift_report(*sys.argv[1:3])
+    print(report.employees[['hours', 'daily_overtime', 'weekly_overtime', 'past_midnight',
+                            'overlaps', 'duplicates', 'open_stale']].sum().round(2).to_string())
+    if not report.flagged.empty:
+        report.flagged.to_csv("shift_flags.csv", index=False)
+        print(f"Flagged shifts written to shift_flags.csv ({len(report.flagged)})")
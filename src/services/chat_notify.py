@@ -0,0 +1,174 @@
+import itertools
+import json
+import logging
+import select
+import threading
+import time
+from collections import OrderedDict
+
+import psycopg2
+import streamlit as st
+
+log = logging.getLogger(__name__)
+
+# Must match the channel and trigger in migrations/0002_direct_messages_notify.sql
+CHANNEL = "direct_messages_new"
+TRIGGER = "trg_direct_messages_notify"
+
+# How long the listener blocks in select() before checking whether it should stop
+_WAIT_SECONDS = 5
+# Back-off between reconnect attempts when the listener connection drops
+_RECONNECT_SECONDS = 3
+# A silent connection is probed with SELECT 1 this often, so one that died without
+# a FIN (NAT timeout, failover) is noticed and replaced instead of listening forever
+_KEEPALIVE_SECONDS = 30
+# Without the trigger nothing is ever announced; look again this often in case it is migrated in
+_TRIGGER_RECHECK_SECONDS = 60
+# libpq TCP keepalives, unless DATABASE_URL sets its own
+_TCP_KEEPALIVES = {"keepalives": 1, "keepalives_idle": 30, "keepalives_interval": 10, "keepalives_count": 3}
+# Counters kept per process; the least recently used user or conversation is forgotten beyond this
+_MAX_KEYS = 10_000
+
+_TRIGGER_EXISTS = f"""
+    SELECT EXISTS (
+        SELECT 1 FROM pg_trigger
+        WHERE tgrelid = to_regclass('public.direct_messages') AND tgname = '{TRIGGER}' AND tgenabled <> 'D'
+    )
+"""
+
+
+class ChatNotifier:
+    """
+    One LISTEN connection per Streamlit server process.
+
+    Every NOTIFY from the direct_messages insert trigger bumps a counter for the
+    sender, one for the receiver and one for their conversation. Chat sessions
+    remember the counters they last saw and only go to the database when one has
+    moved, so idle chat tabs never query and news in one conversation does not
+    reload the others.
+
+    Counters come from one process-wide sequence, so a forgotten key can read
+    as the highest value ever forgotten: a session that saw the key's last bump
+    still matches it, and any other re-syncs once.
+
+    healthy is False while disconnected and when the notify trigger is missing;
+    callers then fall back to polling.
+    """
+
+    def __init__(self, url):
+        self._url = url
+        self._lock = threading.Lock()
+        self._versions = OrderedDict()
+        self._seq = itertools.count(1)
+        # What a key missing from _versions reads as
+        self._floor = 0
+        # Bumped after every (re)connect: notifications sent while we were
+        # disconnected are lost, so every session must re-sync once.
+        self._generation = 0
+        self.healthy = False
+        self.trigger_missing = False
+        self._thread = threading.Thread(target=self._run, name="chat-notifier", daemon=True)
+        self._thread.start()
+
+    def version(self, user_id, other_id=None):
+        """
+        An opaque token that changes whenever user_id has new messages, or, with
+        other_id, whenever the conversation between the two does.
+        """
+        key = str(user_id) if other_id is None else _pair(user_id, other_id)
+        with self._lock:
+            if key in self._versions:
+                self._versions.move_to_end(key)
+                return (self._generation, self._versions[key])
+            return (self._generation, self._floor)
+
+    def _bump(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._versions[key] = next(self._seq)
+                self._versions.move_to_end(key)
+            while len(self._versions) > _MAX_KEYS:
+                _, forgotten = self._versions.popitem(last=False)
+                self._floor = max(self._floor, forgotten)
+
+    def _drain(self, pg):
+        """Bumps the counters for every notification psycopg2 has buffered on pg."""
+        while pg.notifies:
+            note = pg.notifies.pop(0)
+            try:
+                payload = json.loads(note.payload)
+                sender, receiver = str(payload["sender_id"]), str(payload["receiver_id"])
+                self._bump(sender, receiver, _pair(sender, receiver))
+            except (ValueError, KeyError):
+                continue
+
+    def _connect(self):
+        pg = psycopg2.connect(
+            **self._url.translate_connect_args(username="user", database="dbname"),
+            **{**_TCP_KEEPALIVES, **self._url.query},
+        )
+        pg.set_session(autocommit=True)
+        return pg
+
+    def _run(self):
+        while True:
+            try:
+                pg = self._connect()
+                with pg.cursor() as cur:
+                    cur.execute(_TRIGGER_EXISTS)
+                    has_trigger = cur.fetchone()[0]
+                    if has_trigger:
+                        cur.execute(f"LISTEN {CHANNEL}")
+            except Exception:
+                self.healthy = False
+                time.sleep(_RECONNECT_SECONDS)
+                continue
+
+            if not has_trigger:
+                if not self.trigger_missing:
+                    log.warning("%s is missing on direct_messages (migration 0002); chat falls back to polling", TRIGGER)
+                self.trigger_missing = True
+                self.healthy = False
+                pg.close()
+                time.sleep(_TRIGGER_RECHECK_SECONDS)
+                continue
+
+            with self._lock:
+                self._generation += 1
+            self.trigger_missing = False
+            self.healthy = True
+
+            try:
+                quiet_since = time.monotonic()
+                while True:
+                    readable, _, _ = select.select([pg], [], [], _WAIT_SECONDS)
+                    if not readable:
+                        if time.monotonic() - quiet_since >= _KEEPALIVE_SECONDS:
+                            with pg.cursor() as cur:
+                                cur.execute("SELECT 1")
+                            quiet_since = time.monotonic()
+                            # A notification that arrived with the probe's reply is already buffered;
+                            # the socket will not turn readable for it again
+                            self._drain(pg)
+                        continue
+                    quiet_since = time.monotonic()
+                    pg.poll()
+                    self._drain(pg)
+            except Exception:
+                self.healthy = False
+                try:
+                    pg.close()
+                except Exception:
+                    pass
+                time.sleep(_RECONNECT_SECONDS)
+
+
+def _pair(a, b) -> tuple:
+    """A conversation's key, the same whichever side sent."""
+    return tuple(sorted((str(a), str(b))))
+
+
+@st.cache_resource
+def get_notifier(_engine):
+    """Starts (once per process) and returns the shared ChatNotifier."""
+    return ChatNotifier(_engine.url)
@@ -0,0 +1,191 @@
+"""
+Streaming exports of attendance and payroll data.
+
+Rows are read through a server-side cursor (stream_results + yield_per) in
+CHUNK_ROWS pieces. Each piece is appended to a temporary file as CSV,
+Parquet (pyarrow, row group per chunk) or XLSX (openpyxl write-only
+workbook, optional dependency). Only one chunk is ever held in memory, no
+matter how many rows the range covers.
+
+Streamlit's download_button cannot stream: it loads the finished file into
+the server's media store. The Payroll page therefore builds the file in a
+background job (src/services/jobs.py) and reads it only when the download
+button is clicked. For very large year-end extracts the CLI writes straight
+to disk:
+    python -m src.services.exports shifts 2025-01-01 2026-01-01 shifts_2025.parquet
+"""
+import importlib
+import sys
+
+import pandas as pd
+
+from src.db import get_engine
+from src.db import queries as q
+
+CHUNK_ROWS = 50_000
+XLSX_MAX_ROWS = 1_048_575  # Excel's sheet limit minus the header
+
+FORMATS = {
+    "CSV": ("csv", "text/csv"),
+    "Parquet": ("parquet", "application/vnd.apache.parquet"),
+    "Excel (XLSX)": ("xlsx", "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"),
+}
+
+
+class Export:
+    """A streamable dataset: its statement plus fixed column types, so every chunk has the same schema."""
+
+    def __init__(self, label, stmt, dtypes):
+        self.label = label
+        self.stmt = stmt
+        self.dtypes = dtypes
+
+
+EXPORTS = {
+    "shifts": Export("Shifts (raw attendance)", q.EXPORT_SHIFTS, {
+        "shift_id": "string", "employee": "string", "email": "string",
+        "clock_in": "datetime64[us]", "clock_out": "datetime64[us]", "hours": "float64",
+        "status": "string", "is_verified": "boolean", "office": "string", "comments": "string",
+    }),
+    "daily_pay": Export("Daily hours & pay", q.EXPORT_DAILY_PAY, {
+        "work_date": "datetime64[us]", "employee": "string", "email": "string",
+        "shifts": "Int64", "hours": "float64", "hourly_rate": "float64", "pay": "float64",
+    }),
+}
+
+
+# Formats that need an optional package, and the package
+FORMAT_PACKAGES = {"parquet": "pyarrow", "xlsx": "openpyxl"}
+
+
+def format_available(ext: str) -> bool:
+    """False for Parquet without pyarrow and for XLSX without openpyxl."""
+    package = FORMAT_PACKAGES.get(ext)
+    if package is None:
+        return True
+    try:
+        importlib.import_module(package)
+        return True
+    except ImportError:
+        return False
+
+
+class ExportError(RuntimeError):
+    """Export cannot be produced in the requested format."""
+
+
+def iter_chunks(export: Export, params: dict, chunk_rows: int = CHUNK_ROWS):
+    """Yields DataFrames of up to chunk_rows rows, read with a server-side cursor."""
+    with get_engine().connect() as c:
+        result = c.execution_options(stream_results=True, yield_per=chunk_rows).execute(export.stmt.clause, params)
+        columns = list(result.keys())
+        for part in result.partitions(chunk_rows):
+            yield pd.DataFrame(part, columns=columns).astype(export.dtypes)
+
+
+def _write_csv(chunks, path):
+    rows = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        for i, chunk in enumerate(chunks):
+            chunk.to_csv(f, index=False, header=(i == 0))
+            rows += len(chunk)
+    return rows
+
+
+def _write_parquet(chunks, path):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ExportError("Parquet export needs the pyarrow package (pip install pyarrow). CSV works without it.")
+
+    rows, writer = 0, None
+    try:
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema, compression="zstd")
+            writer.write_table(table.cast(writer.schema))
+            rows += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+
+def _write_xlsx(chunks, path):
+    try:
+        from openpyxl import Workbook
+    except ImportError:
+        raise ExportError("Excel export needs the openpyxl package (pip install openpyxl). CSV and Parquet work without it.")
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet("export")
+    rows = 0
+    for i, chunk in enumerate(chunks):
+        if i == 0:
+            ws.append(list(chunk.columns))
+        if rows + len(chunk) > XLSX_MAX_ROWS:
+            raise ExportError(f"More than {XLSX_MAX_ROWS:,} rows; Excel cannot hold this range. Use CSV or Parquet.")
+        # Cells must be plain Python values; missing values become empty cells
+        for record in chunk.astype(object).where(chunk.notna(), None).itertuples(index=False, name=None):
+            ws.append(record)
+        rows += len(chunk)
+    wb.save(path)
+    return rows
+
+
+_WRITERS = {"csv": _write_csv, "parquet": _write_parquet, "xlsx": _write_xlsx}
+
+
+def _empty_frame(export: Export) -> pd.DataFrame:
+    return pd.DataFrame({col: pd.Series(dtype=dtype) for col, dtype in export.dtypes.items()})
+
+
+def write_export(key: str, params: dict, fmt: str, path: str, progress=None) -> int:
+    """
+    Streams an export into path in the given format ('csv', 'parquet', 'xlsx'). Returns rows written.
+    progress, if given, is called with the running row count after each chunk.
+    """
+    export = EXPORTS[key]
+
+    def chunks():
+        produced, rows = False, 0
+        for chunk in iter_chunks(export, params):
+            produced = True
+            yield chunk
+            rows += len(chunk)
+            if progress:
+                progress(rows)
+        if not produced:
+            # Still write a header / schema for an empty range
+            yield _empty_frame(export)
+
+    return _WRITERS[fmt](chunks(), path)
+
+
+def export_params(key: str, start, end, emp_ids=None) -> dict:
+    """Query parameters for [start, end) IST calendar days and an optional employee list."""
+    start, end = pd.Timestamp(start), pd.Timestamp(end)
+    if key == "daily_pay":
+        return {"start": start.strftime('%Y-%m-%d'), "end": end.strftime('%Y-%m-%d'), "emp_ids": emp_ids or None}
+    return {
+        "start_ts": start.tz_localize('Asia/Kolkata').to_pydatetime(),
+        "end_ts": end.tz_localize('Asia/Kolkata').to_pydatetime(),
+        "emp_ids": emp_ids or None,
+    }
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 5 or sys.argv[1] not in EXPORTS:
+        print(__doc__)
+        print("datasets:", ", ".join(EXPORTS))
+        sys.exit(1)
+
+    key, start, end, out_path = sys.argv[1:]
+    fmt = out_path.rsplit(".", 1)[-1].lower()
+    if fmt not in _WRITERS:
+        print("Output file must end in .csv, .parquet or .xlsx")
+        sys.exit(1)
+    written = write_export(key, export_params(key, start, end), fmt, out_path)
+    print(f"{written:,} rows written to {out_path}")
@@ -1,18 +1,215 @@
-from geopy.distance import geodesic
+"""
+Geofence engine for one or more office sites.
 
-# CONFIG: Set your actual office coordinates here
-OFFICE_COORDS = (30.1881886, 74.3046929) 
+Sites come from the `offices` table (active rows), else from secrets.toml:
+    [[geofence.offices]]
+    name = "HQ"
+    lat = 30.1881886
+    lon = 74.3046929
+    radius_m = 100
+and finally fall back to the single OFFICE_COORDS / ALLOWED_RADIUS_METERS below.
+
+A single check runs a bounding-box prefilter and a haversine distance over all
+sites as NumPy arrays. The exact geodesic is only computed when the haversine
+result lands within EDGE_BAND of a fence, where its ~0.5% error could flip
+the answer.
+
+audit_attendance() re-checks stored clock-in coordinates in batches with the
+same vectorized math. Command line:
+    python -m src.services.geolocation audit [start_date end_date]
+"""
+import sys
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from src.db import get_engine, read_df
+from src.db import queries as q
+
+# CONFIG: Fallback site when no offices are configured
+OFFICE_COORDS = (30.1881886, 74.3046929)
 ALLOWED_RADIUS_METERS = 100
 
+EARTH_RADIUS_M = 6_371_008.8
+METERS_PER_DEG_LAT = 111_320.0
+# Haversine vs. WGS84 geodesic differs by up to ~0.5%; inside this band we ask geopy
+EDGE_BAND = 0.006
+# Rows per audit batch (arrays of this length x number of sites)
+AUDIT_BATCH = 200_000
+
+
+def _geodesic_m(a, b) -> float:
+    # geopy pulls in every geocoder and requests; most renders never reach the fence edge
+    from geopy.distance import geodesic
+    return geodesic(a, b).meters
+
+
+def haversine_m(lat1, lon1, lat2, lon2):
+    """Great-circle distance in metres; broadcasts over NumPy arrays."""
+    lat1, lon1, lat2, lon2 = map(np.radians, (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+class Geofence:
+    """All sites as parallel arrays, so every check is a handful of vector operations."""
+
+    def __init__(self, offices: pd.DataFrame):
+        self.offices = offices.reset_index(drop=True)
+        self.ids = self.offices['id'].to_numpy(dtype=object)
+        self.names = self.offices['name'].astype(str).to_numpy()
+        self.lat = self.offices['lat'].astype(float).to_numpy()
+        self.lon = self.offices['lon'].astype(float).to_numpy()
+        self.radius = self.offices['radius_m'].astype(float).to_numpy()
+
+        # Bounding boxes padded by the edge band, in degrees
+        pad = self.radius * (1 + EDGE_BAND) + 1
+        self.dlat = pad / METERS_PER_DEG_LAT
+        self.dlon = pad / (METERS_PER_DEG_LAT * np.maximum(np.cos(np.radians(self.lat)), 1e-6))
+
+    def locate(self, lat, lon):
+        """
+        Returns (is_inside, distance_m, office_index) for one point.
+        distance_m is to the nearest site's centre; office_index is the site we are inside
+        (or the nearest one when outside).
+        """
+        d = haversine_m(lat, lon, self.lat, self.lon)
+        in_box = (np.abs(self.lat - lat) <= self.dlat) & (np.abs(self.lon - lon) <= self.dlon)
+
+        for i in np.flatnonzero(in_box)[np.argsort(d[in_box] - self.radius[in_box])]:
+            dist = d[i]
+            if abs(dist - self.radius[i]) <= self.radius[i] * EDGE_BAND + 1:
+                dist = _geodesic_m((self.lat[i], self.lon[i]), (lat, lon))
+            if dist <= self.radius[i]:
+                return True, dist, int(i)
+
+        nearest = int(np.argmin(d))
+        return False, float(d[nearest]), nearest
+
+    def audit(self, lat, lon):
+        """
+        Vectorized check for whole columns of coordinates.
+        Returns (inside: bool[N], distance_m: float[N], office_index: int[N]); NaN coordinates are outside.
+        """
+        lat = np.asarray(lat, dtype=float)
+        lon = np.asarray(lon, dtype=float)
+        d = haversine_m(lat[:, None], lon[:, None], self.lat[None, :], self.lon[None, :])  # N x M
+        margin = d - self.radius[None, :]
+        best = np.argmin(np.where(np.isnan(margin), np.inf, margin), axis=1)
+        rows = np.arange(len(lat))
+        dist = d[rows, best]
+        radius = self.radius[best]
+
+        # Only the few points hugging a fence get the exact geodesic
+        edge = np.flatnonzero(np.abs(dist - radius) <= radius * EDGE_BAND + 1)
+        for r in edge:
+            dist[r] = _geodesic_m((self.lat[best[r]], self.lon[best[r]]), (lat[r], lon[r]))
+
+        inside = np.nan_to_num(dist, nan=np.inf) <= radius
+        return inside, dist, best
+
+
+def _config_offices() -> pd.DataFrame:
+    try:
+        rows = [dict(o) for o in st.secrets.get("geofence", {}).get("offices", [])]
+    except FileNotFoundError:
+        rows = []
+    if not rows:
+        rows = [{"name": "Office", "lat": OFFICE_COORDS[0], "lon": OFFICE_COORDS[1], "radius_m": ALLOWED_RADIUS_METERS}]
+    df = pd.DataFrame(rows)
+    # Config sites have no DB id; clock-ins there store office_id = NULL
+    df['id'] = None
+    return df
+
+
+@st.cache_resource(ttl=300, show_spinner=False)
+def _office_geofence() -> Geofence:
+    """Active sites from the offices table, else config. Rebuilt every 5 minutes; a failed read raises and is not cached."""
+    offices = read_df(q.ACTIVE_OFFICES)
+    if offices.empty:
+        offices = _config_offices()
+    return Geofence(offices)
+
+
+def get_geofence() -> Geofence:
+    """The cached office geofence, or the config sites while the database cannot be read."""
+    try:
+        return _office_geofence()
+    except Exception:
+        return Geofence(_config_offices())
+
+
 def check_geofence(user_lat, user_lon):
     """
     Returns (is_inside: bool, distance: int)
     """
     if user_lat is None or user_lon is None:
         return False, 9999
-        
-    user_point = (user_lat, user_lon)
-    distance = geodesic(OFFICE_COORDS, user_point).meters
-    
-    is_inside = distance <= ALLOWED_RADIUS_METERS
-    return is_inside, int(distance)
\ No newline at end of file
+
+    is_inside, distance, _ = get_geofence().locate(float(user_lat), float(user_lon))
+    return is_inside, int(distance)
+
+
+def locate_office(user_lat, user_lon):
+    """Like check_geofence, plus the matched (or nearest) site as a dict with id and name."""
+    if user_lat is None or user_lon is None:
+        return False, 9999, None
+
+    fence = get_geofence()
+    is_inside, distance, idx = fence.locate(float(user_lat), float(user_lon))
+    office_id = fence.ids[idx]
+    office = {"id": None if pd.isna(office_id) else str(office_id), "name": fence.names[idx]}
+    return is_inside, int(distance), office
+
+
+def audit_attendance(start_ts=None, end_ts=None, batch_size=AUDIT_BATCH, progress=None):
+    """
+    Re-checks every stored clock-in location against the current sites.
+    Streams attendance_logs with a server-side cursor in batch_size chunks, so memory
+    stays flat. Returns (summary dict, DataFrame of rows that fail or disagree with is_verified).
+    """
+    fence = get_geofence()
+    params = {"start_ts": start_ts, "end_ts": end_ts}
+    total = inside_total = 0
+    flagged = []
+
+    with get_engine().connect() as c:
+        c = c.execution_options(stream_results=True, max_row_buffer=batch_size)
+        for chunk in pd.read_sql(q.AUDIT_LOCATIONS.clause, c, params=params, chunksize=batch_size):
+            inside, dist, best = fence.audit(chunk['location_lat'].to_numpy(), chunk['location_long'].to_numpy())
+            total += len(chunk)
+            inside_total += int(inside.sum())
+
+            verified = chunk['is_verified'].fillna(False).astype(bool).to_numpy()
+            bad = ~inside | (inside != verified)
+            if bad.any():
+                out = chunk.loc[bad, ['id', 'employee_id', 'clock_in', 'location_lat', 'location_long', 'is_verified']].copy()
+                out['inside_now'] = inside[bad]
+                out['distance_m'] = np.round(dist[bad], 1)
+                out['nearest_office'] = np.where(np.isnan(dist[bad]), None, fence.names[best[bad]])
+                flagged.append(out)
+            if progress:
+                progress(total)
+
+    flagged_df = pd.concat(flagged, ignore_index=True) if flagged else pd.DataFrame()
+    summary = {
+        "checked": total,
+        "inside": inside_total,
+        "outside": total - inside_total,
+        "verified_but_outside": int(((flagged_df['is_verified'] == True) & ~flagged_df['inside_now']).sum()) if not flagged_df.empty else 0,
+    }
+    return summary, flagged_df
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] != "audit":
+        print(__doc__)
+        sys.exit(1)
+
+    bounds = [pd.Timestamp(d).tz_localize("Asia/Kolkata").to_pydatetime() for d in sys.argv[2:4]]
+    summary, flagged_df = audit_attendance(*bounds)
+    print(summary)
+    if not flagged_df.empty:
+        flagged_df.to_csv("geofence_audit.csv", index=False)
+        print(f"Flagged rows written to geofence_audit.csv ({len(flagged_df)})")
@@ -0,0 +1,307 @@
+"""
+Background jobs for heavy owner operations: payroll, exports and the geofence audit.
+
+enqueue() records a job in the jobs table and hands it to a small pool of
+worker processes. A year-long report therefore never blocks the script thread
+that asked for it, and a page refresh does not throw the work away. The page
+keeps only the job id and polls its row, one primary-key lookup every
+poll_seconds (src/views/job_status.py). A finished job leaves its result in
+{path}/<job id>.<ext> and a small summary in jobs.result.
+
+A finished (or still running) job is reused for the same kind and parameters
+as long as the tables it reads are unchanged. Every statement that writes one
+of them bumps its counter in table_versions (statement-level triggers, see
+migrations/0016_jobs.sql). That holds for writes from any process, cron job or
+psql session, not only this server, and survives restarts. Results live on the
+server's disk, so another host recomputes rather than reusing them, and a
+job still queued or running elsewhere is not waited on either.
+
+A running job's worker stamps heartbeat_at every HEARTBEAT_SECONDS. If it
+stops for STALE_AFTER_SECONDS the worker is gone: the job is no longer reused
+and is marked failed when a page next looks at it. A worker that dies breaks
+the whole process pool; its jobs are marked failed and the next submit starts
+a fresh pool.
+
+Settings, all optional:
+    [jobs]
+    workers = 2            # worker processes per server
+    path = "job_results"   # directory for result files
+    keep_days = 7          # finished jobs and their files are deleted after this
+    poll_seconds = 2       # how often a waiting page checks on its job
+"""
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import socket
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from typing import Callable, NamedTuple, Optional
+
+import pandas as pd
+import streamlit as st
+
+from src.db import execute, fetch_all, fetch_one, transaction
+from src.db import queries as q
+
+log = logging.getLogger(__name__)
+
+DEFAULT_SETTINGS = {"workers": 2, "path": "job_results", "keep_days": 7, "poll_seconds": 2}
+
+# Progress is written to the jobs row at most this often
+PROGRESS_EVERY_SECONDS = 1.0
+# A running job's worker proves it is alive this often; after STALE_AFTER_SECONDS of silence it is presumed dead
+HEARTBEAT_SECONDS = 10
+STALE_AFTER_SECONDS = 60
+
+
+def load_settings() -> dict:
+    try:
+        return {**DEFAULT_SETTINGS, **dict(st.secrets.get("jobs", {}))}
+    except FileNotFoundError:
+        return dict(DEFAULT_SETTINGS)
+
+
+# --- JOB KINDS ---
+# Each run(params, path, progress) writes its result to path plus an extension
+# of its choosing and returns (summary dict, file written).
+def _run_payroll(params, path, progress):
+    from src.services.payroll import payroll_report
+    progress("Adding up the daily hours")
+    df = payroll_report(params["start"], params["end"])
+    df.to_parquet(path + ".parquet", index=False)
+    return {"employees": len(df), "total_pay": float(df['Total Pay'].sum())}, path + ".parquet"
+
+
+def _run_export(params, path, progress):
+    from src.services.exports import export_params, write_export
+    out = f"{path}.{params['fmt']}"
+    query_params = export_params(params["dataset"], params["start"], params["end"], params["emp_ids"])
+    rows = write_export(params["dataset"], query_params, params["fmt"], out,
+                        progress=lambda n: progress(f"{n:,} rows written"))
+    return {"rows": rows}, out
+
+
+def _run_audit(params, path, progress):
+    from src.services.geolocation import audit_attendance
+    start = pd.Timestamp(params["start"]).tz_localize('Asia/Kolkata').to_pydatetime()
+    end = pd.Timestamp(params["end"]).tz_localize('Asia/Kolkata').to_pydatetime()
+    summary, flagged = audit_attendance(start, end, progress=lambda n: progress(f"Checked {n:,} clock-ins"))
+    flagged.to_parquet(path + ".parquet", index=False)
+    return summary, path + ".parquet"
+
+
+class JobKind(NamedTuple):
+    label: str
+    run: Callable
+    # What it reads; a change to any of these tables makes earlier results stale
+    statements: tuple
+
+
+JOBS = {
+    "payroll": JobKind("Payroll", _run_payroll, (q.PAYROLL_BY_RANGE,)),
+    "export": JobKind("Export", _run_export, (q.EXPORT_SHIFTS, q.EXPORT_DAILY_PAY)),
+    "audit": JobKind("Geofence audit", _run_audit, (q.AUDIT_LOCATIONS, q.ACTIVE_OFFICES)),
+}
+
+
+def _tables(kind: str) -> list:
+    return sorted(set().union(*(stmt.reads for stmt in JOBS[kind].statements)))
+
+
+def data_versions(kind: str) -> Optional[dict]:
+    """{table: version} for everything the kind reads, or None if a table is not versioned (never reused)."""
+    tables = _tables(kind)
+    versions = {r["table_name"]: int(r["version"]) for r in fetch_all(q.TABLE_VERSIONS, {"tables": tables})}
+    return versions if len(versions) == len(tables) else None
+
+
+def params_hash(kind: str, params: dict) -> str:
+    return hashlib.sha256(json.dumps([kind, params], sort_keys=True, default=str).encode()).hexdigest()
+
+
+# --- WORKER SIDE ---
+class _Progress:
+    """Writes progress text to the job row, throttled so a fast loop does not flood the database."""
+
+    def __init__(self, job_id):
+        self.job_id = job_id
+        self._last = 0.0
+
+    def __call__(self, text: str):
+        now = time.monotonic()
+        if now - self._last >= PROGRESS_EVERY_SECONDS:
+            self._last = now
+            execute(q.JOB_PROGRESS, {"id": self.job_id, "progress": text})
+
+
+def _beat(job_id: str, stop: threading.Event):
+    """Stamps heartbeat_at until stop is set; runs beside the job in its worker process."""
+    while not stop.wait(HEARTBEAT_SECONDS):
+        try:
+            execute(q.JOB_HEARTBEAT, {"id": job_id})
+        except Exception:
+            # One missed stamp is harmless; a dead thread would let the job go stale
+            log.exception("Heartbeat for job %s failed", job_id)
+
+
+def _work(job_id: str, base_path: str):
+    """Runs one job inside a worker process. Every outcome ends up in the jobs row."""
+    if not execute(q.START_JOB, {"id": job_id}):
+        return  # cancelled (or taken over) while it waited in the queue
+    stop = threading.Event()
+    threading.Thread(target=_beat, args=(job_id, stop), daemon=True).start()
+    job = fetch_one(q.JOB_BY_ID, {"id": job_id})
+    try:
+        summary, path = JOBS[job["kind"]].run(job["params"], os.path.join(base_path, job_id), _Progress(job_id))
+        if not execute(q.FINISH_JOB, {"id": job_id, "result": json.dumps(summary, default=str), "path": path}):
+            os.remove(path)  # cancelled while it ran
+    except Exception as e:
+        execute(q.FAIL_JOBS, {"ids": [job_id], "error": f"{type(e).__name__}: {e}"})
+    finally:
+        stop.set()
+
+
+# --- SERVER SIDE ---
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class JobRunner:
+    """The worker processes of one server process, and the name its jobs are recorded under."""
+
+    def __init__(self, workers: int, base_path: str):
+        self.base_path = os.path.abspath(base_path)
+        os.makedirs(self.base_path, exist_ok=True)
+        self.host = socket.gethostname()
+        self.name = f"{self.host}:{os.getpid()}"
+        self.workers = int(workers)
+        self._lock = threading.Lock()
+        self._pool = self._new_pool()
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        # spawn: workers start clean instead of inheriting this process's engine, threads and locks
+        return ProcessPoolExecutor(max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"))
+
+    def submit(self, job_id):
+        """Hands a job to a worker. Raises if it cannot be queued; the caller fails the row."""
+        job_id = str(job_id)
+        with self._lock:
+            try:
+                future = self._pool.submit(_work, job_id, self.base_path)
+            except BrokenProcessPool:
+                # A worker died (killed, out of memory) and the pool refuses all further work
+                self._pool.shutdown(wait=False)
+                self._pool = self._new_pool()
+                future = self._pool.submit(_work, job_id, self.base_path)
+        future.add_done_callback(partial(self._settle, job_id))
+
+    @staticmethod
+    def _settle(job_id: str, future):
+        """_work records its own outcome, so an exception here means the worker never reported one."""
+        if future.cancelled() or future.exception() is not None:
+            execute(q.FAIL_JOBS, {"ids": [job_id], "error": "The worker process stopped before this job finished."})
+
+    def recover(self):
+        """Fails the unfinished jobs of earlier server processes on this host; their workers died with them."""
+        if os.name != "posix":
+            return
+        rows = fetch_all(q.UNFINISHED_JOBS_ON_HOST, {"host_pattern": f"{self.host}:%"})
+        dead = [str(r["id"]) for r in rows if r["runner"] != self.name and not _alive(int(r["runner"].rsplit(":", 1)[1]))]
+        if dead:
+            execute(q.FAIL_JOBS, {"ids": dead, "error": "The server restarted before this job finished."})
+
+    def prune(self, keep_days: int):
+        """Deletes finished jobs older than keep_days, and their result files."""
+        with transaction() as tx:
+            for r in fetch_all(q.DELETE_OLD_JOBS, {"days": int(keep_days)}, tx=tx):
+                if r["result_path"] and os.path.exists(r["result_path"]):
+                    os.remove(r["result_path"])
+
+
+@st.cache_resource(show_spinner=False)
+def get_job_runner() -> JobRunner:
+    """The process-wide runner, sized from [jobs] settings. Tidies up after earlier processes once."""
+    settings = load_settings()
+    runner = JobRunner(settings["workers"], settings["path"])
+    runner.recover()
+    runner.prune(settings["keep_days"])
+    return runner
+
+
+def enqueue(kind: str, params: dict, user_id=None) -> dict:
+    """
+    The jobs row answering this request: a finished or in-flight one over the same
+    data if there is one, else a new job handed to the worker pool.
+    """
+    runner = get_job_runner()
+    digest = params_hash(kind, params)
+    versions = data_versions(kind)
+    versions_json = json.dumps(versions) if versions is not None else None
+
+    with transaction() as tx:
+        fetch_one(q.LOCK_JOB_PARAMS, {"params_hash": digest}, tx=tx)
+        if versions is not None:
+            job = fetch_one(q.REUSABLE_JOB, {
+                "kind": kind, "params_hash": digest, "versions": versions_json,
+                "host_pattern": f"{runner.host}:%", "stale_seconds": STALE_AFTER_SECONDS,
+            }, tx=tx)
+            # A result file on another host (or already pruned) cannot be reused from here
+            if job and (job["status"] != "done" or os.path.exists(job["result_path"] or "")):
+                return job
+        job = fetch_one(q.INSERT_JOB, {
+            "kind": kind, "params": json.dumps(params, default=str), "params_hash": digest,
+            "versions": versions_json, "runner": runner.name, "created_by": user_id,
+        }, tx=tx)
+
+    # Submitted after COMMIT, so the worker always finds the row
+    try:
+        runner.submit(job["id"])
+    except Exception as e:
+        # Otherwise the row stays queued for good, and REUSABLE_JOB keeps handing it out
+        execute(q.FAIL_JOBS, {"ids": [str(job["id"])], "error": f"Could not start: {type(e).__name__}: {e}"})
+        return get_job(job["id"])
+    return job
+
+
+def _stale(job: dict) -> bool:
+    if job["status"] != "running" or job["heartbeat_at"] is None:
+        return False
+    return pd.Timestamp.now(tz="UTC") - pd.Timestamp(job["heartbeat_at"]) > pd.Timedelta(seconds=STALE_AFTER_SECONDS)
+
+
+def get_job(job_id) -> Optional[dict]:
+    """The jobs row. A running job whose worker stopped beating is marked failed first."""
+    job = fetch_one(q.JOB_BY_ID, {"id": job_id})
+    if job and _stale(job) and execute(q.FAIL_STALE_JOB, {
+        "id": str(job_id), "stale_seconds": STALE_AFTER_SECONDS,
+        "error": "The worker stopped responding before this job finished.",
+    }):
+        job = fetch_one(q.JOB_BY_ID, {"id": job_id})
+    return job
+
+
+def cancel(job_id):
+    """Marks a job failed. A queued job never starts; a running one finishes but its result is dropped."""
+    execute(q.FAIL_JOBS, {"ids": [str(job_id)], "error": "Cancelled."})
+
+
+def load_result(job: dict):
+    """A finished payroll or audit job's DataFrame. Parquet only: reading a result never runs code from the file."""
+    return pd.read_parquet(job["result_path"])
+
+
+def result_bytes(job: dict) -> bytes:
+    """A finished job's file, for st.download_button."""
+    with open(job["result_path"], "rb") as f:
+        return f.read()
@@ -0,0 +1,141 @@
+"""
+Bulk staff onboarding from a CSV or Excel roster.
+
+Columns (header names are case-insensitive):
+    full_name, email, password      required
+    hourly_rate                     optional, defaults to DEFAULT_RATE
+    role                            optional, 'employee' (default) or 'manager'
+
+Every row is validated up front. Passwords for the valid rows are hashed in
+parallel, and all of them are written with one INSERT ... ON CONFLICT
+statement inside a single transaction. Emails are matched without regard to
+case. Existing staff keep their password unless the import asks to reset
+it, and their role unless the row names one. Existing owners are never
+overwritten. Excel files need the optional openpyxl package.
+Hashing threads come from [auth] bulk_hash_workers (see src/services/passwords.py).
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+import pandas as pd
+
+from src.db import fetch_all, transaction
+from src.db import queries as q
+from src.services.passwords import load_settings
+
+REQUIRED_COLUMNS = ["full_name", "email", "password"]
+ALLOWED_ROLES = {"employee", "manager"}
+DEFAULT_RATE = 500.0
+EMAIL_RE = r"^[^@\s]+@[^@\s]+\.[^@\s]+$"
+
+TEMPLATE_CSV = "full_name,email,password,hourly_rate,role\nRahul Sharma,rahul@agency.com,changeme123,500,employee\n"
+
+
+class RosterError(ValueError):
+    """The file itself cannot be read (bad format, missing columns, no openpyxl)."""
+
+
+def read_roster(name: str, data) -> pd.DataFrame:
+    """Loads an uploaded .csv/.xlsx into a string DataFrame with normalised headers."""
+    if name.lower().endswith((".xlsx", ".xlsm")):
+        try:
+            import openpyxl  # noqa: F401  (pandas' Excel engine)
+        except ImportError:
+            raise RosterError("Excel upload needs the openpyxl package (pip install openpyxl). CSV works without it.")
+        df = pd.read_excel(data, dtype=str)
+    elif name.lower().endswith(".csv"):
+        df = pd.read_csv(data, dtype=str, skipinitialspace=True)
+    else:
+        raise RosterError("Upload a .csv or .xlsx file.")
+
+    df.columns = [str(c).strip().lower().replace(" ", "_") for c in df.columns]
+    missing = [c for c in REQUIRED_COLUMNS if c not in df.columns]
+    if missing:
+        raise RosterError(f"Missing column(s): {', '.join(missing)}")
+    return df
+
+
+def validate_roster(df: pd.DataFrame):
+    """
+    Checks every row at once. Returns (valid, errors):
+    valid has name/email/password/rate/role plus the spreadsheet row number,
+    errors lists (row, email, error) for everything rejected.
+    """
+    out = pd.DataFrame({
+        "row": df.index + 2,  # header is line 1
+        "name": df["full_name"].fillna("").str.strip(),
+        "email": df["email"].fillna("").str.strip().str.lower(),
+        "password": df["password"].fillna("").str.strip(),
+        "role": df["role"].fillna("").str.strip().str.lower() if "role" in df else "",
+    })
+    # A blank role means "employee" for new staff and "leave as is" for existing ones
+    out["role_given"] = out["role"] != ""
+    out.loc[~out["role_given"], "role"] = "employee"
+    rate_raw = df["hourly_rate"] if "hourly_rate" in df else pd.Series(None, index=df.index, dtype=object)
+    out["rate"] = pd.to_numeric(rate_raw, errors="coerce")
+
+    problems = pd.Series("", index=out.index)
+
+    def flag(mask, message):
+        problems[mask & (problems == "")] = message
+
+    flag(out["name"] == "", "Missing full_name")
+    flag(out["email"] == "", "Missing email")
+    flag(~out["email"].str.match(EMAIL_RE), "Invalid email")
+    flag(out["password"] == "", "Missing password")
+    flag(~out["role"].isin(ALLOWED_ROLES), "Role must be employee or manager")
+    flag(rate_raw.notna() & (rate_raw.astype(str).str.strip() != "") & (out["rate"].isna() | (out["rate"] < 0)), "Invalid hourly_rate")
+    flag(out["email"].duplicated(keep="first") & (out["email"] != ""), "Duplicate email in file")
+
+    out["rate"] = out["rate"].fillna(DEFAULT_RATE)
+    bad = problems != ""
+    errors = pd.DataFrame({"Row": out.loc[bad, "row"], "Email": out.loc[bad, "email"], "Error": problems[bad]})
+    return out[~bad].reset_index(drop=True), errors.reset_index(drop=True)
+
+
+def _hash_one(args):
+    password, rounds = args
+    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(rounds)).decode("utf-8")
+
+
+def hash_passwords(passwords, rounds=None, workers=None) -> list:
+    """
+    Hashes a batch in parallel (bcrypt releases the GIL). The pool is separate from
+    the login pool, so a big roster never queues in front of people signing in, and
+    small, so it never takes every core from them either.
+    """
+    settings = load_settings()
+    rounds = int(rounds or settings["bcrypt_rounds"])
+    workers = max(1, min(int(workers or settings["bulk_hash_workers"]), (os.cpu_count() or 2) - 1))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt-bulk") as pool:
+        return list(pool.map(_hash_one, [(p, rounds) for p in passwords]))
+
+
+def import_roster(valid: pd.DataFrame, reset_passwords: bool = False) -> pd.DataFrame:
+    """
+    Hashes and upserts all valid rows in one transaction.
+    reset_passwords also gives existing staff the password from the file.
+    Returns one result per row: inserted, updated, or skipped (email belongs to an owner).
+    """
+    if valid.empty:
+        return pd.DataFrame(columns=["Row", "Email", "Result"])
+
+    hashes = hash_passwords(valid["password"].tolist())
+    with transaction() as tx:
+        written = fetch_all(q.UPSERT_STAFF_BULK, {
+            "names": valid["name"].tolist(),
+            "emails": valid["email"].tolist(),
+            "pws": hashes,
+            "roles": valid["role"].tolist(),
+            "rates": valid["rate"].astype(float).tolist(),
+            "roles_given": valid["role_given"].tolist(),
+            "reset_passwords": bool(reset_passwords),
+        }, tx=tx)
+
+    outcome = {r["email"]: ("inserted" if r["inserted"] else "updated") for r in written}
+    return pd.DataFrame({
+        "Row": valid["row"],
+        "Email": valid["email"],
+        "Result": valid["email"].map(outcome).fillna("skipped (owner account)"),
+    })
@@ -0,0 +1,434 @@
+"""
+Monthly partitions for attendance_logs and direct_messages, and the archive tier.
+
+migrations/0014_monthly_partitions.sql splits both tables into IST-month
+partitions (<table>_YYYY_MM). ensure_partitions() creates the months ahead
+so new rows never fall into the catch-all <table>_default; run it from cron
+once a month. If a run was missed and rows already sit in <table>_default,
+the month is created anyway and those rows are moved into it (0021).
+
+archive() moves whole months older than the cutoff to Parquet files
+({path}/{table}/{YYYY_MM}.parquet), records them in archived_partitions and
+drops the partition. Dropping a month is instant and leaves no bloat behind,
+unlike a DELETE. Months holding an open shift are skipped. The payroll rollup
+(attendance_daily_hours) is kept, so payroll for archived months still
+works. For direct_messages the conversations each month held are recorded
+too (archived_conversations), so a chat thread only offers "Load older"
+past its live rows when it has archived messages.
+
+The Attendance History table and chat "Load older" read through: once the
+live rows run out, they continue into the archived months with the same
+filters and keyset order.
+
+Hot reads (a chat's newest page, the inbox, open shifts) are bounded to the
+newest hot_months partitions (hot_floor()), so Postgres prunes every older
+month. chat_latest(), open_shift() and live_presence() fall back to the older
+months when the hot ones do not have the answer.
+
+Settings, all optional:
+    [archive]
+    path = "archive"            # directory for the Parquet files
+    older_than_months = 24      # archive months that ended this long ago
+    months_ahead = 3            # partitions kept ready in advance
+    hot_months = 2              # newest months the hot reads look at first
+
+Cron:
+    python -m src.services.partitions ensure [months_ahead]
+    python -m src.services.partitions archive [older_than_months]
+"""
+import os
+import sys
+
+import pandas as pd
+import streamlit as st
+from sqlalchemy import text
+
+from src.db import execute, fetch_all, read_df, transaction
+from src.db import queries as q
+
+DEFAULT_SETTINGS = {
+    "path": "archive",
+    "older_than_months": 24,
+    "months_ahead": 3,
+    "hot_months": 2,
+}
+
+# Partitioned table -> partition key
+PARTITIONED = {
+    "attendance_logs": "clock_in",
+    "direct_messages": "created_at",
+}
+
+# Rows per fetch while copying a month to Parquet
+ARCHIVE_CHUNK = 50_000
+
+
+def load_settings() -> dict:
+    try:
+        return {**DEFAULT_SETTINGS, **dict(st.secrets.get("archive", {}))}
+    except FileNotFoundError:
+        return dict(DEFAULT_SETTINGS)
+
+
+def _month_start(month) -> pd.Timestamp:
+    """IST midnight on the first of the month."""
+    return pd.Timestamp(month).to_period("M").to_timestamp().tz_localize("Asia/Kolkata")
+
+
+def hot_floor() -> pd.Timestamp:
+    """Start of the oldest hot month: this month and the hot_months - 1 before it."""
+    months = max(int(load_settings()["hot_months"]), 1)
+    this_month = _month_start(pd.Timestamp.now(tz="Asia/Kolkata").tz_localize(None))
+    return this_month - pd.DateOffset(months=months - 1)
+
+
+def ensure_partitions(months_ahead: int = None) -> int:
+    """Creates any missing monthly partitions from this month to months_ahead. Returns how many were made."""
+    months_ahead = int(months_ahead or load_settings()["months_ahead"])
+    this_month = _month_start(pd.Timestamp.now(tz="Asia/Kolkata").tz_localize(None))
+    params = {
+        "from_month": this_month.strftime("%Y-%m-%d"),
+        "to_month": (this_month + pd.DateOffset(months=months_ahead)).strftime("%Y-%m-%d"),
+    }
+    made = 0
+    with transaction() as tx:
+        for parent in PARTITIONED:
+            made += fetch_all(q.ENSURE_PARTITIONS, {**params, "parent": parent}, tx=tx)[0]["created"]
+    return made
+
+
+# --- WRITING THE ARCHIVE ---
+def _arrow_schema(table: str, tx):
+    """Parquet schema from the column types, so every chunk (and every month) matches."""
+    import pyarrow as pa
+
+    types = {
+        "uuid": pa.string(), "text": pa.string(), "character varying": pa.string(),
+        "timestamp with time zone": pa.timestamp("us", tz="UTC"),
+        "timestamp without time zone": pa.timestamp("us"),
+        "date": pa.date32(), "boolean": pa.bool_(),
+        "smallint": pa.int16(), "integer": pa.int32(), "bigint": pa.int64(),
+        "double precision": pa.float64(), "real": pa.float64(), "numeric": pa.float64(),
+    }
+    cols = fetch_all(q.PARTITION_COLUMNS, {"table": table}, tx=tx)
+    return pa.schema([(c["column_name"], types.get(c["data_type"], pa.string())) for c in cols])
+
+
+def _copy_to_parquet(part: str, schema, path: str, tx) -> int:
+    """Streams one partition into path. Returns rows written."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    rows = 0
+    # Per-statement options: Connection.execution_options() would leave the whole transaction streaming
+    select = ", ".join(f'"{name}"' for name in schema.names)
+    result = tx.execute(text(f'SELECT {select} FROM "{part}"'),
+                        execution_options={"stream_results": True, "yield_per": ARCHIVE_CHUNK})
+    columns = list(result.keys())
+    with pq.ParquetWriter(path, schema, compression="zstd") as writer:
+        for chunk in result.partitions(ARCHIVE_CHUNK):
+            df = pd.DataFrame(chunk, columns=columns)
+            for name in columns:
+                if pa.types.is_string(schema.field(name).type):
+                    # uuids and other non-text types go to Parquet as their text form
+                    df[name] = df[name].map(lambda v: None if v is None else str(v))
+            writer.write_table(pa.Table.from_pandas(df, schema=schema, preserve_index=False))
+            rows += len(df)
+    return rows
+
+
+def archive_partition(table: str, part: str, month, base_path: str) -> int:
+    """
+    Copies one month to Parquet and drops it, in a single transaction.
+    The month is locked against writes while it is copied, and the file only
+    takes its final name once the row count matches.
+    """
+    month = pd.Timestamp(month)
+    folder = os.path.join(base_path, table)
+    os.makedirs(folder, exist_ok=True)
+    path = os.path.join(folder, f"{month:%Y_%m}.parquet")
+
+    with transaction() as tx:
+        tx.execute(text("SET LOCAL statement_timeout = 0"))
+        tx.execute(text(f'LOCK TABLE "{part}" IN SHARE MODE'))
+        expected = tx.execute(text(f'SELECT count(*) FROM "{part}"')).scalar()
+
+        written = _copy_to_parquet(part, _arrow_schema(table, tx), path + ".tmp", tx)
+        if written != expected:
+            os.remove(path + ".tmp")
+            raise RuntimeError(f"{part}: wrote {written} rows, expected {expected}; nothing archived")
+        os.replace(path + ".tmp", path)
+
+        execute(q.RECORD_ARCHIVED_PARTITION, {"table": table, "month": month.date(), "path": path, "rows": written}, tx=tx)
+        if table == "direct_messages":
+            start = _month_start(month)
+            execute(q.RECORD_ARCHIVED_CONVERSATIONS, {
+                "month": month.date(), "start_ts": start, "end_ts": start + pd.DateOffset(months=1),
+            }, tx=tx)
+        tx.execute(text(f'ALTER TABLE "{table}" DETACH PARTITION "{part}"'))
+        tx.execute(text(f'DROP TABLE "{part}"'))
+        # Dropping a partition fires no triggers; finished jobs over this month are stale now
+        execute(q.BUMP_TABLE_VERSION, {"table": table}, tx=tx)
+    return written
+
+
+def archive(older_than_months: int = None, base_path: str = None, log=print) -> list:
+    """Archives every month that ended more than older_than_months ago. Returns (table, month, rows) tuples."""
+    settings = load_settings()
+    older_than_months = int(older_than_months or settings["older_than_months"])
+    base_path = base_path or settings["path"]
+    cutoff = (_month_start(pd.Timestamp.now(tz="Asia/Kolkata").tz_localize(None))
+              - pd.DateOffset(months=older_than_months)).tz_localize(None)
+
+    done = []
+    for table in PARTITIONED:
+        for p in fetch_all(q.LIST_PARTITIONS, {"parent": table}):
+            if pd.Timestamp(p["month"]) >= cutoff:
+                break
+            if table == "attendance_logs":
+                with transaction() as tx:
+                    open_shift = tx.execute(text(f'SELECT 1 FROM "{p["partition"]}" WHERE clock_out IS NULL LIMIT 1')).first()
+                if open_shift:
+                    log(f"Skipping {p['partition']}: it still has an open shift")
+                    continue
+            rows = archive_partition(table, p["partition"], p["month"], base_path)
+            log(f"Archived {p['partition']} ({rows:,} rows)")
+            done.append((table, p["month"], rows))
+
+    if done:
+        _catalogue.clear()
+    return done
+
+
+# --- READING THROUGH TO THE ARCHIVE ---
+@st.cache_data(ttl=300, show_spinner=False)
+def _catalogue() -> pd.DataFrame:
+    return read_df(q.ARCHIVE_CATALOGUE)
+
+
+def archive_catalogue() -> pd.DataFrame:
+    """
+    Archived months (table_name, month, path, row_count); empty before 0014 or without archives.
+    Only a successful read is cached: a failed one is retried on the next call, not remembered as "no archive".
+    """
+    try:
+        return _catalogue()
+    except Exception:
+        return pd.DataFrame(columns=["table_name", "month", "path", "row_count"])
+
+
+def _archived_months(table: str) -> pd.DataFrame:
+    """This table's archived months, newest first, as (month_start, month_end, path)."""
+    cat = archive_catalogue()
+    cat = cat[cat["table_name"] == table]
+    if cat.empty:
+        return pd.DataFrame(columns=["start", "end", "path"])
+    starts = cat["month"].map(_month_start)
+    out = pd.DataFrame({"start": starts, "end": starts.map(lambda m: m + pd.DateOffset(months=1)), "path": cat["path"]})
+    return out.sort_values("start", ascending=False).reset_index(drop=True)
+
+
+def has_archive(table: str) -> bool:
+    return not _archived_months(table).empty
+
+
+def conversation_archived(my_id, receiver_id) -> bool:
+    """Whether any archived month may hold messages between these two users; False before 0022."""
+    if not has_archive("direct_messages"):
+        return False
+    try:
+        return bool(read_df(q.CONVERSATION_ARCHIVED, {"a": str(my_id), "b": str(receiver_id)}, cached=True)["archived"].iloc[0])
+    except Exception:
+        return False
+
+
+def _read_months(table: str, months: pd.DataFrame, filters, columns=None):
+    """Yields each archived month (newest first) as a DataFrame, filtered by a pyarrow expression."""
+    import pyarrow.parquet as pq
+
+    for path in months["path"]:
+        if not os.path.exists(path):
+            st.warning(f"Archive file missing: {path}")
+            continue
+        df = pq.read_table(path, columns=columns, filters=filters).to_pandas()
+        if not df.empty:
+            yield df
+
+
+def _ts(value):
+    """A timestamp as tz-aware UTC, whatever form it arrives in."""
+    ts = pd.Timestamp(value)
+    return ts.tz_localize("UTC") if ts.tz is None else ts.tz_convert("UTC")
+
+
+def _before(key: str, cursor):
+    """pyarrow filter for (key, id) < cursor, the keyset order used by the live queries."""
+    import pyarrow.dataset as ds
+
+    ts, row_id = _ts(cursor[0]), str(cursor[1])
+    return (ds.field(key) < ts) | ((ds.field(key) == ts) & (ds.field("id") < row_id))
+
+
+def _history_filter(filters: dict, cursor=None):
+    import pyarrow.dataset as ds
+
+    expr = (ds.field("clock_in") >= _ts(filters["start_ts"])) & (ds.field("clock_in") < _ts(filters["end_ts"]))
+    if filters.get("emp_ids"):
+        expr &= ds.field("employee_id").isin([str(e) for e in filters["emp_ids"]])
+    if filters.get("status"):
+        expr &= ds.field("status") == filters["status"]
+    if cursor:
+        expr &= _before("clock_in", cursor)
+    return expr
+
+
+def _history_months(filters: dict) -> pd.DataFrame:
+    months = _archived_months("attendance_logs")
+    if months.empty:
+        return months
+    start, end = _ts(filters["start_ts"]), _ts(filters["end_ts"])
+    return months[(months["start"] < end) & (months["end"] > start)]
+
+
+def history_page(filters: dict, cursor=None, limit: int = 50) -> pd.DataFrame:
+    """
+    One page of attendance history, newest first: live rows from HISTORY_PAGE,
+    topped up from archived months when the live table runs out.
+    """
+    df = read_df(q.HISTORY_PAGE, {
+        **filters,
+        "cur_ts": cursor[0] if cursor else None,
+        "cur_id": cursor[1] if cursor else None,
+        "limit": limit,
+    })
+    months = _history_months(filters)
+    if len(df) >= limit or months.empty:
+        return df
+
+    if not df.empty:
+        last = df.iloc[-1]
+        cursor = (last["clock_in"], str(last["id"]))
+    names = read_df(q.USER_NAMES, cached=True)
+    names = dict(zip(names["id"].astype(str), names["full_name"]))
+
+    pages = [df] if not df.empty else []
+    need = limit - len(df)
+    expr = _history_filter(filters, cursor)
+    for month in _read_months("attendance_logs", months, expr, ["id", "clock_in", "clock_out", "status", "employee_id"]):
+        month = month.sort_values(["clock_in", "id"], ascending=False).head(need)
+        month["employee_name"] = month.pop("employee_id").map(names)
+        pages.append(month)
+        need -= len(month)
+        if need <= 0:
+            break
+    return pd.concat(pages, ignore_index=True) if pages else df
+
+
+def history_totals(filters: dict) -> dict:
+    """HISTORY_TOTALS over live and archived rows: shifts, distinct employees and hours."""
+    live = read_df(q.HISTORY_TOTALS, filters).iloc[0]
+    shifts, hours = int(live["shifts"]), float(live["hours"] or 0)
+    employees = set(live["employee_ids"] or [])
+
+    months = _history_months(filters)
+    if not months.empty:
+        for month in _read_months("attendance_logs", months, _history_filter(filters), ["employee_id", "clock_in", "clock_out"]):
+            shifts += len(month)
+            hours += float((month["clock_out"] - month["clock_in"]).dt.total_seconds().sum() / 3600)
+            employees.update(month["employee_id"].dropna())
+    return {"shifts": shifts, "employees": len(employees), "hours": hours}
+
+
+def chat_older(my_id, receiver_id, before_ts=None, before_id=None, limit: int = 50) -> pd.DataFrame:
+    """
+    Up to limit messages of one conversation before the (created_at, id) cursor, newest first.
+    Continues into archived months once the live table is exhausted; a missing cursor starts there.
+    """
+    import pyarrow.dataset as ds
+
+    df = pd.DataFrame()
+    if before_ts is not None:
+        df = read_df(q.CHAT_OLDER, {
+            "my_id": my_id, "receiver_id": receiver_id, "limit": limit,
+            "before_ts": before_ts, "before_id": before_id,
+        })
+    months = _archived_months("direct_messages")
+    if len(df) >= limit or months.empty:
+        return df
+
+    if not df.empty:
+        before_ts, before_id = df.iloc[-1]["created_at"], df.iloc[-1]["id"]
+    a, b = str(my_id), str(receiver_id)
+    expr = (((ds.field("sender_id") == a) & (ds.field("receiver_id") == b))
+            | ((ds.field("sender_id") == b) & (ds.field("receiver_id") == a)))
+    if before_ts is not None:
+        expr &= _before("created_at", (before_ts, before_id))
+        months = months[months["start"] <= _ts(before_ts)]
+
+    pages = [df] if not df.empty else []
+    need = limit - len(df)
+    for month in _read_months("direct_messages", months, expr, ["id", "sender_id", "receiver_id", "message", "created_at"]):
+        month = month.sort_values(["created_at", "id"], ascending=False).head(need)
+        pages.append(month)
+        need -= len(month)
+        if need <= 0:
+            break
+    return pd.concat(pages, ignore_index=True) if pages else df
+
+
+# Sorts after every uuid: a (floor, _MAX_ID) cursor starts paging just below the hot months
+_MAX_ID = "ffffffff-ffff-ffff-ffff-ffffffffffff"
+
+
+def chat_latest(my_id, receiver_id, limit: int = 50) -> pd.DataFrame:
+    """
+    The newest limit messages of one conversation, newest first. Reads the hot months;
+    a quiet conversation is topped up from older months (and the archive) by chat_older().
+    """
+    floor = hot_floor()
+    df = read_df(q.CHAT_LATEST, {"my_id": my_id, "receiver_id": receiver_id, "limit": limit, "since": floor})
+    if len(df) >= limit:
+        return df
+    before_ts, before_id = (df.iloc[-1]["created_at"], df.iloc[-1]["id"]) if not df.empty else (floor, _MAX_ID)
+    older = chat_older(my_id, receiver_id, before_ts, before_id, limit - len(df))
+    pages = [page for page in (df, older) if not page.empty]
+    return pd.concat(pages, ignore_index=True) if pages else df
+
+
+def open_shift(uid) -> pd.DataFrame:
+    """
+    The employee's unfinished shift (empty if none). Hot months first; an older forgotten
+    shift comes from a cached read that any attendance write invalidates.
+    """
+    floor = hot_floor()
+    df = read_df(q.OPEN_SHIFT, {"uid": uid, "since": floor, "until": None})
+    if df.empty:
+        df = read_df(q.OPEN_SHIFT, {"uid": uid, "since": None, "until": floor}, cached=True)
+    return df
+
+
+def live_presence() -> pd.DataFrame:
+    """Every open shift, oldest first: the hot months live, anything older from a cached read."""
+    floor = hot_floor()
+    older = read_df(q.LIVE_PRESENCE, {"since": None, "until": floor}, cached=True)
+    hot = read_df(q.LIVE_PRESENCE, {"since": floor, "until": None})
+    return hot if older.empty else pd.concat([older, hot], ignore_index=True)
+
+
+def live_floor(table: str):
+    """Start of the oldest month still in the database (the month after the newest archive), or None."""
+    months = _archived_months(table)
+    return None if months.empty else months["end"].max()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] not in ("ensure", "archive"):
+        print(__doc__)
+        sys.exit(1)
+
+    arg = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    if sys.argv[1] == "ensure":
+        print(f"{ensure_partitions(arg)} partition(s) created")
+    else:
+        archived = archive(arg)
+        print(f"{len(archived)} month(s) archived, {sum(r for _, _, r in archived):,} rows")
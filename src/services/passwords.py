@@ -0,0 +1,129 @@
+"""
+Password hashing off the Streamlit script threads.
+
+bcrypt is deliberately slow and CPU-bound. Running it inline means a login
+surge at shift start occupies every script thread and stalls everyone else's
+reruns. Instead all hashing goes through one bounded pool per server process
+(bcrypt releases the GIL, so the workers really run in parallel), and callers
+beyond the queue limit get a "busy" error instead of piling up.
+
+Tuning in secrets.toml:
+    [auth]
+    bcrypt_rounds = 12   # work factor for new hashes; older hashes are upgraded on login
+    hash_workers = 4     # concurrent bcrypt operations (keep below the CPU count)
+    max_pending = 64     # queued + running operations before logins are refused
+    wait_seconds = 10    # how long a caller waits for a queue slot
+    bulk_hash_workers = 2  # threads for roster imports (src/services/onboarding.py), at most CPUs - 1
+
+Benchmark: python -m bench.auth_logins
+"""
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+import streamlit as st
+
+log = logging.getLogger(__name__)
+
+DEFAULT_SETTINGS = {"bcrypt_rounds": 12, "hash_workers": 4, "max_pending": 64, "wait_seconds": 10, "bulk_hash_workers": 2}
+
+
+class HashPoolBusy(RuntimeError):
+    """Raised when the hashing queue is full for longer than wait_seconds."""
+
+
+def load_settings() -> dict:
+    try:
+        return {**DEFAULT_SETTINGS, **dict(st.secrets.get("auth", {}))}
+    except FileNotFoundError:
+        return dict(DEFAULT_SETTINGS)
+
+
+def hash_cost(hashed: str) -> int:
+    """Work factor embedded in a bcrypt hash ('$2b$12$...' -> 12); 0 if unreadable."""
+    try:
+        return int(hashed.split("$")[2])
+    except (IndexError, ValueError, AttributeError):
+        return 0
+
+
+class HashPool:
+    """A fixed set of bcrypt workers with a bounded queue in front of it."""
+
+    def __init__(self, workers: int, max_pending: int, rounds: int, wait_seconds: float = 10):
+        self.rounds = int(rounds)
+        self.wait_seconds = float(wait_seconds)
+        self._executor = ThreadPoolExecutor(max_workers=int(workers), thread_name_prefix="bcrypt")
+        self._slots = threading.BoundedSemaphore(int(max_pending))
+
+        # Running average of a real checkpw, used to pace answers for unknown emails
+        self._avg_verify = None
+        self._avg_lock = threading.Lock()
+
+        # Dummy hash at the current cost; only used if we have no timing sample yet
+        self._dummy_hash = bcrypt.hashpw(b"agency-os-dummy", bcrypt.gensalt(self.rounds))
+
+    def _take_slot(self):
+        if not self._slots.acquire(timeout=self.wait_seconds):
+            raise HashPoolBusy("Too many logins in progress. Please try again in a moment.")
+
+    def _run(self, fn, *args):
+        self._take_slot()
+        try:
+            return self._executor.submit(fn, *args).result()
+        finally:
+            self._slots.release()
+
+    def hash(self, password: str) -> str:
+        """bcrypt hash at the configured work factor."""
+        salt = bcrypt.gensalt(self.rounds)
+        return self._run(bcrypt.hashpw, password.encode("utf-8"), salt).decode("utf-8")
+
+    def verify(self, password: str, hashed: str):
+        """Returns (matches, needs_rehash). needs_rehash is True when the stored cost is stale."""
+        start = time.perf_counter()
+        ok = self._run(bcrypt.checkpw, password.encode("utf-8"), hashed.encode("utf-8"))
+        self._observe(time.perf_counter() - start)
+        return ok, ok and hash_cost(hashed) != self.rounds
+
+    def reject_unknown(self, password: str):
+        """
+        Answers a login for an email that does not exist.
+        Sleeps for about as long as a real verify takes, so response time does not
+        reveal which emails are registered, without spending a bcrypt worker on it.
+        It holds a queue slot while it sleeps, so under load unknown emails get the
+        same "busy" answer as registered ones.
+        """
+        if self._avg_verify is None:
+            self._run(bcrypt.checkpw, password.encode("utf-8"), self._dummy_hash)
+            return False
+        self._take_slot()
+        try:
+            time.sleep(self._avg_verify)
+        finally:
+            self._slots.release()
+        return False
+
+    def _observe(self, seconds: float):
+        with self._avg_lock:
+            self._avg_verify = seconds if self._avg_verify is None else 0.9 * self._avg_verify + 0.1 * seconds
+
+    def submit(self, fn, *args):
+        """Fire-and-forget work on the pool (used for background rehashing). Failures are logged."""
+        future = self._executor.submit(fn, *args)
+        future.add_done_callback(_log_failure)
+        return future
+
+
+def _log_failure(future):
+    if not future.cancelled() and future.exception() is not None:
+        log.error("Background password task failed", exc_info=future.exception())
+
+
+@st.cache_resource(show_spinner=False)
+def get_hash_pool() -> HashPool:
+    """The process-wide pool, sized from [auth] settings."""
+    s = load_settings()
+    return HashPool(s["hash_workers"], s["max_pending"], s["bcrypt_rounds"], s["wait_seconds"])
@@ -0,0 +1,65 @@
+"""
+Payroll rollup: hours per employee per (IST) day, kept in attendance_daily_hours.
+A shift past midnight puts its hours on each day it ran on, as the Shift Report
+does (src/services/attendance.py).
+
+The clock-out in src/views/employee/time_clock.py closes the shift and adds
+its hours to the rollup in the same statement, so payroll for any range is a
+small indexed aggregate instead of a scan over raw attendance_logs.
+
+payroll_report() is the Payroll page's calculation. The page runs it as a
+background job (src/services/jobs.py), so a year for every employee does not
+hold up the script thread.
+
+Backfill / repair from the command line:
+    python -m src.services.payroll rebuild                      # everything still in the database
+    python -m src.services.payroll rebuild 2026-01-01 2026-04-01  # [start, end) by IST day
+"""
+import sys
+
+import pandas as pd
+from sqlalchemy import text
+
+from src.db import execute, read_df, transaction
+from src.db import queries as q
+from src.services.partitions import live_floor
+
+
+def close_shift(shift_id, comment):
+    """Ends a shift and updates the rollup in one statement."""
+    execute(q.CLOSE_SHIFT, {"id": shift_id, "comment": comment})
+
+
+def payroll_report(start, end) -> pd.DataFrame:
+    """Hours, rate and pay per employee for IST days in [start, end), from the rollup."""
+    df = read_df(q.PAYROLL_BY_RANGE, {"start": str(start), "end": str(end)})
+    # Convert columns to float to avoid typing errors
+    df['shift_hours'] = pd.to_numeric(df['shift_hours'], errors='coerce').fillna(0.0)
+    df['hourly_rate'] = pd.to_numeric(df['hourly_rate'], errors='coerce').fillna(0.0)
+    df['Total Pay'] = df['shift_hours'] * df['hourly_rate']
+    return df
+
+
+def rebuild_rollup(start="0001-01-01", end="9999-01-01"):
+    """
+    Recomputes the rollup for IST days in [start, end) from attendance_logs, atomically.
+    Archived months are left alone: their raw shifts are gone, the rollup is all that remains.
+    """
+    floor = live_floor("attendance_logs")
+    if floor is not None:
+        start = max(str(start), floor.strftime('%Y-%m-%d'))
+    params = {"start": str(start), "end": str(end)}
+    with transaction() as tx:
+        # A full rebuild runs for minutes on a large table; the engine's per-statement cap would cancel it
+        tx.execute(text("SET LOCAL statement_timeout = 0"))
+        execute(q.ROLLUP_DELETE_RANGE, params, tx=tx)
+        execute(q.ROLLUP_REBUILD_RANGE, params, tx=tx)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2 or sys.argv[1] != "rebuild":
+        print(__doc__)
+        sys.exit(1)
+
+    rebuild_rollup(*sys.argv[2:4])
+    print("✅ Payroll rollup rebuilt.")
@@ -1,14 +1,300 @@
+import re
 import streamlit as st
 import pandas as pd
 import time
-from sqlalchemy import text
+from src.db import execute, get_engine, read_df
+from src.db import queries as q
+from src.db.metrics import timed_view
+from src.services.chat_notify import get_notifier
+from src.services.partitions import chat_latest, chat_older, conversation_archived, hot_floor
 
-# Initialize connection at the top of your module
-conn = st.connection("postgresql", type="sql")
+# How many messages a conversation opens with, and how many each "Load older" click adds
+PAGE_SIZE = 50
 
-# --- 1. THE DECORATOR (This enables auto-refresh) ---
-# 'run_every=5' means this specific part of the screen reloads every 5 seconds.
-@st.fragment(run_every=5)
+# PUSH MODE: a per-process LISTEN/NOTIFY listener tells us when a conversation
+# changed. A watcher fragment that draws nothing compares tokens every
+# TICK_SECONDS and reruns the page only on news; the chat itself is not on a timer.
+# Set [chat] push = false in secrets.toml to go back to plain 5s polling.
+PUSH_ENABLED = st.secrets.get("chat", {}).get("push", True)
+TICK_SECONDS = 0.5 if PUSH_ENABLED else 5
+# Re-sync even without a notification every so often (and every POLL_FALLBACK_SECONDS
+# while the listener is down or the trigger is missing), in case a NOTIFY was lost.
+POLL_FALLBACK_SECONDS = 5
+SAFETY_RESYNC_SECONDS = 60
+
+# Unread badges stop counting here, so a never-opened thread stays cheap
+UNREAD_CAP = 100
+
+# Search hits per page, and how many earlier messages show above a hit opened in the thread
+SEARCH_PAGE_SIZE = 20
+JUMP_CONTEXT = 5
+
+# Characters Streamlit markdown would act on in a search snippet
+_MARKDOWN_SPECIALS = re.compile(r"([\\`*_{}\[\]()#+\-.!|~<>$:])")
+
+
+def _format_batch(df):
+    """Converts a batch of message rows into cache records, formatting timestamps in one pass."""
+    if df.empty:
+        return []
+    df = df.copy()
+    df['created_at'] = pd.to_datetime(df['created_at'], utc=True)
+    df['ts_label'] = df['created_at'].dt.tz_convert('Asia/Kolkata').dt.strftime('%I:%M %p')
+    df['id'] = df['id'].astype(str)
+    df['sender_id'] = df['sender_id'].astype(str)
+    return df[['id', 'sender_id', 'message', 'created_at', 'ts_label']].to_dict('records')
+
+
+def _get_thread(my_id, receiver_id):
+    """Returns the per-session cache for one conversation, seeding it with the newest page."""
+    threads = st.session_state.setdefault("chat_threads", {})
+    thread = threads.get(receiver_id)
+
+    if thread is None:
+        # Take the notify token before reading, so a message landing mid-query still wakes us
+        token = _notify_token(my_id, receiver_id)
+        df = chat_latest(my_id, receiver_id, PAGE_SIZE)
+        records = _format_batch(df)
+        records.reverse()
+        thread = {
+            "messages": records,
+            "ids": {m['id'] for m in records},
+            "has_older": len(records) >= PAGE_SIZE or conversation_archived(my_id, receiver_id),
+            "notify_token": token,
+        }
+        threads[receiver_id] = thread
+    return thread
+
+
+def _sync_new(thread, my_id, receiver_id):
+    """Appends anything newer than the cursor (the last cached message)."""
+    if not thread["messages"]:
+        # Empty thread: nothing to anchor a cursor to, re-check the newest page
+        df = chat_latest(my_id, receiver_id, PAGE_SIZE)
+        fresh = _format_batch(df)
+        fresh.reverse()
+    else:
+        since_ts = thread["messages"][-1]['created_at']
+        df = read_df(q.CHAT_SINCE, {"my_id": my_id, "receiver_id": receiver_id, "since_ts": since_ts})
+        fresh = _format_batch(df)
+
+    fresh = [m for m in fresh if m['id'] not in thread["ids"]]
+    if fresh:
+        thread["messages"].extend(fresh)
+        thread["messages"].sort(key=lambda m: (m['created_at'], m['id']))
+        thread["ids"].update(m['id'] for m in fresh)
+
+
+def _load_older(thread, my_id, receiver_id):
+    """Prepends one keyset page of history before the oldest cached message (reading into the archive if needed)."""
+    oldest = thread["messages"][0] if thread["messages"] else {"created_at": None, "id": None}
+    df = chat_older(my_id, receiver_id, oldest['created_at'], oldest['id'], PAGE_SIZE)
+    older = [m for m in _format_batch(df) if m['id'] not in thread["ids"]]
+    older.reverse()
+    thread["messages"][:0] = older
+    thread["ids"].update(m['id'] for m in older)
+    thread["has_older"] = len(df) >= PAGE_SIZE
+
+
+def _thread_at(my_id, receiver_id, msg_id, msg_ts):
+    """A thread opened at one message: a few earlier ones above it, the next page below."""
+    token = _notify_token(my_id, receiver_id)
+    before = chat_older(my_id, receiver_id, msg_ts, msg_id, JUMP_CONTEXT)
+    after = read_df(q.CHAT_FROM, {"my_id": my_id, "receiver_id": receiver_id,
+                                  "from_ts": msg_ts, "from_id": msg_id, "limit": PAGE_SIZE})
+    records = _format_batch(before)
+    records.reverse()
+    records += _format_batch(after)
+    return {
+        "messages": records,
+        "ids": {m['id'] for m in records},
+        "has_older": len(before) >= JUMP_CONTEXT or conversation_archived(my_id, receiver_id),
+        # Until the newest message is on screen, live updates wait and "Load newer" fills the gap
+        "has_newer": len(after) >= PAGE_SIZE,
+        "focus_id": str(msg_id),
+        "notify_token": token,
+    }
+
+
+def _load_newer(thread, my_id, receiver_id):
+    """Appends the page after the newest cached message, for a thread opened at a search hit."""
+    newest = thread["messages"][-1]
+    df = read_df(q.CHAT_FROM, {"my_id": my_id, "receiver_id": receiver_id,
+                               "from_ts": newest['created_at'], "from_id": newest['id'], "limit": PAGE_SIZE})
+    newer = [m for m in _format_batch(df) if m['id'] not in thread["ids"]]
+    thread["messages"].extend(newer)
+    thread["ids"].update(m['id'] for m in newer)
+    thread["has_newer"] = len(df) >= PAGE_SIZE
+
+
+def _jump_to_latest(receiver_id):
+    st.session_state.get("chat_threads", {}).pop(receiver_id, None)
+
+
+def _notify_token(my_id, other_id=None):
+    """
+    Current listener token for this user's inbox (or, with other_id, for one conversation),
+    or None when push mode is unavailable.
+    """
+    if not PUSH_ENABLED:
+        return None
+    notifier = get_notifier(get_engine())
+    return notifier.version(my_id, other_id) if notifier.healthy else None
+
+
+def _needs_sync(state, token, force=False):
+    """
+    Whether the inbox or a thread has to hit the database on this run: its token moved,
+    there is no token to go by (polling), or the watcher asked for a safety re-sync.
+    """
+    if force or token is None or token != state.get("notify_token"):
+        state["notify_token"] = token
+        return True
+    return False
+
+
+@st.fragment(run_every=TICK_SECONDS)
+def _watch(my_id, seen_token, rendered_at):
+    """
+    Draws nothing and reads no table. Reruns the page once this user has news (any
+    conversation moves their inbox token), when polling is due, or for the safety re-sync.
+    """
+    waited = time.monotonic() - rendered_at
+    if waited >= SAFETY_RESYNC_SECONDS:
+        st.session_state.chat_resync = True
+        st.rerun()
+    token = _notify_token(my_id)
+    if token != seen_token or (token is None and waited >= POLL_FALLBACK_SECONDS):
+        st.rerun()
+
+
+def _get_inbox(my_id, my_role, force=False):
+    """Returns the cached inbox rows, re-querying only when notified (or when polling)."""
+    token = _notify_token(my_id)
+    inbox = st.session_state.get("chat_inbox")
+    if inbox is not None and not _needs_sync(inbox, token, force):
+        return inbox
+
+    sql_inbox = q.CHAT_INBOX_EMPLOYEE if my_role == 'employee' else q.CHAT_INBOX_STAFF
+    df = read_df(sql_inbox, {"my_id": my_id, "unread_cap": UNREAD_CAP, "since": hot_floor()})
+
+    df['id'] = df['id'].astype(str)
+    df['last_sender_id'] = df['last_sender_id'].astype(str)
+    df['unread'] = df['unread'].fillna(0).astype(int)
+
+    inbox = {"rows": df.to_dict('records'), "notify_token": token}
+    st.session_state.chat_inbox = inbox
+    return inbox
+
+
+def _inbox_label(row, my_id):
+    """One inbox line: name, role, unread badge and a short preview of the last message."""
+    label = f"{row['full_name']} ({row['role'].capitalize()})"
+    if row['unread']:
+        badge = f"{UNREAD_CAP - 1}+" if row['unread'] >= UNREAD_CAP else row['unread']
+        label = f"🔵 {label} · {badge} new"
+    if isinstance(row['last_message'], str):
+        prefix = "You: " if row['last_sender_id'] == str(my_id) else ""
+        preview = row['last_message'] if len(row['last_message']) <= 40 else row['last_message'][:40] + "…"
+        label = f"{label} — {prefix}{preview}"
+    return label
+
+
+def _open_conversation(contact_id):
+    st.session_state.chat_contact_select = contact_id
+
+
+def _open_hit(my_id, contact_id, msg_id, msg_ts):
+    """Opens the conversation at a search hit, replacing whatever part of it was cached."""
+    threads = st.session_state.setdefault("chat_threads", {})
+    threads[contact_id] = _thread_at(my_id, contact_id, msg_id, msg_ts)
+    st.session_state.chat_contact_select = contact_id
+
+
+def _turn_search_page(step):
+    st.session_state.chat_search_page += step
+
+
+def _search(my_id, my_role, query, page):
+    """One page of ranked hits, kept until the query or page changes so chat reruns stay free."""
+    key = (query, page)
+    cached = st.session_state.get("chat_search")
+    if cached is not None and cached["key"] == key:
+        return cached["hits"]
+
+    sql_search = q.CHAT_SEARCH_EMPLOYEE if my_role == 'employee' else q.CHAT_SEARCH_STAFF
+    hits = read_df(sql_search, {"my_id": my_id, "query": query,
+                                "limit": SEARCH_PAGE_SIZE, "offset": page * SEARCH_PAGE_SIZE})
+    hits['id'] = hits['id'].astype(str)
+    hits['contact_id'] = hits['contact_id'].astype(str)
+    hits['sender_id'] = hits['sender_id'].astype(str)
+    hits['created_at'] = pd.to_datetime(hits['created_at'], utc=True)
+    st.session_state.chat_search = {"key": key, "hits": hits}
+    return hits
+
+
+def _snippet(text):
+    """ts_headline output as markdown: message text escaped, matched words in bold."""
+    start, stop = q.SEARCH_MARKS
+    text = _MARKDOWN_SPECIALS.sub(r"\\\1", " ".join(text.split()))
+    return text.replace(start, "**").replace(stop, "**")
+
+
+def _render_search(my_id, my_role, query):
+    """Search results in place of the inbox: who, when, the matching words, and a way in."""
+    if st.session_state.get("chat_search_query") != query:
+        st.session_state.chat_search_query = query
+        st.session_state.chat_search_page = 0
+    page = st.session_state.chat_search_page
+
+    hits = _search(my_id, my_role, query, page)
+    if hits.empty:
+        st.caption("No messages match. Search looks for whole words; try fewer or different ones.")
+        return
+
+    total = int(hits['total'].iloc[0])
+    pages = -(-total // SEARCH_PAGE_SIZE)
+    st.caption(f"{total:,} matching message{'s' if total != 1 else ''} · page {page + 1} of {pages}")
+    with st.container(height=400, border=False):
+        for hit in hits.to_dict('records'):
+            with st.container(border=True):
+                who = f"You → {hit['full_name']}" if hit['sender_id'] == str(my_id) else f"{hit['full_name']} → You"
+                when = hit['created_at'].tz_convert('Asia/Kolkata').strftime('%d-%b-%Y %I:%M %p')
+                st.caption(f"{who} · {when}")
+                st.markdown(_snippet(hit['snippet']))
+                st.button("Open in chat", key=f"chat_hit_{hit['id']}", use_container_width=True,
+                          on_click=_open_hit, args=(my_id, hit['contact_id'], hit['id'], hit['created_at']))
+
+    c_prev, c_next = st.columns(2)
+    c_prev.button("◀ Previous", key="chat_search_prev", disabled=page == 0, use_container_width=True,
+                  on_click=_turn_search_page, args=(-1,))
+    c_next.button("Next ▶", key="chat_search_next", disabled=page + 1 >= pages, use_container_width=True,
+                  on_click=_turn_search_page, args=(1,))
+
+
+def _mark_read(inbox, thread, my_id, receiver_id):
+    """Moves our read marker up to the newest incoming message on screen. Writes only when it moved."""
+    incoming = [m for m in thread["messages"] if m['sender_id'] != str(my_id)]
+    if not incoming:
+        return
+    newest = incoming[-1]['created_at']
+    if thread.get("read_at") is not None and newest <= thread["read_at"]:
+        return
+
+    execute(q.CHAT_MARK_READ, {"my_id": my_id, "contact_id": receiver_id, "read_at": newest})
+    thread["read_at"] = newest
+
+    # Clear the badge locally rather than re-running the inbox query
+    for row in inbox["rows"]:
+        if row['id'] == receiver_id:
+            row['unread'] = 0
+
+
+# --- 1. THE DECORATOR ---
+# Clicks inside the chat rerun only the chat. Live updates come from _watch, which
+# reruns the page when the listener saw a new message for us (every 5 s without push).
+@st.fragment
+@timed_view("chat.widget")
 def render_chat_widget():
     # REMOVED: db = st.session_state.supabase
     my_id = st.session_state.user.id
@@ -16,80 +302,106 @@ def render_chat_widget():
 
     st.header("💬 Team Chat")
 
-    # --- 2. DETERMINE CONTACT LIST ---
+    # Taken before any query, so a message landing mid-render still wakes the watcher
+    seen_token, rendered_at = _notify_token(my_id), time.monotonic()
+    _watch(my_id, seen_token, rendered_at)
+    resync = st.session_state.pop("chat_resync", False)
+
+    # --- 2. CONVERSATION INBOX ---
     # Employees -> Can see Managers & Owner
     # Managers/Owners -> Can see Everyone
-    # NEW POSTGRES QUERY (Using 'users' table instead of 'profiles')
-    if my_role == 'employee':
-        sql_contacts = text("SELECT id, full_name, role FROM users WHERE role IN ('manager', 'owner')")
-        contacts_df = conn.query(sql_contacts, ttl=0)
-    else:
-        sql_contacts = text("SELECT id, full_name, role FROM users WHERE id != :my_id")
-        contacts_df = conn.query(sql_contacts, params={"my_id": my_id}, ttl=0)
-        
-    if contacts_df.empty:
+    # Contacts, unread counts and last-message previews come from one query,
+    # re-run only when the listener says something changed for us.
+    inbox = _get_inbox(my_id, my_role, resync)
+
+    if not inbox["rows"]:
         st.info("No contacts available to chat.")
         return
 
     # --- 3. SELECT CONTACT ---
-    # We use a key based on user ID to prevent the dropdown from resetting on auto-refresh
-    contacts_list = contacts_df.to_dict('records')
-    contact_map = {f"{c['full_name']} ({c['role'].capitalize()})": str(c['id']) for c in contacts_list}
-    
-    # Defaults to the first contact if none selected
-    selected_name = st.selectbox(
-        "Select Conversation", 
-        list(contact_map.keys()), 
-        key="chat_contact_select"
-    )
-    receiver_id = contact_map[selected_name]
-
-    # --- 4. FETCH MESSAGES (Auto-runs every 5s) ---
-    # NEW POSTGRES QUERY
-    sql_msg = text("""
-        SELECT * FROM direct_messages 
-        WHERE (sender_id = :my_id AND receiver_id = :receiver_id) 
-           OR (sender_id = :receiver_id AND receiver_id = :my_id)
-        ORDER BY created_at ASC
-    """)
-    messages_df = conn.query(sql_msg, params={"my_id": my_id, "receiver_id": receiver_id}, ttl=0)
-
-    # Container for chat history
-    chat_container = st.container(height=400, border=True)
-    
-    with chat_container:
-        if not messages_df.empty:
-            messages_list = messages_df.to_dict('records')
-            for msg in messages_list:
-                # Convert UUIDs to strings to ensure matching works perfectly
-                is_me = str(msg['sender_id']) == str(my_id)
-                
-                with st.chat_message("user" if is_me else "assistant"):
-                    st.write(msg['message'])
-                    # Timestamp conversion with utc=True fix
-                    ts = pd.to_datetime(msg['created_at'], utc=True).tz_convert('Asia/Kolkata').strftime('%I:%M %p')
-                    st.caption(f"{ts}")
+    # The open conversation lives in session state (not a widget value), so badge and
+    # preview text can change on every refresh without resetting the selection.
+    contact_rows = {r['id']: r for r in inbox["rows"]}
+    if st.session_state.get("chat_contact_select") not in contact_rows:
+        st.session_state.chat_contact_select = inbox["rows"][0]['id']
+
+    col_inbox, col_thread = st.columns([1, 2])
+
+    with col_inbox:
+        # Searching every conversation swaps the inbox for ranked hits (CHAT_SEARCH_* in queries.py)
+        search = st.text_input("Search messages", key="chat_search_box", label_visibility="collapsed",
+                               placeholder="🔎 Search all conversations").strip()
+        if search:
+            _render_search(my_id, my_role, search)
         else:
-            st.caption("No messages yet. Start the conversation!")
-
-    # --- 5. SEND INPUT ---
-    # When you send a message, we manually rerun immediately to show it
-    if prompt := st.chat_input(f"Message {selected_name}..."):
-        try:
-            # NEW POSTGRES INSERT
-            with conn.session as s:
-                sql_insert = text("""
-                    INSERT INTO direct_messages (sender_id, receiver_id, message) 
-                    VALUES (:sender, :receiver, :msg)
-                """)
-                s.execute(sql_insert, {"sender": my_id, "receiver": receiver_id, "msg": prompt})
-                s.commit()
-            
-            st.rerun() # Instant update on send
-        except Exception as e:
-            st.error(f"Failed to send: {e}")
+            st.caption("Conversations")
+            with st.container(height=460, border=False):
+                for cid, row in contact_rows.items():
+                    is_open = cid == st.session_state.chat_contact_select
+                    st.button(_inbox_label(row, my_id), key=f"chat_inbox_{cid}",
+                              type="primary" if is_open else "secondary", use_container_width=True,
+                              on_click=_open_conversation, args=(cid,))
+    receiver_id = st.session_state.chat_contact_select
+    selected_name = contact_rows[receiver_id]['full_name']
+
+    with col_thread:
+        # --- 4. DELTA SYNC ---
+        # The first visit loads the newest PAGE_SIZE messages; after that we only ask
+        # for rows newer than the last one we already hold, and only when notified.
+        # A thread opened at a search hit only catches up once "Load newer" reaches the end.
+        thread = _get_thread(my_id, receiver_id)
+        if not thread.get("has_newer") and _needs_sync(thread, _notify_token(my_id, receiver_id), resync):
+            _sync_new(thread, my_id, receiver_id)
+        _mark_read(inbox, thread, my_id, receiver_id)
+
+        # Container for chat history
+        chat_container = st.container(height=400, border=True)
+
+        with chat_container:
+            if thread["has_older"] and st.button("⬆️ Load older messages", key=f"chat_older_{receiver_id}"):
+                _load_older(thread, my_id, receiver_id)
+
+            if thread["messages"]:
+                for msg in thread["messages"]:
+                    is_me = msg['sender_id'] == str(my_id)
+
+                    with st.chat_message("user" if is_me else "assistant"):
+                        st.write(msg['message'])
+                        if msg['id'] == thread.get("focus_id"):
+                            when = msg['created_at'].tz_convert('Asia/Kolkata').strftime('%d-%b-%Y %I:%M %p')
+                            st.caption(f"🔎 {when} · from your search")
+                        else:
+                            st.caption(msg['ts_label'])
+            else:
+                st.caption("No messages yet. Start the conversation!")
+
+            if thread.get("has_newer"):
+                c_newer, c_latest = st.columns(2)
+                c_newer.button("⬇️ Load newer messages", key=f"chat_newer_{receiver_id}", use_container_width=True,
+                               on_click=_load_newer, args=(thread, my_id, receiver_id))
+                c_latest.button("⏬ Jump to latest", key=f"chat_latest_{receiver_id}", use_container_width=True,
+                                on_click=_jump_to_latest, args=(receiver_id,))
+
+        # --- 5. SEND INPUT ---
+        # When you send a message, we manually rerun immediately to show it
+        if prompt := st.chat_input(f"Message {selected_name}..."):
+            try:
+                execute(q.CHAT_SEND, {"sender": my_id, "receiver": receiver_id, "msg": prompt})
+
+                if thread.get("has_newer"):
+                    # Reading an older stretch: reopen at the newest page, which now ends with this message
+                    _jump_to_latest(receiver_id)
+                else:
+                    _sync_new(thread, my_id, receiver_id)
+                st.rerun() # Instant update on send
+            except Exception as e:
+                st.error(f"Failed to send: {e}")
 
     # --- 6. MANUAL REFRESH (Just in Case) ---
-    # The 'run_every' handles it mostly, but this is good for network lag
+    # The watcher handles it mostly, but this is good for network lag.
+    # Dropping the cached thread forces a clean reload of the newest page.
     if st.button("🔄 Force Refresh"):
-        st.rerun()
\ No newline at end of file
+        st.session_state.get("chat_threads", {}).pop(receiver_id, None)
+        st.session_state.pop("chat_inbox", None)
+        st.session_state.pop("chat_search", None)
+        st.rerun()
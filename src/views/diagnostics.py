@@ -0,0 +1,135 @@
+import time
+
+import pandas as pd
+import streamlit as st
+
+from src.db import get_engine
+from src.db import metrics
+from src.db.cache import CACHE
+
+WINDOWS = {"Last 5 minutes": 300, "Last 15 minutes": 900, "Last hour": 3600, "Everything buffered": None}
+
+
+def _percentiles(df, by):
+    """p50/p95/p99 and volume per group, slowest p95 first."""
+    grouped = df.groupby(by)['duration_ms']
+    out = pd.DataFrame({
+        'Calls': grouped.size(),
+        'p50 (ms)': grouped.quantile(0.50),
+        'p95 (ms)': grouped.quantile(0.95),
+        'p99 (ms)': grouped.quantile(0.99),
+        'Total (ms)': grouped.sum(),
+    })
+    if (df['rows'] >= 0).any():
+        out['Avg Rows'] = df[df['rows'] >= 0].groupby(by)['rows'].mean()
+    return out.sort_values('p95 (ms)', ascending=False).round(1).reset_index()
+
+
+def render_diagnostics():
+    st.header("🩺 Diagnostics")
+    st.caption("Query and page timings recorded in this server process.")
+
+    c1, c2 = st.columns([2, 1])
+    with c1:
+        window = st.selectbox("Window", list(WINDOWS.keys()))
+    with c2:
+        st.write("")
+        if st.button("🔄 Refresh"):
+            st.rerun()
+
+    events = pd.DataFrame(list(metrics.EVENTS))
+    if events.empty:
+        st.info("No events recorded yet. Use the app for a bit and come back.")
+        return
+
+    span = WINDOWS[window]
+    if span:
+        events = events[events['at'] >= time.time() - span]
+    if events.empty:
+        st.info("Nothing recorded in this window.")
+        return
+    elapsed_min = max((events['at'].max() - events['at'].min()) / 60, 1 / 60)
+
+    queries = events[events['kind'] == 'query']
+    txs = events[events['kind'] == 'tx']
+    views = events[events['kind'] == 'view']
+    waits = events[events['kind'] == 'pool']
+
+    pool = get_engine().pool
+    m1, m2, m3, m4 = st.columns(4)
+    m1.metric("Queries", len(queries))
+    m2.metric("Queries / min", f"{len(queries) / elapsed_min:,.1f}")
+    m3.metric("Active Sessions", events['session'].nunique())
+    m4.metric("Pool (in use / open)", f"{pool.checkedout()} / {pool.size() + pool.overflow()}")
+
+    tab_q, tab_slow, tab_views, tab_sessions, tab_cache = st.tabs(["⏱ Queries", "🐢 Slow Log", "🖥 Views", "📶 Sessions", "🗃 Query Cache"])
+
+    with tab_q:
+        if not queries.empty:
+            st.dataframe(_percentiles(queries, 'name'), hide_index=True, use_container_width=True)
+        if not txs.empty:
+            st.subheader("Write Transactions")
+            st.dataframe(_percentiles(txs, 'name'), hide_index=True, use_container_width=True)
+        if not waits.empty:
+            st.subheader("Connection Waits")
+            st.caption("Checkouts that found every pooled connection busy. Many of these means pool_size is too small.")
+            st.dataframe(_percentiles(waits, 'view'), hide_index=True, use_container_width=True)
+
+    with tab_slow:
+        slow_ms = float(metrics.SETTINGS["slow_ms"])
+        st.caption(f"Statements slower than {slow_ms:.0f} ms (set [diagnostics] slow_ms to change).")
+        slow = events[events['kind'].isin(['query', 'tx']) & (events['duration_ms'] >= slow_ms)].copy()
+        if not slow.empty:
+            slow['When'] = pd.to_datetime(slow['at'], unit='s', utc=True).dt.tz_convert('Asia/Kolkata').dt.strftime('%d-%b %I:%M:%S %p')
+            slow = slow.sort_values('at', ascending=False)
+            st.dataframe(
+                slow[['When', 'kind', 'name', 'view', 'rows', 'duration_ms']].round(1),
+                hide_index=True, use_container_width=True
+            )
+        else:
+            st.success("No slow statements in this window.")
+
+    with tab_views:
+        if not views.empty:
+            st.dataframe(_percentiles(views, 'name'), hide_index=True, use_container_width=True)
+        if not queries.empty:
+            st.subheader("Database Time per View")
+            per_view = queries.groupby(queries['view'].fillna('(none)')).agg(
+                Queries=('duration_ms', 'size'), DB_ms=('duration_ms', 'sum')
+            ).sort_values('DB_ms', ascending=False).round(1).reset_index()
+            st.dataframe(per_view, hide_index=True, use_container_width=True)
+
+    with tab_sessions:
+        st.caption("Renders and queries per minute for each browser session. Chat reruns on new messages count as renders.")
+        per_session = events[events['session'].notna()].groupby('session').agg(
+            First=('at', 'min'), Last=('at', 'max'),
+            Renders=('kind', lambda k: int((k == 'view').sum())),
+            Queries=('kind', lambda k: int((k == 'query').sum())),
+        )
+        if not per_session.empty:
+            minutes = ((per_session['Last'] - per_session['First']) / 60).clip(lower=1 / 60)
+            per_session['Renders / min'] = (per_session['Renders'] / minutes).round(1)
+            per_session['Queries / min'] = (per_session['Queries'] / minutes).round(1)
+            st.dataframe(
+                per_session[['Renders', 'Queries', 'Renders / min', 'Queries / min']]
+                .sort_values('Queries / min', ascending=False).reset_index(),
+                hide_index=True, use_container_width=True
+            )
+
+    with tab_cache:
+        st.caption("Shared results for cached=True reads, dropped whenever one of their tables is written.")
+        stats = CACHE.stats()
+        c1, c2, c3, c4 = st.columns(4)
+        c1.metric("Hit Rate", f"{stats['hit_rate']:.0%}")
+        c2.metric("Hits / Misses", f"{stats['hits']:,} / {stats['misses']:,}")
+        c3.metric("Invalidated", f"{stats['stale']:,}")
+        c4.metric("Entries", f"{stats['entries']:,} (evicted {stats['evictions']:,})")
+        if stats['versions']:
+            st.subheader("Table Versions")
+            st.dataframe(
+                pd.DataFrame(sorted(stats['versions'].items()), columns=['Table', 'Writes Seen']),
+                hide_index=True, use_container_width=True
+            )
+        if st.button("🧹 Clear Cache"):
+            CACHE.clear()
+            st.rerun()
@@ -0,0 +1 @@
+"""Employee pages, one module each; src/views/navigation.py imports them on first visit."""
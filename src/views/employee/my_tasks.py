@@ -0,0 +1,123 @@
+"""The signed-in employee's open tasks and completed history."""
+import time
+
+import pandas as pd
+import streamlit as st
+
+from src.db import fetch_all, read_df, transaction
+from src.db import queries as q
+
+DONE_TASKS_PAGE_SIZE = 20
+# Seconds before the locally kept open-task list is re-read on its own
+MY_TASKS_MAX_AGE = 60
+
+
+def render_my_tasks():
+    st.header("📋 My To-Do List")
+    uid = st.session_state.user.id
+    
+    # Open tasks are kept in session state and updated locally after a write;
+    # they are re-read only on Refresh or once they are older than MY_TASKS_MAX_AGE
+    cached = st.session_state.get("my_open_tasks")
+    if cached is None or cached["uid"] != uid or time.time() - cached["loaded_at"] > MY_TASKS_MAX_AGE:
+        cached = {"uid": uid, "loaded_at": time.time(), "df": read_df(q.MY_OPEN_TASKS, {"uid": uid})}
+        st.session_state.my_open_tasks = cached
+    open_df = cached["df"]
+    
+    h1, h2 = st.columns([4, 1])
+    with h1:
+        st.caption(f"{len(open_df)} open task(s)")
+    with h2:
+        if st.button("🔄 Refresh"):
+            st.session_state.pop("my_open_tasks", None)
+            st.rerun()
+    
+    if not open_df.empty:
+        editor_df = pd.DataFrame({
+            "Pick": False,
+            "Task": open_df['title'],
+            "Due": open_df['due_date'],
+            "Status": open_df['status'].str.upper(),
+            "Details": open_df['description'].fillna('No description provided.'),
+        })
+        
+        with st.form("complete_tasks"):
+            edited = st.data_editor(
+                editor_df,
+                hide_index=True,
+                use_container_width=True,
+                disabled=["Task", "Due", "Status", "Details"],
+                key="my_tasks_editor",
+            )
+            b1, b2 = st.columns(2)
+            started = b1.form_submit_button("🔧 Start Selected", use_container_width=True)
+            submitted = b2.form_submit_button("✅ Mark Selected as Done", use_container_width=True)
+        
+        if started or submitted:
+            picked = open_df.loc[edited['Pick'].to_numpy(), 'id'].astype(str).tolist()
+            if not picked:
+                st.warning("Tick at least one task first.")
+            elif started:
+                with transaction() as tx:
+                    start_ids = {str(r['id']) for r in fetch_all(q.START_TASKS, {"ids": picked, "uid": uid}, tx=tx)}
+                
+                # Optimistic local update, as for completed tasks below
+                df = open_df.copy()
+                df.loc[df['id'].astype(str).isin(start_ids), 'status'] = 'in_progress'
+                cached["df"] = df
+                st.session_state.pop("my_tasks_editor", None)
+                st.toast(f"{len(start_ids)} task(s) started!")
+                st.rerun()
+            else:
+                with transaction() as tx:
+                    done_ids = {str(r['id']) for r in fetch_all(q.COMPLETE_TASKS, {"ids": picked, "uid": uid}, tx=tx)}
+                
+                # Optimistic local update: drop the finished rows, no re-query
+                cached["df"] = open_df[~open_df['id'].astype(str).isin(done_ids)].reset_index(drop=True)
+                st.session_state.pop("my_tasks_editor", None)
+                st.session_state.my_done_cursors = [None]
+                st.toast(f"{len(done_ids)} task(s) completed!")
+                st.rerun()
+    else:
+        st.info("No open tasks! Enjoy the coffee ☕")
+    
+    # --- Completed work, paged and only loaded on request ---
+    st.divider()
+    if st.toggle("Show completed tasks"):
+        cursors = st.session_state.setdefault("my_done_cursors", [None])
+        cursor = cursors[-1]
+        done_df = read_df(q.MY_DONE_TASKS_PAGE, {
+            "uid": uid,
+            "cur_ts": cursor[0] if cursor else None,
+            "cur_id": cursor[1] if cursor else None,
+            "limit": DONE_TASKS_PAGE_SIZE + 1,
+        })
+        has_next = len(done_df) > DONE_TASKS_PAGE_SIZE
+        done_df = done_df.head(DONE_TASKS_PAGE_SIZE)
+        
+        if not done_df.empty:
+            completed = pd.to_datetime(done_df['completed_at'], utc=True).dt.tz_convert('Asia/Kolkata')
+            st.dataframe(
+                pd.DataFrame({
+                    "Task": done_df['title'],
+                    "Due": done_df['due_date'],
+                    "Completed": completed.dt.strftime('%d-%b-%Y %I:%M %p').fillna('-'),
+                }),
+                hide_index=True,
+                use_container_width=True
+            )
+            
+            p1, p2, p3 = st.columns([1, 2, 1])
+            with p1:
+                if len(cursors) > 1 and st.button("⬅️ Newer"):
+                    cursors.pop()
+                    st.rerun()
+            with p2:
+                st.caption(f"Page {len(cursors)}")
+            with p3:
+                if has_next and st.button("Older ➡️"):
+                    last = done_df.iloc[-1]
+                    cursors.append((last['created_at'], str(last['id'])))
+                    st.rerun()
+        else:
+            st.caption("Nothing completed yet.")
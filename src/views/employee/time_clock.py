@@ -0,0 +1,99 @@
+"""Geofenced clock-in and clock-out."""
+import time
+
+import pandas as pd
+import streamlit as st
+from streamlit_js_eval import get_geolocation
+
+from src.db import execute
+from src.db import queries as q
+from src.services.attendance import week_summary
+from src.services.geolocation import locate_office
+from src.services.partitions import open_shift
+from src.services.payroll import close_shift
+
+
+def _render_week(uid):
+    """Hours today and this week, split at midnight the way payroll counts them."""
+    week = week_summary(uid)
+    w1, w2, w3 = st.columns(3)
+    w1.metric("Today", f"{week['today']:.1f} h")
+    w2.metric("This Week", f"{week['week']:.1f} h")
+    w3.metric("Overtime", f"{week['overtime']:.1f} h")
+    st.caption(f"Monday to Sunday, including the shift you are on. Overtime starts after "
+               f"{week['daily_hours']} h in a day or {week['weekly_hours']} h in a week.")
+
+
+def render_time_clock():
+    st.header("⏱️ Daily Attendance")
+    
+    # A. CHECK STATUS: Is there an unfinished shift?
+    uid = st.session_state.user.id
+    
+    active_shift_df = open_shift(uid)
+    _render_week(uid)
+
+    # B. LOGIC BRANCH: CLOCK OUT vs CLOCK IN
+    if not active_shift_df.empty:
+        # --- STATUS: WORKING (Show Clock Out) ---
+        shift = active_shift_df.iloc[0].to_dict()
+        
+        # --- FIX: ROBUST TIMEZONE CONVERSION ---
+        try:
+            start_time = pd.to_datetime(shift['clock_in'], utc=True).tz_convert('Asia/Kolkata').strftime('%H:%M')
+        except Exception:
+            start_time = "--:--"
+        
+        st.info(f"🟢 **YOU ARE CLOCKED IN** (Started at {start_time})")
+        
+        with st.form("clock_out_form"):
+            st.write("End your shift?")
+            comment = st.text_area("Daily Report / Comments", placeholder="Example: Finished 3 logo drafts. Uploading to vault.")
+            
+            if st.form_submit_button("🔴 CLOCK OUT NOW"):
+                # Closes the shift and adds its hours to the payroll rollup in one statement
+                close_shift(shift['id'], comment)
+                
+                st.success("Shift ended. Have a great evening!")
+                st.rerun()
+                
+    else:
+        # --- STATUS: OFFLINE (Show Clock In with Geofence) ---
+        st.warning("⚪ You are currently OFFLINE")
+        
+        st.write("📍 **Verifying Location...**")
+        loc = get_geolocation() 
+        
+        if loc:
+            lat = loc['coords']['latitude']
+            lon = loc['coords']['longitude']
+            is_inside, dist, office = locate_office(lat, lon)
+            
+            if dist > 1000:
+                st.metric(f"Distance to {office['name']}", f"{dist/1000:.1f} km")
+            else:
+                st.metric(f"Distance to {office['name']}", f"{dist} m")
+            
+            if is_inside:
+                st.success(f"✅ Location Verified: Inside {office['name']} Zone")
+                if st.button("🟢 CLOCK IN"):
+                    try:
+                        # 1. Force fetch the ID from the current session state
+                        current_user_id = st.session_state.user.id
+                        
+                        # 2. Insert the new shift
+                        execute(q.CLOCK_IN, {"uid": current_user_id, "lat": lat, "lon": lon, "office_id": office['id']})
+                        
+                        st.balloons()
+                        time.sleep(1) 
+                        st.rerun()
+                        
+                    except Exception as e:
+                        st.error(f"Error during Clock In: {e}")
+                        st.write(f"⚠️ Debug Info - Failed for User ID: {st.session_state.user.id}")
+
+            else:
+                st.error("❌ Outside Office Range")
+                st.button("🚫 Clock In Disabled", disabled=True)
+        else:
+            st.warning("⚠️ Waiting for GPS... (Please allow location access)")
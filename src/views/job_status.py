@@ -0,0 +1,64 @@
+"""
+Waiting on a background job (src/services/jobs.py) from a page.
+
+A page keeps the id of the job it started in session state under a slot name
+and calls job_panel(slot, on_done) on every run. While the job is queued or
+running, a fragment re-reads its row every poll_seconds and nothing else on the
+page reruns. Once the job has finished, one full rerun hands it to on_done.
+"""
+import os
+
+import pandas as pd
+import streamlit as st
+
+from src.db.metrics import timed_view
+from src.services.jobs import JOBS, cancel, get_job, load_settings
+
+POLL_SECONDS = float(load_settings()["poll_seconds"])
+
+
+def _finished_label(job) -> str:
+    finished = pd.Timestamp(job['finished_at']).tz_convert('Asia/Kolkata')
+    return f"Calculated {finished:%d-%b %I:%M %p}; reused until the underlying data changes."
+
+
+@st.fragment(run_every=POLL_SECONDS)
+@timed_view("jobs.poll")
+def _waiting(slot):
+    job = get_job(st.session_state[slot])
+    if job is None or job['status'] in ("done", "failed"):
+        st.rerun()
+
+    label = JOBS[job['kind']].label
+    if job['status'] == "queued":
+        st.info(f"⏳ {label} is queued; a worker will pick it up shortly. You can leave this page and come back.")
+    else:
+        elapsed = pd.Timestamp.now(tz='UTC') - pd.Timestamp(job['started_at'])
+        detail = f" · {job['progress']}" if job['progress'] else ""
+        st.info(f"⚙️ {label} running for {int(elapsed.total_seconds())} s{detail}. "
+                "You can leave this page and come back.")
+    if st.button("✖ Cancel", key=f"{slot}_cancel"):
+        cancel(job['id'])
+        st.session_state.pop(slot, None)
+        st.rerun()
+
+
+def job_panel(slot: str, on_done):
+    """Shows progress for the job in st.session_state[slot], or passes the finished job row to on_done."""
+    job_id = st.session_state.get(slot)
+    if not job_id:
+        return
+    job = get_job(job_id)
+    if job is None:
+        st.session_state.pop(slot, None)
+        return
+
+    if job['status'] in ("queued", "running"):
+        _waiting(slot)
+    elif job['status'] == "failed":
+        st.error(f"{JOBS[job['kind']].label} failed: {job['error']}")
+    elif not os.path.exists(job['result_path'] or ""):
+        st.warning("This result was computed on another server or has expired. Run it again.")
+    else:
+        st.caption(_finished_label(job))
+        on_done(job)
@@ -1,5 +1,6 @@
 import streamlit as st
 from src.auth import authenticate_user
+from src.services.passwords import HashPoolBusy
 
 def render_login():
     st.markdown("<h1 style='text-align: center; color: #c5a059;'>Agency OS</h1>", unsafe_allow_html=True)
@@ -22,7 +23,11 @@ def render_login():
                     else:
                         with st.spinner("Authenticating..."):
                             # This MUST point to the new Postgres function
-                            success = authenticate_user(email, password)
+                            try:
+                                success = authenticate_user(email, password)
+                            except HashPoolBusy as e:
+                                st.warning(f"⏳ {e}")
+                                st.stop()
                             if success:
                                 st.success("Access Granted.")
                                 st.rerun() 
@@ -0,0 +1,87 @@
+"""
+Role-filtered pages for st.navigation.
+
+Every page is listed here by the module and function that draw it. A page's
+module is imported the first time anyone opens it, so a cold start loads only
+the page on screen and each rerun executes only that page's queries. The pooled
+engine is created by the first query (src/db/engine.py), not at import.
+
+Each page has its own URL (/payroll, /tasks, ...) that can be bookmarked or
+shared. A role never gets pages it is not allowed to see; opening one of
+those URLs falls back to the role's first page.
+"""
+import importlib
+from typing import NamedTuple
+
+import streamlit as st
+
+from src.db.metrics import timed_view
+
+
+class PageSpec(NamedTuple):
+    title: str
+    icon: str
+    module: str
+    function: str
+    url_path: str
+
+
+LOGIN = PageSpec("Login", "🔐", "src.views.login", "render_login", "login")
+
+# The first page of each role is where it lands after login
+ROLE_PAGES = {
+    "owner": [
+        PageSpec("Overwatch", "🔭", "src.views.owner.overwatch", "render_overwatch", "overwatch"),
+        PageSpec("Shift Report", "🕒", "src.views.owner.shifts", "render_shift_report", "shifts"),
+        PageSpec("AI Insights", "🧠", "src.views.owner.insights", "render_insights", "insights"),
+        PageSpec("Task Dispatcher", "⚡", "src.views.owner.dispatcher", "render_dispatcher", "dispatch"),
+        PageSpec("Task Tracker", "📊", "src.views.owner.tracker", "render_tracker", "tracker"),
+        PageSpec("The Vault", "🔐", "src.views.owner.vault", "render_vault", "vault"),
+        PageSpec("Manage Staff", "👥", "src.views.owner.staff", "render_staff", "staff"),
+        PageSpec("Payroll", "💰", "src.views.owner.payroll", "render_payroll", "payroll"),
+        PageSpec("Team Chat", "💬", "src.views.chat_component", "render_chat_widget", "chat"),
+        PageSpec("Diagnostics", "🩺", "src.views.diagnostics", "render_diagnostics", "diagnostics"),
+        PageSpec("Settings", "⚙️", "src.views.owner.settings", "render_settings", "settings"),
+    ],
+    "employee": [
+        PageSpec("Time Clock", "⏱️", "src.views.employee.time_clock", "render_time_clock", "clock"),
+        PageSpec("My Tasks", "📋", "src.views.employee.my_tasks", "render_my_tasks", "tasks"),
+        PageSpec("Team Chat", "💬", "src.views.chat_component", "render_chat_widget", "chat"),
+    ],
+    "manager": [
+        PageSpec("Team Intercom", "💬", "src.views.chat_component", "render_chat_widget", "chat"),
+    ],
+}
+
+SIDEBAR_TITLES = {
+    "owner": ("Admin", "Owner"),
+    "employee": ("Pioneer View", "Employee"),
+    "manager": ("Manager", "Staff"),
+}
+
+
+def _runner(view: str, spec: PageSpec):
+    """Page callable that imports the page's module on first use, then times the render."""
+    def run():
+        with timed_view(view):
+            getattr(importlib.import_module(spec.module), spec.function)()
+    return run
+
+
+def _page(view: str, spec: PageSpec, default: bool = False):
+    return st.Page(_runner(view, spec), title=spec.title, icon=spec.icon, url_path=spec.url_path, default=default)
+
+
+def login_pages() -> list:
+    return [_page("login", LOGIN, default=True)]
+
+
+def role_pages(role: str) -> list:
+    """The pages `role` may open, its landing page first. Empty for an unknown role."""
+    specs = ROLE_PAGES.get(role, [])
+    return [_page(f"{role}.{s.title}", s, default=(i == 0)) for i, s in enumerate(specs)]
+
+
+def sidebar_title(role: str) -> str:
+    label, fallback = SIDEBAR_TITLES[role]
+    return f"{label}: {st.session_state.get('user_name') or fallback}"
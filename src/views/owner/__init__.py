@@ -0,0 +1 @@
+"""Owner pages, one module each; src/views/navigation.py imports them on first visit."""
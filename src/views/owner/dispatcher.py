@@ -0,0 +1,152 @@
+"""Single, bulk and recurring task dispatch."""
+import pandas as pd
+import streamlit as st
+
+from src.db import execute, read_df
+from src.db import queries as q
+from src.services.scheduler import FREQUENCIES, batch_key, dispatch, materialize_due
+
+
+def render_dispatcher():
+    st.header("⚡ Task Dispatcher")
+    
+    # Staff and client lists change rarely; one cached read serves every rerun
+    emps_df = read_df(q.EMPLOYEES, cached=True)
+    emp_map = dict(zip(emps_df['full_name'], emps_df['id'])) if not emps_df.empty else {}
+    
+    clients_df = read_df(q.CLIENT_NAMES, cached=True)
+    client_map = dict(zip(clients_df['name'], clients_df['id'])) if not clients_df.empty else {}
+    
+    staff_df = read_df(q.ASSIGNABLE_STAFF, cached=True)
+    staff_map = {f"{r.full_name} ({r.role})": str(r.id) for r in staff_df.itertuples()} if not staff_df.empty else {}
+    
+    templates_df = read_df(q.TASK_TEMPLATES, cached=True)
+    template_map = {r.name: r for r in templates_df.itertuples()} if not templates_df.empty else {}
+    
+    tab_single, tab_bulk, tab_templates = st.tabs(["🎯 Single Task", "📦 Bulk Dispatch", "🔁 Templates & Schedules"])
+
+    with tab_single:
+        with st.form("assign_task"):
+            c1, c2 = st.columns(2)
+            with c1:
+                title = st.text_input("Task Title")
+                sel_client = st.selectbox("Client", options=list(client_map.keys()))
+            with c2:
+                assignee = st.selectbox("Assign To", options=list(emp_map.keys()))
+                due = st.date_input("Due Date")
+            
+            desc = st.text_area("Description")
+            
+            if st.form_submit_button("Dispatch Task"):
+                if title and sel_client and assignee:
+                    execute(q.INSERT_TASK, {
+                        "title": title, "desc": desc, 
+                        "cid": client_map[sel_client], "aid": emp_map[assignee], "due": due
+                    })
+                    st.success("Task Assigned!")
+                    st.rerun()
+                else:
+                    st.error("Please fill in all fields.")
+    
+    # --- BULK: every assignee x client in one INSERT ---
+    with tab_bulk:
+        st.caption("Sends the same task to every selected person for every selected client.")
+        
+        source = st.selectbox("Start From", ["(custom)"] + list(template_map.keys()), key="bulk_source")
+        tpl = template_map.get(source)
+        
+        with st.form("bulk_dispatch"):
+            b_title = st.text_input("Task Title", value=tpl.title if tpl else "")
+            b_desc = st.text_area("Description", value=(tpl.description or "") if tpl else "")
+            b1, b2 = st.columns(2)
+            with b1:
+                b_staff = st.multiselect("Assign To", list(staff_map.keys()))
+                all_clients = st.checkbox("All clients")
+                b_clients = st.multiselect("Clients", list(client_map.keys()))
+            with b2:
+                default_due = pd.Timestamp.now(tz='Asia/Kolkata').date() + pd.Timedelta(days=int(tpl.due_in_days) if tpl else 0)
+                b_due = st.date_input("Due Date", value=default_due)
+            
+            if st.form_submit_button("Dispatch to All Selected"):
+                picked_clients = list(client_map.values()) if all_clients else [client_map[c] for c in b_clients]
+                if not b_title or not b_staff or not picked_clients:
+                    st.error("Pick a title, at least one person and at least one client.")
+                else:
+                    # Same form contents, same key: a double-submit or retry creates nothing new
+                    b_staff_ids = [staff_map[n] for n in b_staff]
+                    created = dispatch(
+                        b_title, b_desc, b_staff_ids, picked_clients, b_due,
+                        batch_key(b_title, b_desc, b_staff_ids, picked_clients, b_due)
+                    )
+                    st.success(f"✅ {created} task(s) dispatched to {len(b_staff)} people across {len(picked_clients)} client(s).")
+    
+    # --- TEMPLATES & RECURRENCE ---
+    with tab_templates:
+        with st.expander("➕ New Template"):
+            with st.form("new_template"):
+                t_name = st.text_input("Template Name", placeholder="Weekly client check-in")
+                t_title = st.text_input("Task Title")
+                t_desc = st.text_area("Description")
+                t_due = st.number_input("Due After (days)", min_value=0, value=2, step=1)
+                if st.form_submit_button("Save Template"):
+                    if t_name and t_title:
+                        try:
+                            execute(q.INSERT_TASK_TEMPLATE, {"name": t_name, "title": t_title, "desc": t_desc, "due_days": int(t_due)})
+                            st.rerun()
+                        except Exception as e:
+                            st.error(f"Could not save template (name might already exist): {e}")
+                    else:
+                        st.error("Name and title are required.")
+        
+        if not templates_df.empty:
+            st.dataframe(
+                templates_df[['name', 'title', 'due_in_days']].rename(columns={
+                    'name': 'Template', 'title': 'Task Title', 'due_in_days': 'Due After (days)'
+                }),
+                hide_index=True,
+                use_container_width=True
+            )
+            
+            st.subheader("🔁 Schedules")
+            with st.expander("➕ New Schedule"):
+                with st.form("new_schedule"):
+                    s1, s2 = st.columns(2)
+                    with s1:
+                        s_template = st.selectbox("Template", list(template_map.keys()))
+                        s_freq = st.selectbox("Repeat", list(FREQUENCIES.keys()), index=1)
+                        s_start = st.date_input("First Run")
+                    with s2:
+                        s_staff = st.multiselect("Assign To", list(staff_map.keys()), key="sched_staff")
+                        s_all_clients = st.checkbox("All clients", key="sched_all_clients")
+                        s_clients = st.multiselect("Clients", list(client_map.keys()), key="sched_clients")
+                    
+                    if st.form_submit_button("Create Schedule"):
+                        s_client_ids = [str(c) for c in client_map.values()] if s_all_clients else [str(client_map[c]) for c in s_clients]
+                        if s_staff and s_client_ids:
+                            execute(q.INSERT_TASK_SCHEDULE, {
+                                "tid": str(template_map[s_template].id), "freq": s_freq,
+                                "aids": [staff_map[n] for n in s_staff], "cids": s_client_ids, "next_run": s_start
+                            })
+                            st.rerun()
+                        else:
+                            st.error("Pick at least one person and one client.")
+            
+            schedules_df = read_df(q.TASK_SCHEDULES, cached=True)
+            if not schedules_df.empty:
+                for sched in schedules_df.itertuples():
+                    with st.container(border=True):
+                        r1, r2 = st.columns([4, 1])
+                        with r1:
+                            st.write(f"**{sched.template_name}** · {sched.frequency} · {sched.assignees} people × {sched.clients} clients")
+                            st.caption(f"Next run: {sched.next_run}" if sched.active else "⏸ Paused")
+                        with r2:
+                            label = "⏸ Pause" if sched.active else "▶️ Resume"
+                            if st.button(label, key=f"sched_toggle_{sched.id}"):
+                                execute(q.SET_SCHEDULE_ACTIVE, {"id": sched.id, "active": not sched.active})
+                                st.rerun()
+                
+                if st.button("⏱ Run Due Schedules Now"):
+                    ran, created = materialize_due()
+                    st.success(f"{ran} schedule(s) due, {created} task(s) created.")
+        else:
+            st.info("Create a template to start dispatching in bulk or on a schedule.")
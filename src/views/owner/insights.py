@@ -0,0 +1,129 @@
+"""Client sentiment feed, staff leaderboard and client health from the AI rollups."""
+import pandas as pd
+import streamlit as st
+
+from src.db import read_df
+from src.db import queries as q
+
+INSIGHTS_PAGE_SIZE = 20
+INSIGHT_WINDOWS = {"Last 7 days": 7, "Last 30 days": 30, "Last 90 days": 90, "All time": None}
+
+
+def render_insights():
+    st.header("🧠 AI Operations Manager")
+    st.caption("Live sentiment analysis from the n8n background engine.")
+
+    f1, f2 = st.columns([2, 1])
+    with f1:
+        window = st.selectbox("Window", list(INSIGHT_WINDOWS.keys()), index=1)
+    with f2:
+        st.write("")
+        low_only = st.checkbox("Only at-risk (< 5)")
+    
+    days = INSIGHT_WINDOWS[window]
+    today = pd.Timestamp.now(tz='Asia/Kolkata').normalize()
+    start_day = (today - pd.Timedelta(days=days - 1)) if days else pd.Timestamp('1970-01-01', tz='Asia/Kolkata')
+    
+    # --- TOP METRICS (from the daily rollup, no message bodies) ---
+    totals = read_df(q.INSIGHTS_TOTALS, {"start_day": start_day.date()}, ttl=60).iloc[0]
+    
+    if int(totals['messages']) > 0:
+        avg_score = float(totals['avg_score'])
+        lowest_score = float(totals['min_score'])
+        
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Avg Client Sentiment", f"{avg_score:.1f} / 10")
+        with col2:
+            st.metric("Analyzed Interactions", f"{int(totals['messages']):,}")
+        with col3:
+            # Find the lowest score to highlight immediate risks
+            st.metric("Lowest Health Score", f"{lowest_score:g} / 10", delta="Requires Attention" if lowest_score < 5 else "All Good", delta_color="inverse")
+        with col4:
+            st.metric("At-Risk Messages", f"{int(totals['low_count']):,}")
+
+        st.divider()
+
+        # --- THE LIVE FEED (keyset pages, newest first) ---
+        st.subheader("📡 Live Sentiment Feed")
+        
+        feed_key = (window, low_only)
+        if st.session_state.get("ai_feed_key") != feed_key:
+            st.session_state.ai_feed_key = feed_key
+            st.session_state.ai_cursors = [None]
+        cursor = st.session_state.ai_cursors[-1]
+        
+        df_ai = read_df(q.INSIGHTS_FEED, {
+            "start_ts": start_day.tz_convert('UTC').to_pydatetime(),
+            "low_only": low_only,
+            "cur_ts": cursor[0] if cursor else None,
+            "cur_id": cursor[1] if cursor else None,
+            "limit": INSIGHTS_PAGE_SIZE + 1,
+        })
+        has_next = len(df_ai) > INSIGHTS_PAGE_SIZE
+        df_ai = df_ai.head(INSIGHTS_PAGE_SIZE)
+        
+        df_ai['client_name'] = df_ai['client_name'].fillna('Unknown Client')
+        df_ai['employee_name'] = df_ai['employee_name'].fillna('System/Client')
+        
+        for row in df_ai.itertuples(index=False):
+            score = row.ai_sentiment_score
+            
+            # Dynamic coloring based on the LLM's score
+            if score is None or pd.isna(score):
+                color = "⚪"
+            elif score >= 8:
+                color = "🟢"
+            elif score >= 5:
+                color = "🟡"
+            else:
+                color = "🔴"
+            
+            with st.expander(f"{color} {row.client_name} (Score: {score}/10) - {str(row.created_at)[:10]}"):
+                st.write(f"**AI Summary:** {row.ai_summary}")
+                st.caption(f"**Original Message:** {row.message_body}")
+                st.caption(f"Handled by: {row.employee_name}")
+        
+        if df_ai.empty:
+            st.info("No messages match these filters.")
+        
+        p1, p2, p3 = st.columns([1, 2, 1])
+        with p1:
+            if len(st.session_state.ai_cursors) > 1 and st.button("⬅️ Newer", key="ai_newer"):
+                st.session_state.ai_cursors.pop()
+                st.rerun()
+        with p2:
+            st.caption(f"Page {len(st.session_state.ai_cursors)}")
+        with p3:
+            if has_next and st.button("Older ➡️", key="ai_older"):
+                last = df_ai.iloc[-1]
+                st.session_state.ai_cursors.append((last['created_at'], str(last['id'])))
+                st.rerun()
+
+        # --- EMPLOYEE LEADERBOARD ---
+        st.divider()
+        st.subheader("🏆 AI Employee Leaderboard")
+        st.caption("Ranking employees by the average sentiment score of their client interactions.")
+        
+        leaderboard = read_df(q.INSIGHTS_BY_EMPLOYEE, {"start_day": start_day.date()}, ttl=60)
+        leaderboard = leaderboard.astype({'avg_score': float}).round({'avg_score': 2})
+        leaderboard.rename(columns={
+            'employee_name': 'Employee', 'messages': 'Interactions',
+            'avg_score': 'Avg Client Score', 'low_count': 'At-Risk'
+        }, inplace=True)
+        st.dataframe(leaderboard, hide_index=True, use_container_width=True)
+        
+        # --- CLIENT HEALTH ---
+        st.subheader("🏢 Client Health")
+        st.caption("Clients with the lowest average sentiment first.")
+        
+        clients_health = read_df(q.INSIGHTS_BY_CLIENT, {"start_day": start_day.date()}, ttl=60)
+        clients_health = clients_health.astype({'avg_score': float}).round({'avg_score': 2})
+        clients_health.rename(columns={
+            'client_name': 'Client', 'messages': 'Interactions',
+            'avg_score': 'Avg Score', 'min_score': 'Lowest Score'
+        }, inplace=True)
+        st.dataframe(clients_health, hide_index=True, use_container_width=True)
+
+    else:
+        st.info("The AI Manager is waiting for data. Send a test message and let n8n process it!")
@@ -0,0 +1,204 @@
+"""Live presence, attendance history and the geofence audit."""
+import pandas as pd
+import streamlit as st
+
+from src.db import read_df
+from src.db import queries as q
+from src.db.metrics import timed_view
+from src.services.attendance import describe_shifts
+from src.services.geolocation import get_geofence
+from src.services.jobs import enqueue, load_result
+from src.services.partitions import history_page, history_totals, live_presence
+from src.views.job_status import job_panel
+
+HISTORY_PAGE_SIZE = 50
+PRESENCE_REFRESH_SECONDS = 30
+
+
+@st.fragment(run_every=PRESENCE_REFRESH_SECONDS)
+@timed_view("owner.presence")
+def _render_presence():
+    """Everyone on shift right now. Reruns on its own without redrawing the page."""
+    df = live_presence()
+    
+    m1, m2, m3 = st.columns(3)
+    m1.metric("On Shift Now", len(df))
+    m2.metric("Verified", int(df['is_verified'].fillna(False).astype(bool).sum()) if not df.empty else 0)
+    
+    if df.empty:
+        m3.metric("Longest Shift", "-")
+        st.info("Nobody is clocked in right now.")
+        return
+    
+    clock_in = pd.to_datetime(df['clock_in'], utc=True)
+    shift = describe_shifts(clock_in)
+    hours = shift['hours']
+    m3.metric("Longest Shift", f"{hours.max():.1f} h")
+    
+    df['Employee'] = df['employee_name'].fillna('Unknown')
+    df['Since'] = clock_in.dt.tz_convert('Asia/Kolkata').dt.strftime('%I:%M %p (%d-%b)')
+    df['On Shift'] = hours.map(lambda h: f"{int(h)}h {int(h * 60) % 60:02d}m")
+    df['Site'] = df['office_name'].fillna('-')
+    df['Verified'] = df['is_verified'].fillna(False).astype(bool).map({True: '✅', False: '⚠️'})
+    df['Note'] = shift['stale'].map({True: '🕰 Forgot to clock out?', False: ''})
+    
+    st.dataframe(
+        df[['Employee', 'Since', 'On Shift', 'Site', 'Verified', 'Note']],
+        hide_index=True,
+        use_container_width=True
+    )
+    st.caption(f"Updates every {PRESENCE_REFRESH_SECONDS} seconds.")
+
+
+def _show_audit(job):
+    summary, flagged = job['result'], load_result(job)
+    m1, m2, m3, m4 = st.columns(4)
+    m1.metric("Checked", f"{summary['checked']:,}")
+    m2.metric("Inside a Site", f"{summary['inside']:,}")
+    m3.metric("Outside", f"{summary['outside']:,}")
+    m4.metric("Verified but Outside", f"{summary['verified_but_outside']:,}")
+
+    if not flagged.empty:
+        flagged['clock_in'] = pd.to_datetime(flagged['clock_in'], utc=True).dt.tz_convert('Asia/Kolkata').dt.strftime('%d-%b-%Y %I:%M %p')
+        st.dataframe(flagged.head(500), hide_index=True, use_container_width=True)
+        st.download_button("⬇️ Download Flagged Rows (CSV)", flagged.to_csv(index=False), "geofence_audit.csv", "text/csv")
+    else:
+        st.success("Every clock-in in this range is inside a site and matches its verification flag.")
+
+
+def render_overwatch():
+    st.header("🔭 Live Agency Overwatch")
+    
+    tab_live, tab_history, tab_audit = st.tabs(["🔴 Live Activity", "📅 Attendance History", "🛰 Geofence Audit"])
+
+    # --- TAB 1: Who is on shift + Live Feed (Latest 20) ---
+    with tab_live:
+        _render_presence()
+        
+        st.subheader("Recent Activity")
+        st.caption("The 20 most recent clock-ins/outs.")
+        
+        # JOIN to get the user's name
+        df = read_df(q.RECENT_ACTIVITY)
+        
+        if not df.empty:
+            df['Employee'] = df['employee_name'].fillna('Unknown')
+            
+            # TIMEZONE CONVERSION (UTC -> IST)
+            df['clock_in'] = pd.to_datetime(df['clock_in'], utc=True)
+            df['Time'] = df['clock_in'].dt.tz_convert('Asia/Kolkata').dt.strftime('%I:%M %p (%d-%b)')
+            
+            st.dataframe(
+                df[['Employee', 'Time', 'status', 'is_verified']], 
+                hide_index=True, 
+                use_container_width=True
+            )
+        else:
+            st.info("No recent activity.")
+            
+    with tab_history:
+        st.caption("View attendance records for any date range.")
+        
+        emps_df = read_df(q.EMPLOYEES, cached=True)
+        emp_map = dict(zip(emps_df['full_name'], emps_df['id'].astype(str))) if not emps_df.empty else {}
+        
+        f1, f2, f3 = st.columns([2, 2, 1])
+        with f1:
+            today = pd.Timestamp("today").date()
+            sel_range = st.date_input("Date Range", value=(today, today), key="hist_range")
+        with f2:
+            sel_emps = st.multiselect("Employees", list(emp_map.keys()), placeholder="All employees")
+        with f3:
+            sel_status = st.selectbox("Status", ["All", "active", "completed"])
+        
+        # Timezone-correct bounds: IST midnight of the first day up to IST midnight after the last
+        range_start, range_end = sel_range[0], sel_range[-1]
+        start_ts = pd.Timestamp(range_start).tz_localize('Asia/Kolkata').tz_convert('UTC').to_pydatetime()
+        end_ts = (pd.Timestamp(range_end) + pd.DateOffset(days=1)).tz_localize('Asia/Kolkata').tz_convert('UTC').to_pydatetime()
+        
+        filters = {
+            "start_ts": start_ts,
+            "end_ts": end_ts,
+            "emp_ids": [emp_map[n] for n in sel_emps] or None,
+            "status": None if sel_status == "All" else sel_status,
+        }
+        
+        # Keyset pagination: a stack of (clock_in, id) cursors, reset whenever the filters change
+        filter_key = (range_start, range_end, tuple(sel_emps), sel_status)
+        if st.session_state.get("hist_filter_key") != filter_key:
+            st.session_state.hist_filter_key = filter_key
+            st.session_state.hist_cursors = [None]
+        cursor = st.session_state.hist_cursors[-1]
+        
+        # Live rows first, then archived months (src/services/partitions.py)
+        df_hist = history_page(filters, cursor, HISTORY_PAGE_SIZE + 1)
+        
+        has_next = len(df_hist) > HISTORY_PAGE_SIZE
+        df_hist = df_hist.head(HISTORY_PAGE_SIZE)
+        
+        if not df_hist.empty:
+            df_hist['Employee'] = df_hist['employee_name'].fillna('Unknown')
+            
+            # Hours and notes from the shift analytics (open shifts count up to now)
+            clock_in = pd.to_datetime(df_hist['clock_in'], utc=True)
+            clock_out = pd.to_datetime(df_hist['clock_out'], utc=True)
+            shift = describe_shifts(clock_in, clock_out)
+            
+            df_hist['Hours'] = shift['hours'].map('{:,.2f}'.format)
+            df_hist['Note'] = shift['past_midnight'].map({True: '🌙 Past midnight', False: ''}).mask(
+                shift['stale'], '🕰 Forgot to clock out?')
+            
+            # Convert UTC to IST for Display
+            df_hist['Date'] = clock_in.dt.tz_convert('Asia/Kolkata').dt.strftime('%d-%b-%Y')
+            df_hist['In'] = clock_in.dt.tz_convert('Asia/Kolkata').dt.strftime('%I:%M %p')
+            df_hist['Out'] = clock_out.dt.tz_convert('Asia/Kolkata').dt.strftime('%I:%M %p').fillna("Working...")
+
+            st.dataframe(
+                df_hist[['Employee', 'Date', 'In', 'Out', 'Hours', 'status', 'Note']], 
+                hide_index=True, 
+                use_container_width=True
+            )
+            
+            p1, p2, p3 = st.columns([1, 2, 1])
+            with p1:
+                if len(st.session_state.hist_cursors) > 1 and st.button("⬅️ Newer"):
+                    st.session_state.hist_cursors.pop()
+                    st.rerun()
+            with p2:
+                st.caption(f"Page {len(st.session_state.hist_cursors)}")
+            with p3:
+                if has_next and st.button("Older ➡️"):
+                    last = df_hist.iloc[-1]
+                    st.session_state.hist_cursors.append((last['clock_in'], str(last['id'])))
+                    st.rerun()
+            
+            st.divider()
+            totals = history_totals(filters)
+            m1, m2, m3 = st.columns(3)
+            m1.metric("Shifts", int(totals['shifts']))
+            m2.metric("Total Present", int(totals['employees']))
+            m3.metric("Hours Logged", f"{float(totals['hours'] or 0):,.2f}")
+        else:
+            st.warning(f"No attendance records found between {range_start} and {range_end}")
+
+    with tab_audit:
+        st.caption("Re-checks stored clock-in locations against the current office sites.")
+        
+        fence = get_geofence()
+        st.dataframe(
+            fence.offices[['name', 'lat', 'lon', 'radius_m']].rename(columns={'radius_m': 'Radius (m)'}),
+            hide_index=True,
+            use_container_width=True
+        )
+        
+        today = pd.Timestamp("today").date()
+        audit_range = st.date_input("Clock-ins Between", value=(today - pd.Timedelta(days=30), today), key="audit_range")
+        
+        if st.button("🛰 Run Audit"):
+            job = enqueue("audit", {
+                "start": pd.Timestamp(audit_range[0]).strftime('%Y-%m-%d'),
+                "end": (pd.Timestamp(audit_range[-1]) + pd.DateOffset(days=1)).strftime('%Y-%m-%d'),
+            }, st.session_state.user.id)
+            st.session_state.audit_job = str(job['id'])
+
+        job_panel("audit_job", _show_audit)
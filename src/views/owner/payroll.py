@@ -0,0 +1,137 @@
+"""Payroll from the daily hours rollup, exports and rollup rebuilds."""
+from functools import partial
+
+import pandas as pd
+import streamlit as st
+
+from src.db import read_df
+from src.db import queries as q
+from src.services.exports import EXPORTS, FORMAT_PACKAGES, FORMATS as EXPORT_FORMATS, format_available
+from src.services.jobs import enqueue, load_result, result_bytes
+from src.services.payroll import rebuild_rollup
+from src.views.job_status import job_panel
+
+
+def _show_payroll(job, period_label):
+    final_df = load_result(job)
+    if final_df.empty:
+        st.warning(f"No completed attendance records found for {period_label.replace('_', ' ')}.")
+        return
+
+    st.divider()
+
+    total_outflow = final_df['Total Pay'].sum()
+    st.subheader(f"💸 Total Outflow: ₹{total_outflow:,.2f}")
+
+    final_df['Employee'] = final_df['full_name']
+    final_df['Hours Worked'] = final_df['shift_hours'].map('{:,.2f}'.format)
+    final_df['Rate'] = final_df['hourly_rate'].map('₹{:,.2f}/hr'.format)
+    final_df['Payout (₹)'] = final_df['Total Pay'].map('₹{:,.2f}'.format)
+
+    st.dataframe(
+        final_df[['Employee', 'Hours Worked', 'Rate', 'Payout (₹)']],
+        hide_index=True,
+        use_container_width=True
+    )
+
+    csv = final_df.to_csv(index=False).encode('utf-8')
+    st.download_button(
+        "📥 Download CSV for Bank",
+        csv,
+        f"payroll_{period_label}.csv",
+        "text/csv"
+    )
+
+
+def _offer_export(job, filename, mime):
+    st.download_button(f"📥 Download ({job['result']['rows']:,} rows)", partial(result_bytes, job), filename, mime)
+
+
+def render_payroll():
+    st.header("💰 Payroll Calculator")
+    st.caption("Calculate exact payouts based on verified attendance hours.")
+    
+    months = ["January", "February", "March", "April", "May", "June", 
+              "July", "August", "September", "October", "November", "December"]
+    
+    col1, col2, col3, col4 = st.columns([1, 2, 1, 1])
+    with col1:
+        period = st.selectbox("Period", ["Month", "Quarter", "Year", "Custom"])
+    with col2:
+        if period == "Month":
+            sel_month = st.selectbox("Select Month", months, index=0)
+        elif period == "Quarter":
+            sel_quarter = st.selectbox("Select Quarter", ["Q1 (Jan-Mar)", "Q2 (Apr-Jun)", "Q3 (Jul-Sep)", "Q4 (Oct-Dec)"])
+        elif period == "Custom":
+            sel_range = st.date_input("Date Range", value=(pd.Timestamp("today").replace(day=1), pd.Timestamp("today")))
+    with col3:
+        sel_year = st.number_input("Year", value=2026, step=1, disabled=(period == "Custom"))
+    with col4:
+        st.write("")
+        run_calc = st.button("🧮 Run Payroll", type="primary")
+
+    # Resolve the period into [start, end) IST calendar days
+    if period == "Month":
+        start_ts = pd.Timestamp(year=int(sel_year), month=months.index(sel_month) + 1, day=1)
+        end_ts = start_ts + pd.DateOffset(months=1)
+        period_label = f"{sel_month}_{sel_year}"
+    elif period == "Quarter":
+        quarter_idx = ["Q1", "Q2", "Q3", "Q4"].index(sel_quarter[:2])
+        start_ts = pd.Timestamp(year=int(sel_year), month=3 * quarter_idx + 1, day=1)
+        end_ts = start_ts + pd.DateOffset(months=3)
+        period_label = f"{sel_quarter[:2]}_{sel_year}"
+    elif period == "Year":
+        start_ts = pd.Timestamp(year=int(sel_year), month=1, day=1)
+        end_ts = start_ts + pd.DateOffset(years=1)
+        period_label = f"{sel_year}"
+    else:
+        # While the second date is still being picked the widget returns a 1-tuple
+        start_ts = pd.Timestamp(sel_range[0])
+        end_ts = pd.Timestamp(sel_range[-1]) + pd.DateOffset(days=1)
+        period_label = f"{start_ts:%Y-%m-%d}_to_{pd.Timestamp(sel_range[-1]):%Y-%m-%d}"
+
+    if run_calc:
+        # Runs in a worker process; the same period over unchanged data comes straight back
+        job = enqueue("payroll", {
+            "start": start_ts.strftime('%Y-%m-%d'), "end": end_ts.strftime('%Y-%m-%d')
+        }, st.session_state.user.id)
+        st.session_state.payroll_job = str(job['id'])
+        st.session_state.payroll_label = period_label
+
+    job_panel("payroll_job", partial(_show_payroll, period_label=st.session_state.get("payroll_label", period_label)))
+
+    with st.expander("📤 Export Attendance & Payroll"):
+        st.caption("Exports the selected period straight from the database in chunks, so a full year is fine. "
+                   "The file is built in the background; download it here when it is ready.")
+        emps_df = read_df(q.EMPLOYEES, cached=True)
+        emp_map = dict(zip(emps_df['full_name'], emps_df['id'].astype(str))) if not emps_df.empty else {}
+        
+        e1, e2, e3 = st.columns([2, 2, 1])
+        with e1:
+            export_key = st.selectbox("Dataset", list(EXPORTS.keys()), format_func=lambda k: EXPORTS[k].label)
+        with e2:
+            export_emps = st.multiselect("Employees", list(emp_map.keys()), placeholder="All employees", key="export_emps")
+        with e3:
+            export_fmt = st.selectbox("Format", list(EXPORT_FORMATS.keys()))
+        
+        ext, mime = EXPORT_FORMATS[export_fmt]
+        if not format_available(ext):
+            st.warning(f"{export_fmt} export needs the {FORMAT_PACKAGES[ext]} package. CSV is always available.")
+        elif st.button(f"📦 Prepare {EXPORTS[export_key].label}"):
+            job = enqueue("export", {
+                "dataset": export_key, "fmt": ext,
+                "start": start_ts.strftime('%Y-%m-%d'), "end": end_ts.strftime('%Y-%m-%d'),
+                "emp_ids": sorted(emp_map[n] for n in export_emps),
+            }, st.session_state.user.id)
+            st.session_state.export_job = str(job['id'])
+            st.session_state.export_file = (f"{export_key}_{period_label}.{ext}", mime)
+
+        filename, file_mime = st.session_state.get("export_file", (None, None))
+        job_panel("export_job", partial(_offer_export, filename=filename, mime=file_mime))
+
+    with st.expander("🔁 Rebuild Payroll Rollup"):
+        st.caption("Recomputes daily hours from raw attendance logs for the selected period. "
+                   "Only needed after manual edits to attendance_logs.")
+        if st.button("Rebuild for this period"):
+            rebuild_rollup(start_ts.strftime('%Y-%m-%d'), end_ts.strftime('%Y-%m-%d'))
+            st.success("Rollup rebuilt.")
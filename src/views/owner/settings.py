@@ -0,0 +1,19 @@
+"""Personal settings for the signed-in owner."""
+import streamlit as st
+
+from src.db import execute
+from src.db import queries as q
+
+
+def render_settings():
+    st.header("⚙️ Personal Settings")
+    
+    current_name = st.session_state.get('user_name', '')
+    new_name = st.text_input("Update My Name", value=current_name)
+    
+    if st.button("Save Changes"):
+        execute(q.RENAME_USER, {"name": new_name, "id": st.session_state.user.id})
+            
+        st.session_state.user_name = new_name
+        st.success("Name updated!")
+        st.rerun()
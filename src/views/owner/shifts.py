@@ -0,0 +1,108 @@
+"""Shift Report: hours split at midnight, overtime, and shifts that overlap or were never closed."""
+import pandas as pd
+import streamlit as st
+
+from src.db import read_df
+from src.db import queries as q
+from src.services.attendance import load_settings, shift_report
+
+
+def _names(ids: pd.Series) -> pd.Series:
+    names = read_df(q.USER_NAMES, cached=True)
+    return ids.astype(str).map(dict(zip(names['id'].astype(str), names['full_name']))).fillna('Unknown')
+
+
+def _show_employees(report, settings):
+    df = report.employees.sort_values(['overtime', 'hours'], ascending=False)
+    df['Employee'] = _names(df['employee_id'])
+    table = pd.DataFrame({
+        'Employee': df['Employee'],
+        'Days': df['days'],
+        'Hours': df['hours'].round(1),
+        'Longest Day': df['longest_day'].round(1),
+        'Daily OT': df['daily_overtime'].round(1),
+        'Weekly OT': df['weekly_overtime'].round(1),
+        'Past Midnight': df['past_midnight'],
+        'Overlaps': df['overlaps'] + df['duplicates'],
+        'Open': df['open_stale'],
+    })
+    st.dataframe(table, hide_index=True, use_container_width=True)
+    st.caption(f"Overtime: hours beyond {settings['daily_hours']} h on one day, then beyond "
+               f"{settings['weekly_hours']} h in a Monday-Sunday week. Shifts past midnight "
+               "count on both days, as in payroll.")
+    st.download_button("📥 Download (CSV)", table.to_csv(index=False), "shift_report.csv", "text/csv")
+
+
+def _show_flagged(report):
+    if report.flagged.empty:
+        st.success("No overlapping, duplicate or forgotten shifts in this range.")
+        return
+    df = report.flagged
+    st.dataframe(pd.DataFrame({
+        'Employee': _names(df['employee_id']),
+        'In': df['clock_in'].dt.tz_convert('Asia/Kolkata').dt.strftime('%d-%b-%Y %I:%M %p'),
+        'Out': df['clock_out'].dt.tz_convert('Asia/Kolkata').dt.strftime('%d-%b-%Y %I:%M %p').fillna('Still open'),
+        'Issue': df['issue'],
+    }), hide_index=True, use_container_width=True)
+
+
+def _show_employee(report):
+    people = report.employees[report.employees['hours'] > 0]
+    if people.empty:
+        return
+    names = _names(people['employee_id'])
+    pick = st.selectbox("Employee", sorted(names), key="shift_report_employee")
+    emp_id = people['employee_id'][names == pick].iloc[0]
+
+    weekly = report.weekly[report.weekly['employee_id'] == emp_id]
+    st.bar_chart(weekly.set_index('week_start')[['hours']].rename(columns={'hours': 'Hours per week'}))
+    daily = report.daily[report.daily['employee_id'] == emp_id]
+    st.dataframe(pd.DataFrame({
+        'Date': daily['work_date'].dt.strftime('%a %d-%b-%Y'),
+        'Hours': daily['hours'].round(2),
+        'Shifts Started': daily['shifts'],
+        'Overtime': daily['overtime'].round(2),
+    }), hide_index=True, use_container_width=True)
+
+
+def render_shift_report():
+    st.header("🕒 Shift Report")
+    st.caption("Hours per day and week from raw clock-ins, overtime, and shifts that need a second look.")
+
+    today = pd.Timestamp("today").date()
+    c1, c2 = st.columns([3, 1])
+    with c1:
+        sel_range = st.date_input("Date Range", value=(today - pd.Timedelta(days=30), today), key="shift_range")
+    with c2:
+        st.write("")
+        refresh = st.button("🔄 Refresh")
+
+    # IST days [start, end); the report is kept until the range changes or Refresh is pressed
+    start, end = sel_range[0], sel_range[-1] + pd.Timedelta(days=1)
+    if refresh or st.session_state.get("shift_report_range") != (start, end):
+        with st.spinner("Analysing shifts..."):
+            st.session_state.shift_report = shift_report(start, end)
+        st.session_state.shift_report_range = (start, end)
+        st.session_state.shift_report_at = pd.Timestamp.now(tz='Asia/Kolkata')
+    report = st.session_state.shift_report
+    settings = load_settings()
+
+    emps = report.employees
+    m1, m2, m3, m4 = st.columns(4)
+    m1.metric("Hours", f"{emps['hours'].sum():,.1f}")
+    m2.metric("Overtime", f"{emps['overtime'].sum():,.1f} h")
+    m3.metric("Past Midnight", f"{int(emps['past_midnight'].sum()):,}")
+    m4.metric("Need a Look", f"{len(report.flagged):,}")
+    st.caption(f"Calculated {st.session_state.shift_report_at:%d-%b %I:%M %p}.")
+
+    if emps.empty:
+        st.warning(f"No attendance records found between {sel_range[0]} and {sel_range[-1]}")
+        return
+
+    tab_people, tab_flags, tab_one = st.tabs(["👥 By Employee", "⚠️ Flagged Shifts", "📈 One Employee"])
+    with tab_people:
+        _show_employees(report, settings)
+    with tab_flags:
+        _show_flagged(report)
+    with tab_one:
+        _show_employee(report)
@@ -0,0 +1,118 @@
+"""Hiring, roster imports and the staff registry."""
+import time
+
+import streamlit as st
+
+from src.auth import hash_password
+from src.db import execute, read_df
+from src.db import queries as q
+from src.services.onboarding import TEMPLATE_CSV, RosterError, import_roster, read_roster, validate_roster
+
+
+def render_staff():
+    st.header("👥 Workforce Management")
+    
+    # --- A. HIRE NEW EMPLOYEE ---
+    with st.expander("➕ Hire New Employee", expanded=True):
+        with st.form("hire_employee"):
+            col1, col2 = st.columns(2)
+            with col1:
+                new_emp_name = st.text_input("Full Name", placeholder="Rahul Sharma")
+                new_emp_email = st.text_input("Email", placeholder="rahul@agency.com").strip()
+            with col2:
+                new_emp_pass = st.text_input("Password", type="password").strip()
+                new_emp_rate = st.number_input("Hourly Rate (₹)", min_value=0.0, value=500.0, step=50.0)
+            
+            submitted = st.form_submit_button("Create Employee Account")
+            
+            if submitted:
+                if not new_emp_email or not new_emp_pass or not new_emp_name:
+                    st.error("Please fill in ALL fields.")
+                else:
+                    try:
+                        # HASH ON THE SHARED BCRYPT POOL, THEN INSERT
+                        hashed_pw = hash_password(new_emp_pass)
+                        
+                        execute(q.INSERT_EMPLOYEE, {"name": new_emp_name, "email": new_emp_email, "pw": hashed_pw, "rate": new_emp_rate})
+                            
+                        st.success(f"✅ Welcome to the team, {new_emp_name}! Rate set to ₹{new_emp_rate}/hr.")
+                        st.balloons()
+                        time.sleep(1)
+                        st.rerun()
+
+                    except Exception as e:
+                        st.error(f"Error creating employee (Email might already exist): {e}")
+
+    # --- B. BULK ONBOARDING ---
+    with st.expander("📥 Bulk Onboard from CSV / Excel"):
+        st.caption("One row per person: full_name, email, password, and optionally hourly_rate and role (employee/manager). "
+                   "Existing emails are updated (name, rate, and role if given); owner accounts are never touched.")
+        st.download_button("⬇️ Download Template", TEMPLATE_CSV, "staff_roster.csv", "text/csv")
+        
+        roster_file = st.file_uploader("Roster File", type=["csv", "xlsx"], key="roster_file")
+        if roster_file is not None:
+            try:
+                valid, errors = validate_roster(read_roster(roster_file.name, roster_file))
+            except RosterError as e:
+                st.error(str(e))
+            else:
+                v1, v2 = st.columns(2)
+                v1.metric("Ready to Import", len(valid))
+                v2.metric("Rejected Rows", len(errors))
+                if not errors.empty:
+                    st.dataframe(errors, hide_index=True, use_container_width=True)
+                
+                reset_pw = st.checkbox("Also reset passwords of existing staff to the ones in the file", value=False)
+                if not valid.empty and st.button(f"Import {len(valid)} Staff"):
+                    with st.spinner("Hashing passwords and saving..."):
+                        results = import_roster(valid, reset_passwords=reset_pw)
+                    counts = results['Result'].value_counts()
+                    st.success(", ".join(f"{n} {label}" for label, n in counts.items()))
+                    st.dataframe(results, hide_index=True, use_container_width=True)
+
+    st.divider()
+    st.subheader("📋 Active Staff Registry")
+    
+    staff_df = read_df(q.STAFF_REGISTRY, cached=True)
+    
+    if not staff_df.empty:
+        staff_records = staff_df.to_dict('records')
+        for employee in staff_records:
+            with st.container(border=True):
+                c1, c2, c3, c4 = st.columns([3, 2, 2, 1])
+                
+                with c1:
+                    st.write(f"**{employee.get('full_name', 'Unknown')}**")
+                    st.caption(f"📧 {employee['email']}")
+                with c2:
+                    rate = employee.get('hourly_rate', 0)
+                    st.write(f"💰 Rate: **₹{rate}/hr**")
+                with c3:
+                    st.write(f"Joined: {str(employee.get('created_at', ''))[:10]}")
+                with c4:
+                    if st.button("🔥", key=f"fire_{employee['id']}", help="Fire Employee"):
+                        try:
+                            execute(q.DELETE_USER_BY_EMAIL, {"email": employee['email']})
+                            st.success("Removed.")
+                            time.sleep(0.5)
+                            st.rerun() 
+                        except Exception as e:
+                            st.error(f"Err: {e}")
+
+                with st.expander(f"✏️ Edit {employee.get('full_name')}'s Details"):
+                    with st.form(f"edit_form_{employee['id']}"):
+                        edit_name = st.text_input("Name", value=employee.get('full_name', ''))
+                        edit_email = st.text_input("Contact Email", value=employee.get('email', ''))
+                        edit_rate = st.number_input("Hourly Rate (₹)", value=float(employee.get('hourly_rate') or 0.0), step=50.0)
+                        
+                        if st.form_submit_button("💾 Save Changes"):
+                            try:
+                                execute(q.UPDATE_EMPLOYEE, {"name": edit_name, "email": edit_email, "rate": edit_rate, "id": employee['id']})
+                                
+                                st.success("Details updated successfully!")
+                                time.sleep(1)
+                                st.rerun()
+                            except Exception as e:
+                                st.error(f"Could not update: {e}")
+    else:
+        st.info("No active employees found.")
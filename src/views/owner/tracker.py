@@ -0,0 +1,115 @@
+"""Every task as a filterable table or a Kanban board, one keyset page at a time."""
+import streamlit as st
+
+from src.db import read_df
+from src.db import queries as q
+
+TASK_PAGE_SIZE = 50
+KANBAN_PAGE_SIZE = 10
+TASK_STATUSES = {"todo": "📝 To Do", "in_progress": "🔧 In Progress", "done": "✅ Done"}
+
+
+def _task_page(key, filters, page_size):
+    """
+    One keyset page of the Task Tracker, with Newer/Older buttons underneath.
+    Returns (df, body): draw the page inside `body` so it sits above the buttons.
+    Cursors reset whenever the filters change.
+    """
+    if st.session_state.get(f"{key}_filters") != filters:
+        st.session_state[f"{key}_filters"] = filters
+        st.session_state[f"{key}_cursors"] = [None]
+    cursors = st.session_state[f"{key}_cursors"]
+    cursor = cursors[-1]
+    
+    df = read_df(q.TASK_TRACKER_PAGE, {
+        **filters,
+        "cur_ts": cursor[0] if cursor else None,
+        "cur_id": cursor[1] if cursor else None,
+        "limit": page_size + 1,
+    })
+    has_next = len(df) > page_size
+    df = df.head(page_size)
+    
+    body = st.container()
+    if len(cursors) > 1 or has_next:
+        p1, p2, p3 = st.columns([1, 1, 1])
+        with p1:
+            if len(cursors) > 1 and st.button("⬅️", key=f"{key}_newer", help="Newer"):
+                cursors.pop()
+                st.rerun()
+        with p2:
+            st.caption(f"Page {len(cursors)}")
+        with p3:
+            if has_next and st.button("➡️", key=f"{key}_older", help="Older"):
+                last = df.iloc[-1]
+                cursors.append((last['created_at'], str(last['id'])))
+                st.rerun()
+    return df, body
+
+
+def render_tracker():
+    st.header("📊 Live Task Tracker")
+    
+    staff_df = read_df(q.ASSIGNABLE_STAFF, cached=True)
+    staff_map = {f"{r.full_name} ({r.role})": str(r.id) for r in staff_df.itertuples()} if not staff_df.empty else {}
+    clients_df = read_df(q.CLIENT_NAMES, cached=True)
+    client_map = dict(zip(clients_df['name'], clients_df['id'].astype(str))) if not clients_df.empty else {}
+    
+    f1, f2, f3, f4 = st.columns([1, 2, 2, 2])
+    with f1:
+        mode = st.radio("View", ["Table", "Kanban"], horizontal=True)
+    with f2:
+        sel_client = st.selectbox("Client", ["All"] + list(client_map.keys()), key="tt_client")
+    with f3:
+        sel_assignee = st.selectbox("Assignee", ["All"] + list(staff_map.keys()), key="tt_assignee")
+    with f4:
+        due_range = st.date_input("Due Between", value=(), key="tt_due")
+    
+    filters = {
+        "client_id": client_map.get(sel_client),
+        "assignee_id": staff_map.get(sel_assignee),
+        "due_from": due_range[0] if len(due_range) > 0 else None,
+        "due_to": due_range[-1] if len(due_range) > 0 else None,
+    }
+    
+    if mode == "Table":
+        sel_status = st.selectbox("Status", ["All"] + list(TASK_STATUSES.keys()), format_func=lambda s: TASK_STATUSES.get(s, s), key="tt_status")
+        df, body = _task_page("tt_table", {**filters, "status": None if sel_status == "All" else sel_status}, TASK_PAGE_SIZE)
+        
+        with body:
+            if not df.empty:
+                df['Client'] = df['client_name'].fillna('Unknown')
+                df['Assignee'] = df['assignee_name'].fillna('Unassigned')
+                
+                display_cols = ['title', 'Client', 'Assignee', 'status', 'due_date', 'description']
+                
+                df_display = df[display_cols].rename(columns={
+                    'title': 'Task',
+                    'status': 'Status',
+                    'due_date': 'Due Date',
+                    'description': 'Details'
+                })
+                st.dataframe(df_display, use_container_width=True, hide_index=True)
+            else:
+                st.info("No tasks match these filters.")
+    
+    else:
+        # Each column pages on its own; Done stays unloaded until asked for
+        columns = st.columns(len(TASK_STATUSES))
+        for col, (status, label) in zip(columns, TASK_STATUSES.items()):
+            with col:
+                st.subheader(label)
+                if status == "done" and not st.session_state.get("tt_kanban_done"):
+                    if st.button("Load done tasks", key="tt_load_done"):
+                        st.session_state.tt_kanban_done = True
+                        st.rerun()
+                    continue
+                
+                df, body = _task_page(f"tt_kanban_{status}", {**filters, "status": status}, KANBAN_PAGE_SIZE)
+                with body:
+                    for t in df.itertuples(index=False):
+                        with st.container(border=True):
+                            st.markdown(f"**{t.title}**")
+                            st.caption(f"🏢 {t.client_name or 'Unknown'} · 👤 {t.assignee_name or 'Unassigned'} · 📅 {t.due_date}")
+                    if df.empty:
+                        st.caption("Nothing here.")
@@ -0,0 +1,57 @@
+"""Client records, hidden from employees."""
+import time
+
+import streamlit as st
+
+from src.db import execute, read_df
+from src.db import queries as q
+
+
+def render_vault():
+    st.header("🔐 Client Vault")
+    st.info("Add clients here. Emails are hidden from employees.")
+    
+    with st.expander("➕ Add New Client"):
+        with st.form("add_client"):
+            name = st.text_input("Company Name")
+            email = st.text_input("Contact Email")
+            
+            if st.form_submit_button("Save to Vault"):
+                if name and email:
+                    try:
+                        execute(q.INSERT_CLIENT, {"name": name, "email": email})
+                        st.success("Client Added Securely")
+                        st.rerun()
+                    except Exception as e:
+                        st.error(f"Error: {e}")
+                else:
+                    st.warning("Name and Email are required.")
+    
+    st.subheader("🗄 Client Database")
+    
+    clients_df = read_df(q.CLIENTS_ALL, cached=True)
+    
+    if not clients_df.empty:
+        clients = clients_df.to_dict('records')
+        for client in clients:
+            display_name = client.get('name', 'Unknown Client')
+            
+            with st.expander(f"🏢 {display_name}"):
+                c1, c2 = st.columns([3, 1])
+                
+                with c1:
+                    st.write(f"**Email:** {client.get('email', 'No Email')}")
+                    st.caption(f"ID: {client['id']}")
+                
+                with c2:
+                    st.write("") 
+                    if st.button("🗑️ Delete", key=f"del_client_{client['id']}"):
+                        try:
+                            execute(q.DELETE_CLIENT, {"id": client['id']})
+                            st.toast("Deleted!")
+                            time.sleep(1)
+                            st.rerun()
+                        except Exception as e:
+                            st.error(f"Error: {e}")
+    else:
+        st.info("The Vault is empty.")